@@ -3,18 +3,28 @@ ScriptsManager - система управления скриптами для N
 Использует модульную архитектуру и панели на PySide.
 """
 import os
+import time
 import getpass
 import nuke
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from io import StringIO
 
 # Импорты новых модулей
-from script_discovery import discover_scripts
-from script_info_manager import ScriptInfoManager
+from script_discovery import discover_scripts, get_discovered_dirs, get_discovered_scripts, get_discovered_modules
+from script_info_manager import ScriptInfoManager, diff_scripts_info
 from user_data_manager import UserDataManager
-from menu_builder import MenuBuilder
+from user_state_store import get_user_state_store, migrate_json_to_sqlite
+from menu_builder import MenuBuilder, get_live_menu_trie, set_live_menu_trie
+from menu_trie import MenuTrie
+from metadata_extractor import build_drafts
 from panels.scripts_manager_panel import ScriptsManagerPanel
 from panels.edit_script_panel import EditScriptPanel
+from file_utils import batch_writes
+from script_watcher import ScriptsWatcher
+import script_reloader
+import bytecode_cache
+import startup_timing
 import config
 
 
@@ -25,28 +35,15 @@ def scripts_manager():
         user_manager = UserDataManager()
         menu_builder = MenuBuilder(info_manager)
         
-        # Проверка наличия файла информации
-        if not os.path.isfile(info_manager.info_file):
-            nuke.message("Нужен файл scripts_info.json")
+        # Панель открывается сразу, данные (и ошибки их чтения) приходят из фонового потока
+        dialog_result = ScriptsManagerPanel.show_dialog_async(info_manager, user_manager)
+        if dialog_result is None:
             return
+        result, scripts_info = dialog_result
         
-        # Получение данных
-        scripts_info = info_manager.get_scripts_info()
-        if not scripts_info:
-            nuke.message("Ошибка чтения файла scripts_info.json")
-            return
-        
-        scripts = discover_scripts(add_to_plugin_path=True)
-        if not scripts:
-            nuke.message("Не нашел ни одного скрипта в папке scripts")
-            return
-        
-        user_data = user_manager.get_user_data()
-        
-        # Создание и показ панели
-        result = ScriptsManagerPanel.show_dialog(scripts, scripts_info, user_data)
-        if result is None:
-            return
+        # Состояние до изменений - пункты, которые эта сессия сейчас показывает в меню Nuke.
+        # data.json для этого не годится: его могли изменить в другой сессии Nuke
+        old_states = _session_menu_states(result, scripts_info, user_manager)
         
         # Сохранение данных
         user_manager.ensure_user_folder()
@@ -55,19 +52,18 @@ def scripts_manager():
         menu_content_lines = []
         for script_name, enabled in result.items():
             script_info = scripts_info.get(script_name)
-            if script_info:
-                if enabled:
-                    # Записываем команду в menu.py используя StringIO для временного хранения
-                    temp_file = StringIO()
-                    menu_builder.write_menu_command(temp_file, script_info, create_menus=True)
-                    menu_content_lines.append(temp_file.getvalue())
-                    temp_file.close()
-                else:
-                    # Удаляем меню из Nuke
-                    menu_builder.remove_menu(script_info)
+            if script_info and enabled:
+                # Записываем команду в menu.py используя StringIO для временного хранения
+                temp_file = StringIO()
+                menu_builder.write_menu_command(temp_file, script_info, create_menus=False)
+                menu_content_lines.append(temp_file.getvalue())
+                temp_file.close()
+        
+        # В меню Nuke добавляем и удаляем только скрипты, состояние которых изменилось
+        menu_builder.apply_changes(scripts_info, old_states, result)
         
         # Записываем menu.py файл
-        menu_content = "".join(menu_content_lines)
+        menu_content = _render_user_menu("".join(menu_content_lines))
         user_manager.write_menu_file(menu_content)
         
         # Сохраняем данные пользователя
@@ -95,13 +91,46 @@ def edit_script_info():
         scripts_info = info_manager.get_scripts_info()
         
         # Показываем панель редактирования
-        result = EditScriptPanel.show_dialog(scripts, scripts_info)
+        result = EditScriptPanel.show_dialog(scripts, scripts_info, info_manager.get_shortcut_index())
         if result is None:
             return
         
         script_name, script_info = result
         info_manager.update_script_info(script_name, script_info)
-        update_users_menu()
+        update_users_menu(old_scripts_info=scripts_info)
+        
+    except (IOError, ValueError) as e:
+        nuke.message(f"Ошибка работы с файлами: {e}")
+    except Exception as e:
+        nuke.message(f"Неожиданная ошибка: {e}")
+
+
+def import_scripts_metadata():
+    """
+    Создает черновые записи в scripts_info.json для скриптов, у которых их нет.
+    Описание и команда берутся из исходников скриптов (см. metadata_extractor).
+    """
+    try:
+        info_manager = ScriptInfoManager()
+        
+        scripts = discover_scripts()
+        if not scripts:
+            nuke.message("Не нашел ни одного скрипта в папке scripts")
+            return
+        
+        info_manager.ensure_info_file()
+        scripts_info = info_manager.get_scripts_info()
+        drafts = build_drafts(scripts, get_discovered_modules(), scripts_info)
+        if not drafts:
+            nuke.message("У всех скриптов уже есть информация")
+            return
+        
+        names = "\n".join(sorted(drafts))
+        if not nuke.ask(f"Добавить информацию о скриптах ({len(drafts)}):\n\n{names}"):
+            return
+        
+        info_manager.update_scripts_info(drafts)
+        update_users_menu(old_scripts_info=scripts_info)
         
     except (IOError, ValueError) as e:
         nuke.message(f"Ошибка работы с файлами: {e}")
@@ -135,7 +164,7 @@ def remove_script_info():
         if p.show():
             script_name = p.value("Script")
             info_manager.remove_script_info(script_name)
-            update_users_menu()
+            update_users_menu(old_scripts_info=scripts_info)
             
     except Exception as e:
         nuke.message(f"Ошибка: {e}")
@@ -193,41 +222,171 @@ def create_user_default_settings(user_manager: Optional[UserDataManager] = None)
             return
         
         scripts_info = info_manager.get_scripts_info()
-        user_manager.ensure_user_folder()
-        
-        # Собираем данные и содержимое menu.py
-        data = {}
-        menu_content_lines = []
-        
-        for script_name in scripts:
-            script_info = scripts_info.get(script_name)
-            if script_info is None:
-                continue
-            
-            default_enabled = script_info.get("default", False)
-            data[script_name] = default_enabled
-            
-            if default_enabled:
-                temp_file = StringIO()
-                menu_builder.write_menu_command(temp_file, script_info, create_menus=False)
-                menu_content_lines.append(temp_file.getvalue())
-                temp_file.close()
-        
-        # Сохраняем файлы
-        menu_content = "".join(menu_content_lines)
-        user_manager.write_menu_file(menu_content)
-        user_manager.save_user_data(data)
+        _write_user_settings(user_manager, scripts, scripts_info, menu_builder, use_defaults=True)
         
     except Exception:
         # Молча игнорируем ошибки при создании дефолтных настроек
         pass
 
 
-def update_users_menu():
+class UsersMenuUpdateReport:
+    """Итог обновления меню пользователей."""
+    
+    def __init__(self):
+        self.succeeded: List[str] = []
+        self.skipped: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.timings: Dict[str, float] = {}
+        self.writes_done = 0
+        self.writes_skipped = 0
+        self.total_time = 0.0
+        self.cancelled = False
+    
+    def headline(self) -> str:
+        """Возвращает заголовок сообщения по итогу обновления."""
+        if self.cancelled:
+            return "Обновление прервано"
+        if self.failed:
+            return "Обновлено с ошибками"
+        return "Successfully updated!"
+    
+    def summary(self) -> str:
+        """Возвращает текстовую сводку для показа пользователю."""
+        lines = [
+            f"Обновлено: {len(self.succeeded)}",
+            f"Не затронуто изменениями: {len(self.skipped)}",
+            f"Ошибок: {len(self.failed)}",
+            f"Записано файлов: {self.writes_done}, без изменений: {self.writes_skipped}",
+            f"Время: {self.total_time:.1f} с",
+        ]
+        if self.timings:
+            slowest = max(self.timings, key=self.timings.get)
+            lines.append(f"Дольше всего: {slowest} ({self.timings[slowest]:.2f} с)")
+        if self.failed:
+            lines.append("")
+            lines.extend(f"{user}: {error}" for user, error in sorted(self.failed.items()))
+        return "\n".join(lines)
+
+
+def _render_user_menu(commands: str) -> str:
+    """
+    Оборачивает команды menu.py пользователя замером времени его выполнения.
+    
+    Args:
+        commands: Команды добавления скриптов в меню
+    """
+    return (
+        "import startup_timing\n"
+        "startup_timing.begin(\"user_menu\")\n"
+        f"{commands}"
+        "startup_timing.end(\"user_menu\")\n"
+        "startup_timing.finish(\"user_menu\")\n"
+    )
+
+
+def _build_menu_content(states: Dict[str, bool], scripts_info: Dict[str, Dict],
+                        menu_builder: MenuBuilder) -> str:
+    """Собирает содержимое menu.py пользователя по состояниям скриптов."""
+    menu_content_lines = []
+    for script_name, enabled in states.items():
+        if enabled:
+            temp_file = StringIO()
+            menu_builder.write_menu_command(temp_file, scripts_info[script_name], create_menus=False)
+            menu_content_lines.append(temp_file.getvalue())
+            temp_file.close()
+    return _render_user_menu("".join(menu_content_lines))
+
+
+def _write_user_settings(user_manager: UserDataManager, scripts: Dict[str, str],
+                         scripts_info: Dict[str, Dict], menu_builder: MenuBuilder,
+                         use_defaults: bool, user_data: Optional[Dict[str, bool]] = None) -> int:
+    """
+    Заново создает menu.py и data.json пользователя.
+    Файлы, содержимое которых не изменилось, не перезаписываются.
+    
+    Args:
+        user_manager: Менеджер данных пользователя
+        scripts: Найденные скрипты {имя_скрипта: путь_в_меню}
+        scripts_info: Информация о скриптах
+        menu_builder: Построитель меню
+        use_defaults: Игнорировать ли текущие настройки пользователя и брать только default
+        user_data: Уже прочитанные данные пользователя
+        
+    Returns:
+        Количество реально записанных файлов (0-2)
+    """
+    known_scripts = [name for name in scripts if name in scripts_info]
+    if use_defaults:
+        states = {name: scripts_info[name].get("default", False) for name in known_scripts}
+    else:
+        states = user_manager.get_scripts_state(known_scripts, scripts_info, user_data)
+    
+    menu_content = _build_menu_content(states, scripts_info, menu_builder)
+    user_manager.ensure_user_folder()
+    menu_written = user_manager.write_menu_file(menu_content)
+    data_written = user_manager.save_user_data(states)
+    return int(menu_written) + int(data_written)
+
+
+def _is_script_in_menu(script_name: str, scripts: Dict[str, str], scripts_info: Dict[str, Dict],
+                       user_data: Dict[str, bool]) -> bool:
+    """Попадает ли скрипт в menu.py пользователя при данной информации о скриптах."""
+    if script_name not in scripts or script_name not in scripts_info:
+        return False
+    return user_data.get(script_name, scripts_info[script_name].get("default", False))
+
+
+def _update_user_settings(username: str, scripts: Dict[str, str], scripts_info: Dict[str, Dict],
+                          menu_builder: MenuBuilder, changed_scripts: Optional[Set[str]] = None,
+                          old_scripts_info: Optional[Dict[str, Dict]] = None) -> Tuple[bool, int, float]:
+    """
+    Обновляет настройки одного пользователя. Выполняется в потоке пула.
+    
+    Если переданы changed_scripts, пользователь, у которого ни один из измененных
+    скриптов не был и не станет включен, пропускается.
+    
+    Returns:
+        Кортеж (был_ли_пользователь_затронут, записано_файлов, время_в_секундах)
+    """
+    start = time.perf_counter()
+    user_manager = UserDataManager(username=username)
+    has_settings = user_manager.data_file_exists() and user_manager.menu_file_exists()
+    
+    user_data = None
+    if has_settings and changed_scripts is not None:
+        if not changed_scripts:
+            return False, 0, time.perf_counter() - start
+        user_data = user_manager.get_user_data()
+        affected = any(
+            _is_script_in_menu(name, scripts, old_scripts_info, user_data) or
+            _is_script_in_menu(name, scripts, scripts_info, user_data)
+            for name in changed_scripts
+        )
+        if not affected:
+            return False, 0, time.perf_counter() - start
+    
+    written = _write_user_settings(user_manager, scripts, scripts_info, menu_builder,
+                                   use_defaults=not has_settings, user_data=user_data)
+    return True, written, time.perf_counter() - start
+
+
+def update_users_menu(max_workers: Optional[int] = None,
+                      old_scripts_info: Optional[Dict[str, Dict]] = None) -> Optional[UsersMenuUpdateReport]:
     """
     Для всех пользователей в папке users заново создает menu.py.
     Создание происходит на основе включенных скриптов в userDataFile и новой
     информации из scripts_info.json.
+    
+    Пользователи обрабатываются параллельно на пуле потоков. Ошибка у одного
+    пользователя не останавливает обновление остальных.
+    
+    Args:
+        max_workers: Количество потоков (по умолчанию config.UPDATE_USERS_WORKERS)
+        old_scripts_info: Информация о скриптах до изменения. Если передана,
+            обновляются только пользователи, которых затрагивают измененные скрипты
+            
+    Returns:
+        Отчет об обновлении или None, если обновлять было нечего
     """
     try:
         info_manager = ScriptInfoManager()
@@ -235,65 +394,290 @@ def update_users_menu():
         
         scripts = discover_scripts()
         if not scripts:
-            return
+            return None
         
         if not os.path.isfile(info_manager.info_file):
-            return
+            return None
         
         scripts_info = info_manager.get_scripts_info()
         users_dir = config.USERS_DIR
         
         if not os.path.isdir(users_dir):
-            return
+            return None
         
-        for user in os.listdir(users_dir):
-            user_folder = os.path.join(users_dir, user)
-            if not os.path.isdir(user_folder):
-                continue
-            
-            user_manager = UserDataManager(username=user)
-            
-            if user_manager.data_file_exists() and user_manager.menu_file_exists():
-                # Обновляем существующие настройки
-                user_data = user_manager.get_user_data()
-                new_data = {}
-                menu_content_lines = []
-                
-                for script_name in scripts:
-                    script_info = scripts_info.get(script_name)
-                    if script_info is None:
-                        continue
-                    
-                    # Определяем состояние скрипта
-                    enabled = user_data.get(script_name)
-                    if enabled is None:
-                        enabled = script_info.get("default", False)
-                    
-                    new_data[script_name] = enabled
-                    
-                    if enabled:
-                        temp_file = StringIO()
-                        menu_builder.write_menu_command(temp_file, script_info, create_menus=False)
-                        menu_content_lines.append(temp_file.getvalue())
-                        temp_file.close()
-                
-                # Сохраняем обновленные файлы
-                menu_content = "".join(menu_content_lines)
-                user_manager.write_menu_file(menu_content)
-                user_manager.save_user_data(new_data)
-            else:
-                # Создаем дефолтные настройки
-                create_user_default_settings(user_manager)
+        changed_scripts = None
+        if old_scripts_info is not None:
+            changed_scripts = diff_scripts_info(old_scripts_info, scripts_info)
         
-        nuke.message("Successfully updated!")
+        users = [user for user in os.listdir(users_dir)
+                 if os.path.isdir(os.path.join(users_dir, user))]
+        report = _run_users_update(users, scripts, scripts_info, menu_builder, max_workers,
+                                   changed_scripts, old_scripts_info)
+        
+        nuke.message(f"{report.headline()}\n\n{report.summary()}")
+        return report
         
     except Exception as e:
         nuke.message(f"Ошибка обновления меню: {e}")
+        return None
+
+
+def _run_users_update(users: List[str], scripts: Dict[str, str], scripts_info: Dict[str, Dict],
+                      menu_builder: MenuBuilder, max_workers: Optional[int] = None,
+                      changed_scripts: Optional[Set[str]] = None,
+                      old_scripts_info: Optional[Dict[str, Dict]] = None) -> UsersMenuUpdateReport:
+    """
+    Обновляет настройки пользователей на пуле потоков с показом прогресса.
+    Все вызовы nuke выполняются только в текущем (главном) потоке.
+    """
+    report = UsersMenuUpdateReport()
+    start = time.perf_counter()
+    workers = max(1, max_workers or config.UPDATE_USERS_WORKERS)
+    task = nuke.ProgressTask("Update Users Menus")
+    
+    try:
+        with batch_writes(fsync=config.UPDATE_USERS_FSYNC), ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_update_user_settings, user, scripts, scripts_info, menu_builder,
+                            changed_scripts, old_scripts_info): user
+                for user in users
+            }
+            for done_count, future in enumerate(as_completed(futures), 1):
+                user = futures[future]
+                try:
+                    updated, written, report.timings[user] = future.result()
+                    (report.succeeded if updated else report.skipped).append(user)
+                    if updated:
+                        report.writes_done += written
+                        report.writes_skipped += 2 - written
+                except Exception as e:
+                    report.failed[user] = str(e)
+                
+                task.setMessage(user)
+                task.setProgress(int(done_count * 100 / len(futures)))
+                if task.isCancelled():
+                    report.cancelled = True
+                    for pending in futures:
+                        pending.cancel()
+                    break
+    finally:
+        del task
+    
+    report.total_time = time.perf_counter() - start
+    return report
+
+
+def migrate_user_data_to_sqlite():
+    """
+    Переносит data.json всех пользователей в базу SQLite.
+    После переноса нужно переключить config.USER_STATE_BACKEND на "sqlite".
+    """
+    try:
+        result = migrate_json_to_sqlite()
+        message = f"Перенесено пользователей: {len(result['migrated'])}"
+        if result["failed"]:
+            message += "\nНе удалось прочитать data.json: " + ", ".join(result["failed"])
+        nuke.message(message)
+    except Exception as e:
+        nuke.message(f"Ошибка переноса данных: {e}")
+
+
+# Наблюдатель за папкой scripts и состояние (скрипты, информация о скриптах),
+# по которому построено меню текущей сессии
+_watcher: Optional[ScriptsWatcher] = None
+_live_menu_state: Optional[Tuple[Dict[str, str], Dict[str, Dict]]] = None
+# Последняя ошибка фонового обновления: одна и та же ошибка пишется в консоль один раз
+_last_refresh_error: Optional[str] = None
+
+
+def start_script_watcher():
+    """
+    Запускает наблюдение за папкой scripts и scripts_info.json (config.SCRIPT_WATCHER).
+    Вызывается из menu.py после add_scripts_folder_to_plugin_path.
+    """
+    global _watcher, _live_menu_state
+    if _watcher is not None:
+        return
+    
+    info_manager = ScriptInfoManager()
+    scripts = get_discovered_scripts() or discover_scripts()
+    _live_menu_state = (scripts, info_manager.get_scripts_info())
+    
+    _watcher = ScriptsWatcher(refresh_scripts, files=[info_manager.info_file],
+                              dispatch=nuke.executeInMainThread)
+    _watcher.start(get_discovered_dirs())
+
+
+def refresh_scripts():
+    """
+    Подхватывает изменения в папке scripts и scripts_info.json без перезапуска Nuke:
+    обновляет индекс скриптов, pluginPath и меню текущей сессии.
+    Файлы пользователя не переписываются. Вызывается в главном потоке.
+    
+    Вызывается наблюдателем без участия пользователя, поэтому ошибки не показываются
+    окном, а пишутся в консоль Nuke, причем одна и та же ошибка подряд - один раз.
+    """
+    global _last_refresh_error
+    try:
+        _refresh_scripts()
+    except Exception as e:
+        error = f"Ошибка обновления скриптов: {e}"
+        if error != _last_refresh_error:
+            nuke.tprint(error)
+        _last_refresh_error = error
+    else:
+        _last_refresh_error = None
+
+
+def _refresh_scripts():
+    """Обновляет индекс скриптов, pluginPath и меню текущей сессии, ошибки пробрасываются."""
+    global _live_menu_state
+    info_manager = ScriptInfoManager()
+    scripts = discover_scripts(add_to_plugin_path=True)
+    scripts_info = info_manager.get_scripts_info()
+    if _watcher is not None:
+        _watcher.set_dirs(get_discovered_dirs())
+    
+    old_scripts, old_info = _live_menu_state or ({}, {})
+    _live_menu_state = (scripts, scripts_info)
+    
+    changed = diff_scripts_info(old_info, scripts_info) | (old_scripts.keys() ^ scripts.keys())
+    if not changed:
+        return
+    
+    user_data = UserDataManager().get_user_data()
+    was_in_menu = {name: _is_script_in_menu(name, old_scripts, old_info, user_data) for name in changed}
+    in_menu = {name: _is_script_in_menu(name, scripts, scripts_info, user_data) for name in changed}
+    removed = dict.fromkeys(changed, False)
+    
+    if get_live_menu_trie() is None:
+        old_states = {name: _is_script_in_menu(name, old_scripts, old_info, user_data) for name in old_info}
+        _ensure_live_menu_trie(old_info, old_states)
+    
+    # Измененные пункты сначала убираются со старыми параметрами, затем добавляются с новыми
+    menu_builder = MenuBuilder(info_manager)
+    menu_builder.apply_changes(old_info, was_in_menu, removed)
+    menu_builder.apply_changes(scripts_info, removed, in_menu)
+
+
+def _ensure_live_menu_trie(scripts_info: Dict[str, Dict], states: Dict[str, bool]) -> MenuTrie:
+    """
+    Строит дерево путей меню текущей сессии, если его еще нет. Пока Scripts Manager
+    не менял меню, в нем есть ровно то, что добавил menu.py пользователя.
+    
+    Args:
+        scripts_info: Информация о скриптах, по которой построен menu.py
+        states: Состояния скриптов, по которым построен menu.py
+    """
+    trie = get_live_menu_trie()
+    if trie is None:
+        trie = MenuTrie.from_scripts_info(scripts_info, [name for name, enabled in states.items() if enabled])
+        set_live_menu_trie(trie)
+    return trie
+
+
+def _session_menu_states(script_names: Iterable[str], scripts_info: Dict[str, Dict],
+                         user_manager: UserDataManager) -> Dict[str, bool]:
+    """
+    Состояния скриптов по дереву путей меню текущей сессии: включен тот скрипт,
+    пункт которого сейчас есть в меню Nuke. Дерево записывается в create_menu
+    и дальше меняется только вместе с меню.
+    
+    Args:
+        script_names: Имена скриптов
+        scripts_info: Информация о скриптах
+        user_manager: Менеджер данных пользователя, если дерево еще не записано
+        
+    Returns:
+        Словарь {имя_скрипта: есть_ли_в_меню}
+    """
+    trie = get_live_menu_trie()
+    if trie is None:
+        # create_menu в этой сессии не вызывался: в меню то, что добавил menu.py по data.json
+        trie = _ensure_live_menu_trie(scripts_info, user_manager.get_scripts_state(scripts_info=scripts_info))
+    in_menu = {script_name for _, script_name in trie.items()}
+    return {script_name: script_name in in_menu for script_name in script_names}
+
+
+def _record_session_menu() -> None:
+    """
+    Запоминает пункты, которые menu.py пользователя добавляет в меню при запуске,
+    пока data.json еще соответствует меню этой сессии.
+    """
+    try:
+        info_manager = ScriptInfoManager()
+        if not os.path.isfile(info_manager.info_file):
+            return
+        scripts_info = info_manager.get_scripts_info()
+        _ensure_live_menu_trie(scripts_info, UserDataManager().get_scripts_state(scripts_info=scripts_info))
+    except Exception:
+        # Молча игнорируем: тогда дерево построится при первом открытии Scripts Manager
+        pass
+
+
+def reload_changed_scripts():
+    """
+    Перезагружает скрипты, файлы которых изменились, и скрипты, которые их импортируют,
+    чтобы подхватить исправления без перезапуска Nuke.
+    """
+    try:
+        if not get_discovered_modules():
+            discover_scripts()
+        result = script_reloader.reload_modules(get_discovered_modules())
+        
+        if not result["changed"]:
+            nuke.message("Измененных скриптов нет")
+            return
+        message = "Перезагружены: " + (", ".join(result["reloaded"]) or "нет")
+        if result["failed"]:
+            message += "\n\nОшибки:\n" + "\n".join(f"{name}: {error}" for name, error in result["failed"])
+        nuke.message(message)
+    except Exception as e:
+        nuke.message(f"Ошибка перезагрузки скриптов: {e}")
+
+
+def precompile_scripts():
+    """
+    Компилирует все скрипты в общий кэш байткода для версии Python этого Nuke,
+    чтобы сессии не компилировали их при каждом запуске.
+    """
+    try:
+        report = bytecode_cache.BytecodeCache().compile_tree()
+        message = (f"Скомпилировано: {report['compiled']}, без изменений: {report['skipped']}, "
+                   f"удалено: {report['removed']}")
+        if report["failed"]:
+            message += "\n\nОшибки:\n" + "\n".join(f"{rel}: {error}" for rel, error in report["failed"])
+        nuke.message(message)
+    except Exception as e:
+        nuke.message(f"Ошибка компиляции скриптов: {e}")
+
+
+def install_bytecode_cache():
+    """Включает загрузку скриптов из общего кэша байткода (config.USE_BYTECODE_CACHE)."""
+    try:
+        bytecode_cache.install_bytecode_cache()
+    except Exception:
+        # Молча игнорируем: без кэша скрипты просто компилируются как обычно
+        pass
+
+
+def show_startup_timings():
+    """
+    Показывает время этапов запуска по журналу замеров текущего пользователя.
+    Заодно удаляет из журнала старые сессии.
+    """
+    try:
+        startup_timing.trim_log()
+        nuke.message(startup_timing.format_breakdown(startup_timing.read_sessions()))
+    except Exception as e:
+        nuke.message(f"Ошибка чтения замеров запуска: {e}")
 
 
 def add_scripts_folder_to_plugin_path():
     """
     Добавляет все папки внутри папки scripts в pluginPath для доступа к ним.
+    Если config.PLUGIN_PATH_MODE == "finder", вместо этого скрипты импортируются
+    через ScriptsFinder без изменения pluginPath.
     """
     from script_discovery import add_scripts_folder_to_plugin_path as _add_path
     _add_path()
@@ -305,6 +689,7 @@ def create_menu():
     Для обычных пользователей это просто включение и выключение скриптов.
     Для избранных пользователей из списка ADMIN_USERS еще и меню
     для управления информацией о скриптах и удаления информации о скриптах.
+    Заодно запоминает пункты меню, которые добавит menu.py пользователя.
     """
     current_user = getpass.getuser()
     
@@ -317,6 +702,10 @@ def create_menu():
             "Edit/Scripts Manager/Edit Scripts Info",
             "ScriptsManager.edit_script_info()"
         )
+        nuke.menu("Nuke").addCommand(
+            "Edit/Scripts Manager/Import Scripts Metadata",
+            "ScriptsManager.import_scripts_metadata()"
+        )
         nuke.menu("Nuke").addCommand(
             "Edit/Scripts Manager/Remove Script",
             "ScriptsManager.remove_script_info()"
@@ -329,17 +718,44 @@ def create_menu():
             "Edit/Scripts Manager/Update Users Menus",
             "ScriptsManager.update_users_menu()"
         )
+        nuke.menu("Nuke").addCommand(
+            "Edit/Scripts Manager/Migrate User Data To SQLite",
+            "ScriptsManager.migrate_user_data_to_sqlite()"
+        )
+        nuke.menu("Nuke").addCommand(
+            "Edit/Scripts Manager/Show Startup Timings",
+            "ScriptsManager.show_startup_timings()"
+        )
+        nuke.menu("Nuke").addCommand(
+            "Edit/Scripts Manager/Reload Changed Scripts",
+            "ScriptsManager.reload_changed_scripts()"
+        )
+        nuke.menu("Nuke").addCommand(
+            "Edit/Scripts Manager/Precompile Scripts",
+            "ScriptsManager.precompile_scripts()"
+        )
     else:
         nuke.menu("Nuke").addCommand(
             "Edit/Scripts Manager",
             "ScriptsManager.scripts_manager()"
         )
+        nuke.menu("Nuke").addCommand(
+            "Edit/Reload Changed Scripts",
+            "ScriptsManager.reload_changed_scripts()"
+        )
+    
+    _record_session_menu()
 
 
 # Utility functions
 
 def set_script_state_for_all_users(script_name: str, state: bool):
     """Устанавливает состояние скрипта для всех пользователей"""
+    if config.USER_STATE_BACKEND == "sqlite":
+        # Один запрос в одной транзакции вместо чтения-записи файла каждого пользователя
+        get_user_state_store().set_script_state_for_all_users(script_name, state)
+        return
+    
     users_dir = config.USERS_DIR
     if not os.path.isdir(users_dir):
         return
@@ -362,5 +778,14 @@ def get_default_script_state(script_name: str) -> bool:
 
 def get_script_state(script_name: str, username: Optional[str] = None) -> bool:
     """Получить состояние скрипта для указанного пользователя (текущего если не указан)."""
+    return get_scripts_state([script_name], username)[script_name]
+
+
+def get_scripts_state(script_names: Optional[Iterable[str]] = None,
+                      username: Optional[str] = None) -> Dict[str, bool]:
+    """
+    Получить состояние многих скриптов для указанного пользователя за одно чтение файлов.
+    Если script_names не указаны, возвращается состояние всех известных скриптов.
+    """
     user_manager = UserDataManager(username=username)
-    return user_manager.get_script_state(script_name)
+    return user_manager.get_scripts_state(script_names)
@@ -0,0 +1,118 @@
+"""
+Заглушка модуля nuke для запуска бенчмарков вне Nuke.
+
+Реализует только то, что ScriptsManager вызывает при поиске скриптов и
+генерации меню: pluginAddPath, menu, message, ProgressTask. Панели на PySide
+бенчмарками не используются, поэтому вместо них тоже ставятся заглушки.
+"""
+import re
+import sys
+import types
+
+
+class _Menu:
+    """
+    Меню, которое запоминает добавленные команды. Как и в Nuke, путь через "/"
+    создает подменю, а "\\/" остается частью имени.
+    """
+    
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.children = {}
+    
+    def addCommand(self, name, command="", shortcut="", icon="", index=-1, shortcutContext=None):
+        folders, item_name = _split_path(name)
+        menu = self
+        for folder in folders:
+            menu = menu.addMenu(folder)
+        menu.children[item_name] = command
+        return self
+    
+    def addMenu(self, name, icon="", index=-1):
+        folders, menu_name = _split_path(name)
+        menu = self
+        for folder in folders + [menu_name]:
+            child = menu.children.get(folder)
+            if not isinstance(child, _Menu):
+                child = menu.children[folder] = _Menu(folder)
+            menu = child
+        return menu
+    
+    def findItem(self, name):
+        folders, item_name = _split_path(name)
+        menu = self
+        for folder in folders:
+            menu = menu.children.get(folder)
+            if not isinstance(menu, _Menu):
+                return None
+        return menu.children.get(item_name)
+    
+    def removeItem(self, name):
+        self.children.pop(name, None)
+    
+    def items(self):
+        return list(self.children.values())
+
+
+def _split_path(path: str):
+    """Разбивает путь меню по неэкранированным "/" на папки и имя пункта."""
+    segments = re.split(r"(?<!\\)/", path)
+    return segments[:-1], segments[-1]
+
+
+class _ProgressTask:
+    """Прогресс, который никогда не отменяется."""
+    
+    def __init__(self, title: str = ""):
+        self.title = title
+    
+    def setProgress(self, value):
+        pass
+    
+    def setMessage(self, message):
+        pass
+    
+    def isCancelled(self):
+        return False
+
+
+def _make_nuke() -> types.ModuleType:
+    nuke = types.ModuleType("nuke")
+    nuke.plugin_paths = []
+    nuke.messages = []
+    menus = {}
+    
+    nuke.pluginAddPath = nuke.plugin_paths.append
+    nuke.message = nuke.messages.append
+    nuke.tprint = print
+    nuke.menu = lambda name: menus.setdefault(name, _Menu(name))
+    nuke.Menu = _Menu
+    nuke.ProgressTask = _ProgressTask
+    nuke.executeInMainThread = lambda function, args=(), kwargs=None: function(*args, **(kwargs or {}))
+    return nuke
+
+
+def _make_panel_module(name: str, class_name: str) -> types.ModuleType:
+    module = types.ModuleType(name)
+    setattr(module, class_name, type(class_name, (), {
+        "show_dialog": staticmethod(lambda *args: None),
+        "show_dialog_async": staticmethod(lambda *args: None),
+    }))
+    return module
+
+
+def install() -> types.ModuleType:
+    """
+    Подставляет заглушки nuke, nukescripts и панелей в sys.modules.
+    Нужно вызывать до импорта ScriptsManager.
+    
+    Returns:
+        Модуль-заглушка nuke
+    """
+    if "nuke" not in sys.modules:
+        sys.modules["nuke"] = _make_nuke()
+        sys.modules["nukescripts"] = types.ModuleType("nukescripts")
+    for name, class_name in (("panels.scripts_manager_panel", "ScriptsManagerPanel"),
+                             ("panels.edit_script_panel", "EditScriptPanel")):
+        sys.modules.setdefault(name, _make_panel_module(name, class_name))
+    return sys.modules["nuke"]
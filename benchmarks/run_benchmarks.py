@@ -0,0 +1,263 @@
+"""
+Бенчмарки ScriptsManager на синтетических данных.
+
+Для каждого сценария (количество скриптов : количество пользователей)
+генерируется дерево скриптов, scripts_info.json и папки пользователей во
+временной папке, после чего замеряются поиск скриптов, чтение и запись
+информации о скриптах, create_user_default_settings и update_users_menu.
+Вместо nuke используется заглушка из fake_nuke.
+
+Результаты пишутся в JSON, чтобы сравнивать версии:
+
+    python benchmarks/run_benchmarks.py --preset default
+    python benchmarks/run_benchmarks.py --scenario 2000:50 --repeat 5 --output new.json --compare old.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import fake_nuke
+nuke = fake_nuke.install()
+
+import config
+import discovery_index
+import ScriptsManager
+from script_discovery import discover_scripts
+from script_info_manager import ScriptInfoManager, invalidate_info_cache
+from info_snapshot import snapshot_path_for
+from user_data_manager import UserDataManager
+from synthetic import generate_scripts_tree, generate_scripts_info, generate_users
+
+# Сценарии "скриптов:пользователей". В сценарии 20000:2000 файлы data.json
+# занимают несколько гигабайт, поэтому он вынесен в отдельный пресет
+PRESETS = {
+    "quick": ["1000:10"],
+    "default": ["1000:10", "5000:200", "20000:200"],
+    "full": ["1000:10", "5000:200", "20000:2000"],
+}
+
+
+def parse_scenario(text: str) -> Tuple[int, int]:
+    """Разбирает сценарий вида "5000:200"."""
+    scripts, users = text.split(":")
+    return int(scripts), int(users)
+
+
+def measure(function: Callable[[], object], repeat: int,
+            setup: Optional[Callable[[], None]] = None) -> Dict[str, object]:
+    """
+    Замеряет функцию repeat раз.
+    
+    Args:
+        function: Замеряемая функция
+        repeat: Количество запусков
+        setup: Подготовка перед каждым запуском (не входит в замер)
+        
+    Returns:
+        Словарь с временами запусков в секундах, минимумом и медианой
+    """
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        runs.append(time.perf_counter() - start)
+    return {"runs": runs, "min": min(runs), "median": statistics.median(runs)}
+
+
+def configure(workdir: str) -> None:
+    """Перенаправляет все пути config в папку сценария."""
+    config.SCRIPTS_DIR = f"{workdir}/scripts"
+    config.USERS_DIR = f"{workdir}/users"
+    config.INFO_FILE = f"{workdir}/scripts_info.json"
+    config.DISCOVERY_INDEX_FILE = f"{workdir}/discovery_index.json"
+    config.USERNAME = "bench_user"
+    config.USER_FOLDER = f"{config.USERS_DIR}/{config.USERNAME}"
+    config.USER_DATA_FILE = f"{config.USER_FOLDER}/data.json"
+    config.USER_MENU_FILE = f"{config.USER_FOLDER}/menu.py"
+    config.USER_STATE_DB_FILE = f"{config.USERS_DIR}/user_state.sqlite3"
+    config.STARTUP_TIMING_LOG = f"{workdir}/startup_timing.jsonl"
+    # Синтетическое дерево только что создано, и без этого индекс не доверял бы
+    # свежим mtime: теплый замер перечитывал бы все папки, как холодный
+    config.DISCOVERY_MTIME_GRACE = 0
+
+
+def reset_discovery_index(remove_file: bool) -> None:
+    """Сбрасывает индекс в памяти и, если нужно, на диске."""
+    discovery_index._index = None
+    if remove_file and os.path.exists(config.DISCOVERY_INDEX_FILE):
+        os.remove(config.DISCOVERY_INDEX_FILE)
+
+
+def remove_path(path: str) -> None:
+    """Удаляет файл или папку, если они существуют."""
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def remove_user_menus() -> None:
+    """Удаляет menu.py всех пользователей, чтобы update_users_menu записал их заново."""
+    for user in os.listdir(config.USERS_DIR):
+        remove_path(f"{config.USERS_DIR}/{user}/menu.py")
+
+
+def run_scenario(workdir: str, scripts_count: int, users_count: int, repeat: int) -> Dict[str, Dict]:
+    """
+    Генерирует данные сценария и замеряет все операции.
+    
+    Returns:
+        Словарь {имя_замера: результат measure}
+    """
+    configure(workdir)
+    scripts = generate_scripts_tree(config.SCRIPTS_DIR, scripts_count)
+    info = generate_scripts_info(config.INFO_FILE, scripts)
+    generate_users(config.USERS_DIR, users_count, list(scripts))
+    info_manager = ScriptInfoManager()
+    results = {}
+    
+    # Поиск скриптов
+    results["discover_full_walk"] = measure(lambda: discover_scripts(use_index=False), repeat)
+    results["discover_index_cold"] = measure(
+        lambda: discover_scripts(use_index=True), repeat, setup=lambda: reset_discovery_index(True))
+    results["discover_index_warm"] = measure(
+        lambda: discover_scripts(use_index=True), repeat, setup=lambda: reset_discovery_index(False))
+    warm_stats = discovery_index.get_discovery_index().get_stats()
+    assert warm_stats["hits"] > 0 and warm_stats["misses"] == 0, \
+        f"discover_index_warm не использовал индекс: {warm_stats}"
+    
+    # Информация о скриптах
+    snapshot_file = snapshot_path_for(config.INFO_FILE)
+    results["info_write"] = measure(
+        lambda: info_manager.save_scripts_info(info), repeat,
+        setup=lambda: info_manager.save_scripts_info({}))
+    results["info_read_json"] = measure(
+        info_manager.get_scripts_info, repeat,
+        setup=lambda: (invalidate_info_cache(), remove_path(snapshot_file)))
+    info_manager.save_scripts_info({})
+    info_manager.save_scripts_info(info)
+    results["info_read_snapshot"] = measure(info_manager.get_scripts_info, repeat, setup=invalidate_info_cache)
+    results["info_read_cached"] = measure(info_manager.get_scripts_info, repeat)
+    
+    # Первый запуск нового пользователя
+    results["create_user_default_settings"] = measure(
+        lambda: ScriptsManager.create_user_default_settings(UserDataManager()), repeat,
+        setup=lambda: remove_path(config.USER_FOLDER))
+    remove_path(config.USER_FOLDER)
+    
+    # Обновление меню всех пользователей: первый проход пишет все menu.py,
+    # повторный ничего не меняет, точечный затрагивает один скрипт
+    results["update_users_menu_cold"] = measure(ScriptsManager.update_users_menu, 1, setup=remove_user_menus)
+    results["update_users_menu_unchanged"] = measure(ScriptsManager.update_users_menu, repeat)
+    
+    changed_name = next(iter(info))
+    old_info = info_manager.get_scripts_info()
+    new_info = info_manager.get_scripts_info()
+    new_info[changed_name]["tooltip"] = "changed"
+    info_manager.save_scripts_info(new_info)
+    results["update_users_menu_one_script"] = measure(
+        lambda: ScriptsManager.update_users_menu(old_scripts_info=old_info), repeat)
+    return results
+
+
+def git_revision() -> str:
+    """Текущий коммит репозитория или пустая строка."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results: Dict, baseline_file: str) -> List[str]:
+    """
+    Сравнивает медианы с предыдущим файлом результатов.
+    
+    Returns:
+        Строки отчета "сценарий замер: было -> стало (xN)"
+    """
+    with open(baseline_file, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    lines = []
+    for scenario, measurements in results["scenarios"].items():
+        old_measurements = baseline.get("scenarios", {}).get(scenario, {})
+        for name, result in measurements.items():
+            if name not in old_measurements:
+                continue
+            old = old_measurements[name]["median"]
+            new = result["median"]
+            ratio = new / old if old else float("inf")
+            lines.append(f"{scenario:>12} {name:<32} {old * 1000:10.1f} -> {new * 1000:10.1f} мс (x{ratio:.2f})")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки ScriptsManager на синтетических данных")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick",
+                        help="Набор сценариев (по умолчанию quick)")
+    parser.add_argument("--scenario", action="append", default=[],
+                        help="Сценарий СКРИПТОВ:ПОЛЬЗОВАТЕЛЕЙ, можно указать несколько раз (заменяет пресет)")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество повторов каждого замера")
+    parser.add_argument("--output", help="Файл результатов (по умолчанию benchmarks/results/<дата>_<коммит>.json)")
+    parser.add_argument("--compare", help="Файл предыдущих результатов для сравнения")
+    parser.add_argument("--workdir", help="Папка для синтетических данных (по умолчанию временная)")
+    parser.add_argument("--keep", action="store_true", help="Не удалять синтетические данные")
+    args = parser.parse_args(argv)
+    
+    scenarios = [parse_scenario(text) for text in (args.scenario or PRESETS[args.preset])]
+    revision = git_revision()
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": revision,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "scenarios": {},
+    }
+    
+    base_dir = args.workdir or tempfile.mkdtemp(prefix="scripts_manager_bench_")
+    try:
+        for scripts_count, users_count in scenarios:
+            key = f"{scripts_count}:{users_count}"
+            workdir = os.path.join(base_dir, key.replace(":", "_")).replace("\\", "/")
+            remove_path(workdir)
+            print(f"Сценарий {key}...", flush=True)
+            results["scenarios"][key] = run_scenario(workdir, scripts_count, users_count, args.repeat)
+            for name, result in results["scenarios"][key].items():
+                print(f"    {name:<32} {result['median'] * 1000:10.1f} мс", flush=True)
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(base_dir, ignore_errors=True)
+    
+    output = args.output or os.path.join(
+        BENCHMARKS_DIR, "results", f"{time.strftime('%Y%m%d-%H%M%S')}_{revision or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=4, ensure_ascii=False)
+    print(f"Результаты записаны в {output}")
+    
+    if args.compare:
+        print("\n".join(compare(results, args.compare)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
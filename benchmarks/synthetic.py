@@ -0,0 +1,107 @@
+"""
+Генераторы синтетических данных для бенчмарков: дерево скриптов,
+scripts_info.json и папки пользователей.
+"""
+import os
+import json
+import random
+from typing import Dict, List
+
+# Сколько скриптов класть в одну папку и сколько папок верхнего уровня создавать
+SCRIPTS_PER_DIR = 25
+TOP_LEVEL_DIRS = 20
+
+SCRIPT_TEMPLATE = '''"""
+Синтетический скрипт {name}.
+"""
+
+
+def run():
+    pass
+'''
+
+
+def generate_scripts_tree(root: str, count: int) -> Dict[str, str]:
+    """
+    Создает дерево из count скриптов вида Category/Group/script_00001.py.
+    
+    Args:
+        root: Папка scripts
+        count: Количество скриптов
+        
+    Returns:
+        Словарь {имя_скрипта: путь_в_меню}, как у discover_scripts
+    """
+    scripts = {}
+    for i in range(count):
+        dir_number = i // SCRIPTS_PER_DIR
+        menu_path = f"Category{dir_number % TOP_LEVEL_DIRS:02d}/Group{dir_number:04d}"
+        folder = os.path.join(root, *menu_path.split("/"))
+        if i % SCRIPTS_PER_DIR == 0:
+            os.makedirs(folder, exist_ok=True)
+        name = f"script_{i:05d}"
+        with open(os.path.join(folder, f"{name}.py"), "w", encoding="utf-8") as file:
+            file.write(SCRIPT_TEMPLATE.format(name=name))
+        scripts[name] = menu_path
+    return scripts
+
+
+def generate_scripts_info(info_file: str, scripts: Dict[str, str], seed: int = 0) -> Dict[str, Dict]:
+    """
+    Создает scripts_info.json с записью для каждого скрипта.
+    Примерно каждый десятый скрипт использует кастомную команду.
+    
+    Args:
+        info_file: Путь к scripts_info.json
+        scripts: Словарь {имя_скрипта: путь_в_меню}
+        seed: Зерно генератора случайных чисел
+        
+    Returns:
+        Записанная информация о скриптах
+    """
+    rng = random.Random(seed)
+    info = {}
+    for i, (name, menu_path) in enumerate(scripts.items()):
+        custom = i % 10 == 0
+        info[name] = {
+            "default": rng.random() < 0.3,
+            "custom_cmd_checkbox": custom,
+            "command": f"import {name}; {name}.run()",
+            "custom_command": f"nuke.menu('Nuke').addCommand('{menu_path}/{name}', '{name}.run()')" if custom else "",
+            "tooltip": f"Синтетический скрипт номер {i}",
+            "icon": "",
+            "shortcut": "",
+            "shortcut_context": "Без контекста",
+            "index": -1,
+            "menu_path": f"{menu_path}/{name}",
+        }
+    with open(info_file, "w", encoding="utf-8") as file:
+        json.dump(info, file, indent=4, ensure_ascii=False)
+    return info
+
+
+def generate_users(users_dir: str, count: int, scripts: List[str], seed: int = 0) -> List[str]:
+    """
+    Создает папки пользователей с data.json, где включена случайная часть скриптов.
+    menu.py не создается - его строит update_users_menu.
+    
+    Args:
+        users_dir: Папка users
+        count: Количество пользователей
+        scripts: Имена скриптов
+        seed: Зерно генератора случайных чисел
+        
+    Returns:
+        Имена созданных пользователей
+    """
+    rng = random.Random(seed)
+    users = []
+    for i in range(count):
+        username = f"user{i:04d}"
+        folder = os.path.join(users_dir, username)
+        os.makedirs(folder, exist_ok=True)
+        data = {name: rng.random() < 0.2 for name in scripts}
+        with open(os.path.join(folder, "data.json"), "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=4, ensure_ascii=False)
+        users.append(username)
+    return users
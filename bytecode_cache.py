@@ -0,0 +1,355 @@
+"""
+Общий кэш байткода скриптов.
+
+Папка __pycache__ в дереве scripts исключена из обхода, а на сетевом ресурсе
+часто недоступна для записи, поэтому каждая сессия Nuke компилирует импортируемые
+скрипты заново. Администратор один раз компилирует все дерево в
+config.BYTECODE_CACHE_DIR/<cache_tag> (отдельная папка для каждой версии Python),
+а сессии берут оттуда готовый байткод и сами в кэш не пишут.
+
+В manifest.json кэша для каждого файла записан sha256 .pyc. Перед загрузкой
+.pyc сверяется с ним и с mtime и размером исходника из заголовка .pyc; при
+любом несовпадении скрипт компилируется из исходника обычным образом.
+
+Из командной строки файлы компилируются пулом процессов (запускать тем же
+Python, что в Nuke):
+    python bytecode_cache.py [--workers N] [--force]
+Модуль не зависит от nuke.
+"""
+import os
+import sys
+import marshal
+import hashlib
+import argparse
+import py_compile
+import importlib.machinery
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+import config
+from file_utils import read_json, write_json
+from tree_scanner import scan_tree, iter_tree, join_rel
+from script_finder import ScriptsFinder
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def cache_dir_for_python(base_dir: Optional[str] = None) -> str:
+    """Папка кэша для текущей версии Python, например bytecode_cache/cpython-310."""
+    return f"{base_dir or config.BYTECODE_CACHE_DIR}/{sys.implementation.cache_tag}"
+
+
+def _normalize(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path)).replace("\\", "/")
+
+
+class BytecodeCache:
+    """Кэш байткода одного дерева скриптов для текущей версии Python."""
+    
+    def __init__(self, root: Optional[str] = None, cache_dir: Optional[str] = None):
+        """
+        Args:
+            root: Корень дерева скриптов (по умолчанию config.SCRIPTS_DIR)
+            cache_dir: Папка кэша (по умолчанию cache_dir_for_python())
+        """
+        self.root = (root or config.SCRIPTS_DIR).replace("\\", "/")
+        self.cache_dir = cache_dir or cache_dir_for_python()
+        self.manifest_file = f"{self.cache_dir}/{MANIFEST_NAME}"
+        self._root_prefix = _normalize(self.root).rstrip("/") + "/"
+        self._files: Optional[Dict[str, Dict[str, Any]]] = None
+        self._module_names: Optional[Set[str]] = None
+        self.stats = {"loaded": 0, "rejected": 0}
+    
+    def pyc_path(self, rel: str) -> str:
+        """Путь к .pyc для исходника с относительным путем rel ("Tools/tool.py")."""
+        return f"{self.cache_dir}/{os.path.splitext(rel)[0]}.pyc"
+    
+    def rel_path(self, source_path: str) -> Optional[str]:
+        """Путь исходника относительно корня дерева или None, если он вне дерева."""
+        path = _normalize(source_path)
+        if not path.startswith(self._root_prefix):
+            return None
+        return path[len(self._root_prefix):]
+    
+    def get_files(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns:
+            Записи манифеста {относительный_путь: {"sha256", "mtime_ns", "size"}}.
+            Пустой словарь, если кэша нет или он собран другой версией Python
+        """
+        if self._files is None:
+            self._files = self._read_manifest()
+        return self._files
+    
+    def get_module_names(self) -> Set[str]:
+        """Имена модулей верхнего уровня, для которых может найтись байткод."""
+        if self._module_names is None:
+            names = set()
+            for rel in self.get_files():
+                parts = os.path.splitext(rel)[0].split("/")
+                names.add(parts[-1])
+                # Модули внутри пакетов импортируются через имя папки пакета
+                names.update(parts[:-1])
+            self._module_names = names
+        return self._module_names
+    
+    def load_code(self, source_path: str):
+        """
+        Загружает байткод скрипта из кэша.
+        
+        Args:
+            source_path: Путь к исходнику
+            
+        Returns:
+            Объект кода или None, если байткода нет, он поврежден или устарел
+        """
+        rel = self.rel_path(source_path)
+        entry = self.get_files().get(rel) if rel is not None else None
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(source_path)
+            with open(self.pyc_path(rel), "rb") as file:
+                data = file.read()
+        except OSError:
+            self.stats["rejected"] += 1
+            return None
+        
+        if hashlib.sha256(data).hexdigest() != entry["sha256"] or not _header_matches(data, stat):
+            self.stats["rejected"] += 1
+            return None
+        try:
+            code = marshal.loads(memoryview(data)[16:])
+        except (EOFError, ValueError, TypeError):
+            self.stats["rejected"] += 1
+            return None
+        self.stats["loaded"] += 1
+        return code
+    
+    def compile_tree(self, max_workers: Optional[int] = None, use_processes: bool = False,
+                     force: bool = False) -> Dict[str, Any]:
+        """
+        Компилирует все скрипты дерева в кэш. Неизмененные с прошлой компиляции
+        файлы пропускаются, .pyc удаленных скриптов удаляются. Манифест пишется
+        последним, поэтому сессии видят только полностью записанные .pyc.
+        
+        Args:
+            max_workers: Размер пула (по умолчанию config.BYTECODE_CACHE_WORKERS)
+            use_processes: Компилировать в пуле процессов (только вне Nuke)
+            force: Перекомпилировать все файлы
+            
+        Returns:
+            Словарь с ключами "compiled", "skipped", "removed" (количества)
+            и "failed" (список (относительный_путь, текст_ошибки))
+        """
+        tree = scan_tree(self.root)
+        sources = [join_rel(rel, f"{name}.py") for rel in iter_tree(tree) for name in tree[rel]["scripts"]]
+        old_files = {} if force else self._read_manifest()
+        
+        files: Dict[str, Dict[str, Any]] = {}
+        pending: List[Tuple[str, int, int]] = []
+        for rel in sources:
+            try:
+                stat = os.stat(f"{self.root}/{rel}")
+            except OSError:
+                continue
+            entry = old_files.get(rel)
+            if (entry is not None and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size)
+                    and os.path.isfile(self.pyc_path(rel))):
+                files[rel] = entry
+            else:
+                pending.append((rel, stat.st_mtime_ns, stat.st_size))
+        
+        failed = []
+        if pending:
+            workers = max(1, min(max_workers or config.BYTECODE_CACHE_WORKERS, len(pending)))
+            executor_class = ProcessPoolExecutor if use_processes and workers > 1 else ThreadPoolExecutor
+            chunksize = max(1, len(pending) // (workers * 4)) if executor_class is ProcessPoolExecutor else 1
+            tasks = [(f"{self.root}/{rel}", self.pyc_path(rel)) for rel, _, _ in pending]
+            with executor_class(max_workers=workers) as executor:
+                results = executor.map(_compile_file, tasks, chunksize=chunksize)
+                for (rel, mtime_ns, size), (digest, error) in zip(pending, results):
+                    if error is not None:
+                        failed.append((rel, error))
+                    else:
+                        files[rel] = {"sha256": digest, "mtime_ns": mtime_ns, "size": size}
+        
+        removed = 0
+        for rel in set(self._list_pyc()) - {os.path.splitext(rel)[0] for rel in files}:
+            try:
+                os.remove(f"{self.cache_dir}/{rel}.pyc")
+                removed += 1
+            except OSError:
+                pass
+        
+        write_json(self.manifest_file, {
+            "version": MANIFEST_VERSION,
+            "cache_tag": sys.implementation.cache_tag,
+            "magic": importlib.util.MAGIC_NUMBER.hex(),
+            "files": files,
+        })
+        self._files = files
+        self._module_names = None
+        return {"compiled": len(pending) - len(failed), "skipped": len(files) - len(pending) + len(failed),
+                "removed": removed, "failed": failed}
+    
+    def _read_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.isfile(self.manifest_file):
+            return {}
+        try:
+            manifest = read_json(self.manifest_file, default={})
+        except (IOError, ValueError):
+            return {}
+        if (not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION
+                or manifest.get("cache_tag") != sys.implementation.cache_tag
+                or manifest.get("magic") != importlib.util.MAGIC_NUMBER.hex()):
+            return {}
+        files = manifest.get("files")
+        return files if isinstance(files, dict) else {}
+    
+    def _list_pyc(self) -> List[str]:
+        """Относительные пути (без .pyc) всех файлов байткода в кэше."""
+        result = []
+        for folder, _, names in os.walk(self.cache_dir):
+            rel_folder = os.path.relpath(folder, self.cache_dir).replace("\\", "/")
+            for name in names:
+                if name.endswith(".pyc"):
+                    stem = name[:-len(".pyc")]
+                    result.append(stem if rel_folder == "." else f"{rel_folder}/{stem}")
+        return result
+
+
+class CachedSourceLoader(importlib.machinery.SourceFileLoader):
+    """Загрузчик скрипта, который сначала берет байткод из общего кэша."""
+    
+    def __init__(self, fullname: str, path: str, cache: BytecodeCache):
+        super().__init__(fullname, path)
+        self.cache = cache
+    
+    def get_code(self, fullname):
+        code = self.cache.load_code(self.path)
+        if code is None:
+            return super().get_code(fullname)
+        return code
+
+
+class BytecodeCacheFinder:
+    """
+    Finder в sys.meta_path, который подменяет загрузчик найденных скриптов
+    на CachedSourceLoader. Сам модуль ищут следующие за ним finder'ы
+    (ScriptsFinder или PathFinder), поэтому порядок поиска не меняется.
+    """
+    
+    def __init__(self, cache: BytecodeCache):
+        self.cache = cache
+    
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname.partition(".")[0] not in self.cache.get_module_names():
+            return None
+        
+        position = sys.meta_path.index(self) if self in sys.meta_path else len(sys.meta_path)
+        for finder in sys.meta_path[position + 1:]:
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            rel = self.cache.rel_path(spec.origin) if isinstance(spec.origin, str) else None
+            if (rel is not None and rel in self.cache.get_files()
+                    and type(spec.loader) is importlib.machinery.SourceFileLoader):
+                spec.loader = CachedSourceLoader(fullname, spec.origin, self.cache)
+                spec.cached = self.cache.pyc_path(rel)
+            return spec
+        return None
+
+
+_finder: Optional[BytecodeCacheFinder] = None
+
+
+def install_bytecode_cache(cache: Optional[BytecodeCache] = None) -> Optional[BytecodeCacheFinder]:
+    """
+    Включает загрузку скриптов из общего кэша байткода в этой сессии.
+    Finder ставится перед ScriptsFinder и PathFinder.
+    
+    Args:
+        cache: Кэш (по умолчанию BytecodeCache() для config.SCRIPTS_DIR)
+        
+    Returns:
+        Установленный finder или None, если кэш для этой версии Python не собран
+    """
+    global _finder
+    cache = cache or BytecodeCache()
+    if not cache.get_files():
+        return None
+    uninstall_bytecode_cache()
+    _finder = BytecodeCacheFinder(cache)
+    
+    position = len(sys.meta_path)
+    for i, finder in enumerate(sys.meta_path):
+        if finder is importlib.machinery.PathFinder or isinstance(finder, ScriptsFinder):
+            position = i
+            break
+    sys.meta_path.insert(position, _finder)
+    return _finder
+
+
+def uninstall_bytecode_cache() -> None:
+    """Убирает finder кэша байткода из sys.meta_path."""
+    if _finder is not None and _finder in sys.meta_path:
+        sys.meta_path.remove(_finder)
+
+
+def _compile_file(task: Tuple[str, str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Компилирует один файл. Выполняется в потоке или процессе пула.
+    
+    Returns:
+        (sha256 .pyc, None) или (None, текст_ошибки)
+    """
+    source_path, pyc_path = task
+    try:
+        py_compile.compile(source_path, cfile=pyc_path, dfile=source_path, doraise=True,
+                           invalidation_mode=py_compile.PycInvalidationMode.TIMESTAMP)
+        with open(pyc_path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest(), None
+    except py_compile.PyCompileError as e:
+        return None, e.msg.strip()
+    except OSError as e:
+        return None, str(e)
+
+
+def _header_matches(data: bytes, stat: os.stat_result) -> bool:
+    """Проверяет заголовок .pyc: версию байткода, mtime и размер исходника."""
+    if len(data) < 16 or data[:4] != importlib.util.MAGIC_NUMBER:
+        return False
+    if int.from_bytes(data[4:8], "little") != 0:
+        return False
+    mtime = int.from_bytes(data[8:12], "little")
+    size = int.from_bytes(data[12:16], "little")
+    return mtime == int(stat.st_mtime) & 0xFFFFFFFF and size == stat.st_size & 0xFFFFFFFF
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Компилирует дерево скриптов в общий кэш байткода."""
+    parser = argparse.ArgumentParser(description="Общий кэш байткода скриптов")
+    parser.add_argument("--workers", type=int, default=None, help="Количество процессов")
+    parser.add_argument("--force", action="store_true", help="Перекомпилировать все файлы")
+    args = parser.parse_args(argv)
+    
+    cache = BytecodeCache()
+    if not os.path.isdir(cache.root):
+        print(f"Нет папки со скриптами: {cache.root}")
+        return 1
+    report = cache.compile_tree(max_workers=args.workers, use_processes=True, force=args.force)
+    print(f"Кэш: {cache.cache_dir}")
+    print(f"Скомпилировано: {report['compiled']}, без изменений: {report['skipped']}, "
+          f"удалено: {report['removed']}, ошибок: {len(report['failed'])}")
+    for rel, error in report["failed"]:
+        print(f"  {rel}: {error}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
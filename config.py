@@ -12,6 +12,10 @@ USERS_DIR = f"{CURRENT_DIR}/users"
 
 # Файлы
 INFO_FILE = f"{CURRENT_DIR}/scripts_info.json"
+DISCOVERY_INDEX_FILE = f"{CURRENT_DIR}/discovery_index.json"
+METADATA_CACHE_FILE = f"{CURRENT_DIR}/metadata_cache.json"
+# Общий кэш байткода скриптов, внутри - папка для каждой версии Python
+BYTECODE_CACHE_DIR = f"{CURRENT_DIR}/bytecode_cache"
 
 # Пользовательские настройки
 USERNAME = getpass.getuser()
@@ -19,6 +23,27 @@ USER_FOLDER = f"{USERS_DIR}/{USERNAME}"
 USER_DATA_FILE = f"{USER_FOLDER}/data.json"
 USER_MENU_FILE = f"{USER_FOLDER}/menu.py"
 
+# Где хранить состояния скриптов пользователей:
+# "json" - файл users/<имя>/data.json у каждого пользователя;
+# "sqlite" - одна база USER_STATE_DB_FILE (menu.py по-прежнему лежит в папке пользователя).
+# Перенести существующие data.json в базу можно через ScriptsManager.migrate_user_data_to_sqlite().
+# Блокировки SQLite ненадежны на некоторых сетевых файловых системах (особенно старых NFS),
+# поэтому базу стоит держать на ресурсе с рабочими блокировками.
+USER_STATE_BACKEND = "json"
+USER_STATE_DB_FILE = f"{USERS_DIR}/user_state.sqlite3"
+# Сколько секунд ждать освобождения блокировки базы
+SQLITE_TIMEOUT = 30.0
+
+# Замерять ли время этапов запуска (menu.py и menu.py пользователя)
+STARTUP_TIMING = True
+# Журнал замеров в папке пользователя и сколько последних сессий в нем оставлять
+# (журнал сокращается при просмотре замеров, а не при запуске)
+STARTUP_TIMING_LOG = f"{USER_FOLDER}/startup_timing.jsonl"
+STARTUP_TIMING_KEEP_SESSIONS = 30
+
+# Количество потоков для параллельного обновления меню пользователей
+UPDATE_USERS_WORKERS = 8
+
 # Пользователи с правами администратора
 ADMIN_USERS = ["apushkarev", "pushk"]
 
@@ -35,6 +60,55 @@ SHORTCUT_CONTEXT_LABELS = list(SHORTCUT_CONTEXTS.keys())
 # Исключаемые папки при сканировании
 EXCLUDED_DIRS = ["__pycache__"]
 
+# Использовать ли индекс найденных скриптов вместо полного обхода папки scripts
+USE_DISCOVERY_INDEX = True
+# Папки, измененные менее чем столько секунд назад, не считаются проверенными,
+# так как на некоторых файловых системах точность mtime - 1-2 секунды
+DISCOVERY_MTIME_GRACE = 2.0
+# Количество потоков для параллельного обхода папки scripts (1 - последовательный обход)
+DISCOVERY_SCAN_WORKERS = 8
+# Количество потоков (в Nuke) или процессов (python metadata_extractor.py)
+# для разбора исходников скриптов при заполнении scripts_info.json
+METADATA_WORKERS = 8
+
+# Как сделать скрипты доступными для импорта:
+# "plugin_path" - каждая папка внутри scripts добавляется в pluginPath (и sys.path);
+# "finder" - один finder в sys.meta_path находит модуль скрипта по индексу.
+# В режиме "finder" Nuke не видит папки скриптов, поэтому их init.py/menu.py
+# не выполняются, а иконки нужно класть в папку, которая есть в pluginPath.
+PLUGIN_PATH_MODE = "plugin_path"
+
+# Сохранять ли рядом с scripts_info.json двоичный снимок scripts_info.snapshot.
+# На старте Nuke читает снимок вместо разбора JSON, пока JSON не изменится
+USE_INFO_SNAPSHOT = True
+
+# Загружать ли скрипты из общего кэша байткода (BYTECODE_CACHE_DIR), если администратор
+# его собрал командой Edit/Scripts Manager/Precompile Scripts. Сессии в кэш не пишут
+USE_BYTECODE_CACHE = True
+# Количество потоков (в Nuke) или процессов (python bytecode_cache.py) для компиляции
+BYTECODE_CACHE_WORKERS = 8
+
+# Следить ли во время работы Nuke за папкой scripts и scripts_info.json и подхватывать
+# новые скрипты и изменения меню без перезапуска
+SCRIPT_WATCHER = False
+# Способ наблюдения: "auto" - inotify для локальных папок в Linux, иначе опрос mtime;
+# "inotify"; "poll". inotify не видит изменений, сделанных на других машинах
+# в сетевой папке, поэтому для сетевых файловых систем "auto" выбирает опрос
+SCRIPT_WATCHER_BACKEND = "auto"
+# Интервал опроса mtime в секундах
+SCRIPT_WATCHER_POLL_INTERVAL = 5.0
+# Сколько секунд ждать после последнего изменения, прежде чем обновлять меню
+SCRIPT_WATCHER_DEBOUNCE = 1.0
+
+# Делать ли fsync после записи каждого файла. Внутри file_utils.batch_writes()
+# откладывается только fsync папок: по одному на папку в конце пакета
+FSYNC_WRITES = True
+# Делать ли fsync при обновлении меню всех пользователей. Без него сотни
+# menu.py и data.json не ждут диск по отдельности, но после сбоя питания
+# недавно записанный файл может оказаться пустым - тогда достаточно еще раз
+# запустить Update Users Menus
+UPDATE_USERS_FSYNC = False
+
 # Формат JSON для сохранения
 JSON_INDENT = 4
 JSON_ENSURE_ASCII = False
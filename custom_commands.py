@@ -0,0 +1,151 @@
+"""
+Разбор кастомных команд скриптов (поле custom_command в scripts_info.json).
+
+Команда разбирается модулем ast один раз при сохранении информации о скрипте,
+а найденные пути меню хранятся в scripts_info.json в поле custom_menu_paths.
+Скомпилированный код команд кэшируется по хэшу текста на время сессии.
+Модуль не зависит от nuke.
+"""
+import ast
+import hashlib
+import threading
+from types import CodeType
+from typing import Any, Dict, List, Optional
+
+# Поле scripts_info.json с путями меню, которые создает кастомная команда
+MENU_PATHS_KEY = "custom_menu_paths"
+
+# Имя "файла" в трейсбеках ошибок кастомных команд
+COMMAND_FILENAME = "<custom_command>"
+
+# Кэш скомпилированных команд {sha256 текста: код}
+_code_cache: Dict[str, CodeType] = {}
+_code_cache_lock = threading.Lock()
+
+
+def extract_menu_paths(custom_command: str) -> List[str]:
+    """
+    Находит пути меню всех вызовов addCommand в кастомной команде.
+    Учитываются вызовы на нескольких строках и путь, переданный через name=.
+    
+    Args:
+        custom_command: Текст кастомной команды
+        
+    Returns:
+        Список путей меню в порядке появления в команде
+    """
+    try:
+        tree = ast.parse(custom_command)
+    except (SyntaxError, ValueError):
+        return _extract_menu_paths_by_lines(custom_command)
+    
+    calls = [
+        node for node in ast.walk(tree)
+        if isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == "addCommand"
+    ]
+    calls.sort(key=lambda node: (node.lineno, node.col_offset))
+    
+    menu_paths = []
+    for call in calls:
+        menu_path = _call_menu_path(call)
+        if menu_path:
+            menu_paths.append(menu_path)
+    return menu_paths
+
+
+def with_menu_paths(script_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Возвращает копию информации о скрипте с актуальным полем custom_menu_paths.
+    Для скриптов без кастомной команды поле убирается.
+    
+    Args:
+        script_info: Информация о скрипте
+        
+    Returns:
+        Информация о скрипте (исходный словарь, если менять нечего)
+    """
+    if script_info.get("custom_cmd_checkbox", False):
+        menu_paths = extract_menu_paths(script_info.get("custom_command", ""))
+        if script_info.get(MENU_PATHS_KEY) == menu_paths:
+            return script_info
+        return dict(script_info, **{MENU_PATHS_KEY: menu_paths})
+    
+    if MENU_PATHS_KEY in script_info:
+        script_info = dict(script_info)
+        del script_info[MENU_PATHS_KEY]
+    return script_info
+
+
+def compile_custom_command(custom_command: str) -> CodeType:
+    """
+    Компилирует кастомную команду. Одинаковый текст компилируется один раз.
+    
+    Args:
+        custom_command: Текст кастомной команды
+        
+    Returns:
+        Объект кода для exec
+        
+    Raises:
+        SyntaxError: Если в команде синтаксическая ошибка
+    """
+    key = hashlib.sha256(custom_command.encode("utf-8")).hexdigest()
+    with _code_cache_lock:
+        code = _code_cache.get(key)
+    if code is None:
+        code = compile(custom_command, COMMAND_FILENAME, "exec")
+        with _code_cache_lock:
+            _code_cache[key] = code
+    return code
+
+
+def validate_custom_command(custom_command: str) -> Optional[str]:
+    """
+    Проверяет, что кастомная команда компилируется. Скомпилированный код
+    остается в кэше и будет использован при создании меню.
+    
+    Args:
+        custom_command: Текст кастомной команды
+        
+    Returns:
+        Описание ошибки или None, если ошибок нет
+    """
+    try:
+        compile_custom_command(custom_command)
+    except SyntaxError as e:
+        return f"Строка {e.lineno}: {e.msg}\n{(e.text or '').rstrip()}"
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def clear_code_cache() -> None:
+    """Очищает кэш скомпилированных команд."""
+    with _code_cache_lock:
+        _code_cache.clear()
+
+
+def _call_menu_path(call: ast.Call) -> Optional[str]:
+    """Путь меню из вызова addCommand, если он задан строкой."""
+    if call.args:
+        argument = call.args[0]
+    else:
+        argument = next((keyword.value for keyword in call.keywords if keyword.arg == "name"), None)
+    if isinstance(argument, ast.Constant) and isinstance(argument.value, str):
+        return argument.value
+    return None
+
+
+def _extract_menu_paths_by_lines(custom_command: str) -> List[str]:
+    """Построчный поиск для команд, которые не удалось разобрать (старое поведение)."""
+    menu_paths = []
+    for line in custom_command.split("\n"):
+        if line.count(".addCommand(") == 1:
+            try:
+                menu_path = line.split(".addCommand(")[1].split(",")[0].strip("'").strip('"')
+                menu_paths.append(menu_path)
+            except Exception:
+                pass
+    return menu_paths
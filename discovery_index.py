@@ -0,0 +1,261 @@
+"""
+Персистентный индекс скриптов в директории scripts.
+
+Индекс хранит для каждой папки ее mtime, список скриптов и вложенных папок.
+При проверке индекса делается только stat каждой папки, а заново читаются
+лишь те папки, mtime которых изменился. Это сильно дешевле полного os.walk
+на сетевом диске.
+"""
+import os
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+import config
+from file_utils import read_json, write_json
+from tree_scanner import scan_dir, scan_tree, iter_tree, scripts_from_tree, modules_from_tree, abs_path, join_rel
+
+INDEX_VERSION = 1
+
+
+class DiscoveryIndex:
+    """Класс для инкрементального поиска скриптов с сохранением индекса на диск."""
+    
+    def __init__(self, root: Optional[str] = None, index_file: Optional[str] = None):
+        """
+        Args:
+            root: Корневая папка со скриптами (по умолчанию config.SCRIPTS_DIR)
+            index_file: Путь к файлу индекса (по умолчанию config.DISCOVERY_INDEX_FILE)
+        """
+        self.root = (root or config.SCRIPTS_DIR).replace("\\", "/")
+        self.index_file = index_file or config.DISCOVERY_INDEX_FILE
+        # {относительный_путь: {"mtime": int|None, "scripts": [...], "subdirs": [...]}}
+        self._dirs: Dict[str, Dict] = {}
+        self._loaded = False
+        self._dirty = False
+        self.stats = {"hits": 0, "misses": 0, "full_rescans": 0, "loads": 0}
+        # Индекс обновляется и из фонового потока ScriptsManagerPanel, и из главного
+        self._lock = threading.RLock()
+    
+    # ------------------------------------------------------------------
+    # Публичный интерфейс
+    # ------------------------------------------------------------------
+    
+    def refresh(self, on_dir: Optional[Callable[[str, Dict], None]] = None) -> None:
+        """
+        Сверяет индекс с файловой системой и перечитывает измененные папки.
+        Если индекса нет или он поврежден, выполняется полный обход.
+        
+        Args:
+            on_dir: Вызывается для каждой папки с ее относительным путем и записью
+                индекса: при полном обходе - для прочитанных папок (см. tree_scanner.scan_tree),
+                при проверке индекса - для каждой проверенной папки. Исключение из on_dir
+                прерывает обновление, уже проверенные папки остаются в индексе
+        """
+        with self._lock:
+            self._refresh(on_dir)
+    
+    def _refresh(self, on_dir: Optional[Callable[[str, Dict], None]]) -> None:
+        if not os.path.isdir(self.root):
+            if self._dirs:
+                self._dirs = {}
+                self._dirty = True
+            return
+        
+        if not self._loaded:
+            self._load()
+        
+        if not self._dirs:
+            self.full_rescan(on_dir)
+        else:
+            try:
+                self._validate(on_dir)
+            except OSError:
+                self.full_rescan(on_dir)
+        
+        if self._dirty:
+            self.save()
+    
+    def full_rescan(self, on_dir: Optional[Callable[[str, Dict], None]] = None) -> None:
+        """
+        Полностью перестраивает индекс обходом всего дерева.
+        Если обход прерван исключением, индекс остается прежним.
+        """
+        with self._lock:
+            self.stats["full_rescans"] += 1
+            tree = scan_tree(self.root, on_dir=on_dir)
+            self._dirs = {rel: self._apply_grace(entry) for rel, entry in tree.items()}
+            self._dirty = True
+    
+    def save(self) -> None:
+        """
+        Сохраняет индекс на диск. Ошибки записи игнорируются,
+        так как индекс - это только ускорение.
+        """
+        with self._lock:
+            data = {
+                "version": INDEX_VERSION,
+                "root": self.root,
+                "excluded": sorted(config.EXCLUDED_DIRS),
+                "dirs": self._dirs,
+            }
+            try:
+                write_json(self.index_file, data)
+                self._dirty = False
+            except (IOError, OSError):
+                pass
+    
+    def get_scripts(self) -> Dict[str, str]:
+        """
+        Возвращает найденные скрипты в том же виде, что и discover_scripts.
+        
+        Returns:
+            Словарь {имя_скрипта: путь_в_меню}
+        """
+        return scripts_from_tree(self.snapshot())
+    
+    def get_script_folders(self) -> Dict[str, str]:
+        """
+        Returns:
+            Словарь {имя_скрипта: абсолютный_путь_к_папке}
+        """
+        return {name: self._abs_path(rel) for name, rel in self.get_scripts().items()}
+    
+    def get_modules(self) -> Dict[str, Tuple[str, bool]]:
+        """
+        Returns:
+            Словарь {имя_модуля: (путь_к_файлу, является_ли_пакетом)} для ScriptsFinder
+        """
+        return modules_from_tree(self.root, self.snapshot())
+    
+    def get_dirs(self) -> List[str]:
+        """
+        Returns:
+            Список всех папок дерева (включая корень) в порядке обхода os.walk
+        """
+        return [self._abs_path(rel) for rel in iter_tree(self.snapshot())]
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Returns:
+            Копия индекса {относительный_путь: запись}, которую можно читать,
+            пока индекс обновляется в другом потоке (записи папок не изменяются,
+            а заменяются целиком)
+        """
+        with self._lock:
+            return dict(self._dirs)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            Статистика работы индекса: hits - папки, подтвержденные по mtime,
+            misses - перечитанные папки, full_rescans - полные обходы,
+            loads - чтения индекса с диска
+        """
+        return dict(self.stats)
+    
+    # ------------------------------------------------------------------
+    # Внутренние методы
+    # ------------------------------------------------------------------
+    
+    def _load(self) -> None:
+        """Читает индекс с диска. Неподходящий индекс просто отбрасывается."""
+        self._loaded = True
+        try:
+            data = read_json(self.index_file, default={})
+        except (IOError, ValueError):
+            return
+        
+        if (data.get("version") != INDEX_VERSION
+                or data.get("root") != self.root
+                or data.get("excluded") != sorted(config.EXCLUDED_DIRS)):
+            return
+        dirs = data.get("dirs")
+        if isinstance(dirs, dict) and "" in dirs:
+            self._dirs = dirs
+            self.stats["loads"] += 1
+    
+    def _validate(self, on_dir: Optional[Callable[[str, Dict], None]] = None) -> None:
+        """Обходит индекс и перечитывает папки с изменившимся mtime."""
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            entry = self._dirs.get(rel)
+            if entry is None:
+                continue
+            
+            try:
+                mtime = os.stat(self._abs_path(rel)).st_mtime_ns
+            except OSError:
+                # Папка удалена - удаляем все поддерево
+                self._drop_subtree(rel)
+                self._dirty = True
+                continue
+            
+            if entry["mtime"] is not None and entry["mtime"] == mtime:
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+                old_subdirs = set(entry["subdirs"])
+                self._dirs[rel] = self._scan_dir(rel)
+                self._dirty = True
+                
+                new_subdirs = self._dirs[rel]["subdirs"]
+                for name in old_subdirs - set(new_subdirs):
+                    self._drop_subtree(self._join(rel, name))
+                for name in new_subdirs:
+                    if name not in old_subdirs:
+                        self._scan_subtree(self._join(rel, name))
+            
+            if on_dir is not None:
+                on_dir(rel, self._dirs[rel])
+            
+            # Добавляем в обратном порядке, чтобы обход шел в порядке os.walk
+            for name in reversed(self._dirs[rel]["subdirs"]):
+                child = self._join(rel, name)
+                if child in self._dirs:
+                    stack.append(child)
+    
+    def _scan_subtree(self, rel: str) -> None:
+        """Полностью сканирует поддерево, начиная с папки rel (параллельно)."""
+        for current, entry in scan_tree(self.root, rel).items():
+            self._dirs[current] = self._apply_grace(entry)
+    
+    def _scan_dir(self, rel: str) -> Dict:
+        """Читает содержимое одной папки."""
+        return self._apply_grace(scan_dir(self._abs_path(rel)))
+    
+    @staticmethod
+    def _apply_grace(entry: Dict) -> Dict:
+        """
+        Свежеизмененную папку не считаем проверенной: изменения в ту же секунду
+        могут не отразиться в mtime.
+        """
+        if entry["mtime"] is not None and time.time() - entry["mtime"] / 1e9 < config.DISCOVERY_MTIME_GRACE:
+            entry["mtime"] = None
+        return entry
+    
+    def _drop_subtree(self, rel: str) -> None:
+        """Удаляет папку и все вложенные папки из индекса."""
+        prefix = f"{rel}/"
+        for key in [k for k in self._dirs if k == rel or k.startswith(prefix) or rel == ""]:
+            del self._dirs[key]
+    
+    def _abs_path(self, rel: str) -> str:
+        return abs_path(self.root, rel)
+    
+    @staticmethod
+    def _join(rel: str, name: str) -> str:
+        return join_rel(rel, name)
+
+
+_index: Optional[DiscoveryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_discovery_index() -> DiscoveryIndex:
+    """Возвращает общий для сессии экземпляр индекса."""
+    global _index
+    with _index_lock:
+        if _index is None or _index.root != config.SCRIPTS_DIR.replace("\\", "/"):
+            _index = DiscoveryIndex()
+        return _index
@@ -3,9 +3,22 @@
 """
 import os
 import json
-from typing import Dict, Any, Optional
+import stat
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Set, Union
 import config
 
+_write_stats = {"written": 0, "skipped": 0}
+_write_stats_lock = threading.Lock()
+
+# Состояние batch_writes: глубина вложенности, папки с отложенным fsync и
+# сколько открытых пакетов попросили не делать fsync вовсе
+_batch_state = {"depth": 0, "dirs": set(), "no_fsync": 0}
+_batch_lock = threading.Lock()
+
 
 def read_json(file_path: str, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
@@ -40,51 +53,264 @@ def read_json(file_path: str, default: Optional[Dict[str, Any]] = None) -> Dict[
         raise IOError(f"Не удалось прочитать файл {file_path}: {e}")
 
 
-def write_json(file_path: str, data: Dict[str, Any]) -> None:
+def write_json(file_path: str, data: Dict[str, Any]) -> bool:
     """
     Безопасная запись JSON файла.
+    Если на диске уже лежит точно такое же содержимое, файл не перезаписывается.
     
     Args:
         file_path: Путь к JSON файлу
         data: Данные для записи
         
+    Returns:
+        True если файл был записан, False если содержимое не изменилось
+        
     Raises:
         IOError: Если не удалось записать файл
         OSError: Если не удалось создать директорию
     """
     try:
-        # Создаем директорию, если её нет
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        with open(file_path, "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=config.JSON_INDENT, 
-                     ensure_ascii=config.JSON_ENSURE_ASCII)
+        content = json.dumps(data, indent=config.JSON_INDENT,
+                             ensure_ascii=config.JSON_ENSURE_ASCII)
+        return _write_if_changed(file_path, content)
     except Exception as e:
         raise IOError(f"Не удалось записать файл {file_path}: {e}")
 
 
-def write_text_file(file_path: str, content: str) -> None:
+def write_text_file(file_path: str, content: str) -> bool:
     """
     Безопасная запись текстового файла.
+    Если на диске уже лежит точно такое же содержимое, файл не перезаписывается.
     
     Args:
         file_path: Путь к файлу
         content: Содержимое для записи
         
+    Returns:
+        True если файл был записан, False если содержимое не изменилось
+        
     Raises:
         IOError: Если не удалось записать файл
         OSError: Если не удалось создать директорию
     """
     try:
-        # Создаем директорию, если её нет
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(content)
+        return _write_if_changed(file_path, content)
     except Exception as e:
         raise IOError(f"Не удалось записать файл {file_path}: {e}")
 
 
+def _is_same_content(file_path: str, content: str) -> bool:
+    """
+    Проверяет, что файл на диске уже содержит content.
+    Сначала сравнивается размер, поэтому файл читается только если размер совпал.
+    """
+    try:
+        size = os.stat(file_path).st_size
+    except OSError:
+        return False
+    
+    # Файлы пишутся в текстовом режиме, поэтому на Windows каждый \n становится \r\n
+    expected_size = len(content.encode("utf-8"))
+    if os.linesep != "\n":
+        expected_size += content.count("\n") * (len(os.linesep) - 1)
+    if size != expected_size:
+        return False
+    
+    try:
+        with open(file_path, "r", encoding="utf-8") as file:
+            return file.read() == content
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
+def _write_if_changed(file_path: str, content: str) -> bool:
+    """Записывает файл, если его содержимое отличается, и обновляет статистику."""
+    if _is_same_content(file_path, content):
+        _count_write(skipped=True)
+        return False
+    
+    # Создаем директорию, если её нет
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    
+    _atomic_write(file_path, content)
+    _count_write(skipped=False)
+    return True
+
+
+def write_binary_file(file_path: str, content: bytes) -> None:
+    """
+    Атомарно записывает двоичный файл.
+    
+    Args:
+        file_path: Путь к файлу
+        content: Содержимое
+        
+    Raises:
+        IOError: Если не удалось записать файл
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        ensure_dir(directory)
+    _atomic_write(file_path, content)
+
+
+def _atomic_write(file_path: str, content: Union[str, bytes]) -> None:
+    """
+    Атомарно записывает файл: содержимое пишется во временный файл в той же
+    папке, который затем переименовывается поверх целевого. Nuke, запущенный
+    посреди записи, видит либо старый, либо новый файл целиком.
+    
+    Временный файл сбрасывается на диск до переименования, иначе после сбоя
+    питания на месте файла может оказаться пустой. Внутри batch_writes fsync
+    папки откладывается, а при batch_writes(fsync=False) fsync не делается.
+    """
+    directory = os.path.dirname(file_path) or "."
+    fsync = _fsync_enabled()
+    temp_path = os.path.join(directory, f".{os.path.basename(file_path)}.{uuid.uuid4().hex}.tmp")
+    
+    # Права 0o666 с учетом umask, как у обычного open(..., "w"), а не 0o600 как у mkstemp
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        if isinstance(content, bytes):
+            file = os.fdopen(fd, "wb")
+        else:
+            file = os.fdopen(fd, "w", encoding="utf-8")
+        with file:
+            file.write(content)
+            file.flush()
+            if fsync:
+                os.fsync(file.fileno())
+        _copy_mode(file_path, temp_path)
+        _replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    
+    if fsync and not _defer_dir_sync(directory):
+        _fsync_dir(directory)
+
+
+def _copy_mode(source: str, destination: str) -> None:
+    """Переносит права существующего файла на новый, чтобы запись их не меняла."""
+    try:
+        os.chmod(destination, stat.S_IMODE(os.stat(source).st_mode))
+    except OSError:
+        pass
+
+
+def _replace(source: str, destination: str, attempts: int = 5) -> None:
+    """
+    os.replace с повторами: на Windows переименование падает с PermissionError,
+    пока целевой файл открыт другим процессом.
+    """
+    for attempt in range(attempts):
+        try:
+            os.replace(source, destination)
+            return
+        except PermissionError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.05 * (attempt + 1))
+
+
+def _fsync_enabled() -> bool:
+    """Нужен ли fsync: включен в настройках и не отключен открытым batch_writes."""
+    if not config.FSYNC_WRITES:
+        return False
+    with _batch_lock:
+        return _batch_state["no_fsync"] == 0
+
+
+def _defer_dir_sync(directory: str) -> bool:
+    """Откладывает fsync папки до конца batch_writes, если пакет открыт."""
+    with _batch_lock:
+        if _batch_state["depth"] > 0:
+            _batch_state["dirs"].add(directory)
+            return True
+    return False
+
+
+def _fsync_dir(directory: str) -> None:
+    """
+    Сбрасывает на диск запись папки, чтобы переименование пережило сбой питания.
+    На Windows папку открыть нельзя, там это не требуется.
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def batch_writes(fsync: bool = True):
+    """
+    Контекст для массовой записи файлов (например, обновления меню всех пользователей).
+    
+    Внутри блока каждый файл по-прежнему пишется атомарно через переименование.
+    
+    Args:
+        fsync: True - каждый файл сбрасывается на диск до переименования, а fsync
+            папок выполняется при выходе из блока по одному разу на папку.
+            False - fsync внутри блока не делается совсем: после сбоя питания
+            недавно записанный файл может оказаться пустым, зато сотни файлов
+            не ждут диск по отдельности. Подходит для файлов, которые можно
+            сгенерировать заново
+    """
+    with _batch_lock:
+        _batch_state["depth"] += 1
+        if not fsync:
+            _batch_state["no_fsync"] += 1
+    try:
+        yield
+    finally:
+        with _batch_lock:
+            _batch_state["depth"] -= 1
+            if not fsync:
+                _batch_state["no_fsync"] -= 1
+            dirs = set()
+            if _batch_state["depth"] == 0:
+                dirs, _batch_state["dirs"] = _batch_state["dirs"], set()
+        if dirs:
+            _sync_dirs(dirs)
+
+
+def _sync_dirs(directories: Set[str]) -> None:
+    """Сбрасывает на диск отложенные папки. Глобальный os.sync не используется."""
+    for directory in sorted(directories):
+        _fsync_dir(directory)
+
+
+def _count_write(skipped: bool) -> None:
+    with _write_stats_lock:
+        _write_stats["skipped" if skipped else "written"] += 1
+
+
+def get_write_stats() -> Dict[str, int]:
+    """
+    Returns:
+        Статистика записи файлов за сессию: written - записанные файлы,
+        skipped - пропущенные, так как содержимое не изменилось
+    """
+    with _write_stats_lock:
+        return dict(_write_stats)
+
+
+def reset_write_stats() -> None:
+    """Обнуляет статистику записи файлов."""
+    with _write_stats_lock:
+        _write_stats["written"] = 0
+        _write_stats["skipped"] = 0
+
+
 def ensure_dir(directory: str) -> None:
     """
     Создает директорию, если её не существует.
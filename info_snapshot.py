@@ -0,0 +1,111 @@
+"""
+Двоичный снимок scripts_info.json для быстрого старта.
+
+Снимок хранит уже разобранный словарь в формате marshal и заголовок с версией
+формата, версией Python, размером, mtime и sha256 исходного JSON. Если stat
+JSON совпадает с заголовком, снимок используется сразу; иначе сравнивается
+sha256 байтов JSON, и только при несовпадении приходится разбирать JSON.
+"""
+import os
+import sys
+import json
+import struct
+import marshal
+import hashlib
+from typing import Any, Dict, Optional
+from file_utils import write_binary_file
+
+SNAPSHOT_MAGIC = b"SMINFO\x00\x01"
+SNAPSHOT_VERSION = 1
+# Длина заголовка в байтах записывается сразу после магической последовательности
+_HEADER_SIZE = struct.Struct("<I")
+
+
+def snapshot_path_for(json_path: str) -> str:
+    """Путь к снимку рядом с JSON файлом: scripts_info.json -> scripts_info.snapshot."""
+    return f"{os.path.splitext(json_path)[0]}.snapshot"
+
+
+def _runtime_tag() -> tuple:
+    """Формат marshal зависит от версии Python, поэтому она входит в заголовок."""
+    return (SNAPSHOT_VERSION, tuple(sys.version_info[:2]), marshal.version)
+
+
+def write_snapshot(json_path: str, snapshot_path: Optional[str] = None) -> bool:
+    """
+    Создает снимок по текущему содержимому JSON файла на диске.
+    
+    Снимок строится из прочитанных байтов, а не из словаря в памяти, поэтому
+    он всегда соответствует тому, что реально лежит в JSON.
+    
+    Args:
+        json_path: Путь к JSON файлу
+        snapshot_path: Путь к снимку (по умолчанию рядом с JSON)
+        
+    Returns:
+        True если снимок записан, False если JSON не удалось прочитать
+        
+    Raises:
+        IOError: Если не удалось записать снимок
+    """
+    snapshot_path = snapshot_path or snapshot_path_for(json_path)
+    try:
+        with open(json_path, "rb") as file:
+            st = os.fstat(file.fileno())
+            raw = file.read()
+        data = json.loads(raw.decode("utf-8"))
+    except (OSError, ValueError):
+        return False
+    if not isinstance(data, dict):
+        return False
+    
+    header = marshal.dumps((
+        _runtime_tag(),
+        st.st_size,
+        st.st_mtime_ns,
+        hashlib.sha256(raw).hexdigest(),
+    ))
+    payload = marshal.dumps(data)
+    write_binary_file(snapshot_path, SNAPSHOT_MAGIC + _HEADER_SIZE.pack(len(header)) + header + payload)
+    return True
+
+
+def read_snapshot(json_path: str, snapshot_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Читает снимок, если он соответствует JSON файлу.
+    
+    Args:
+        json_path: Путь к JSON файлу
+        snapshot_path: Путь к снимку (по умолчанию рядом с JSON)
+        
+    Returns:
+        Словарь из снимка или None, если снимка нет, он устарел или поврежден
+    """
+    snapshot_path = snapshot_path or snapshot_path_for(json_path)
+    try:
+        with open(snapshot_path, "rb") as file:
+            blob = file.read()
+        if not blob.startswith(SNAPSHOT_MAGIC):
+            return None
+        offset = len(SNAPSHOT_MAGIC)
+        (header_size,) = _HEADER_SIZE.unpack_from(blob, offset)
+        offset += _HEADER_SIZE.size
+        tag, size, mtime_ns, digest = marshal.loads(blob[offset:offset + header_size])
+        # Путь к JSON в заголовок не пишем: папка может быть подключена
+        # на разных машинах по разным путям
+        if tag != _runtime_tag():
+            return None
+        
+        st = os.stat(json_path)
+        if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+            # mtime мог измениться без изменения содержимого (копирование, checkout)
+            if st.st_size != size:
+                return None
+            with open(json_path, "rb") as file:
+                if hashlib.sha256(file.read()).hexdigest() != digest:
+                    return None
+        
+        data = marshal.loads(blob[offset + header_size:])
+    except (OSError, ValueError, EOFError, TypeError, struct.error):
+        return None
+    return data if isinstance(data, dict) else None
@@ -1,17 +1,38 @@
 import nuke
 import os
-import ScriptsManager
-import config
+import startup_timing
+
+with startup_timing.span("import_scripts_manager"):
+    import ScriptsManager
+    import config
+
+# Скрипты загружаются из общего кэша байткода, если он собран для этой версии Python
+if config.USE_BYTECODE_CACHE:
+    with startup_timing.span("install_bytecode_cache"):
+        ScriptsManager.install_bytecode_cache()
 
 # Добавляем все папки внутри папки scripts в pluginPath
-ScriptsManager.add_scripts_folder_to_plugin_path()
+with startup_timing.span("add_scripts_folder_to_plugin_path"):
+    ScriptsManager.add_scripts_folder_to_plugin_path()
 
 # Создаем дефолтные настройки если у пользователя нет настроек
-ScriptsManager.create_user_default_settings()
+with startup_timing.span("create_user_default_settings"):
+    ScriptsManager.create_user_default_settings()
 
 # Добавляем папку пользователя в plugin path чтобы оттуда загрузились менюшки
-if os.path.isdir(config.USER_FOLDER):
-    nuke.pluginAddPath(config.USER_FOLDER)
+with startup_timing.span("plugin_add_path_user_folder"):
+    if os.path.isdir(config.USER_FOLDER):
+        nuke.pluginAddPath(config.USER_FOLDER)
 
 # Создаем менюшки для управления скриптами
-ScriptsManager.create_menu()
+with startup_timing.span("create_menu"):
+    ScriptsManager.create_menu()
+
+# Подхватываем новые скрипты и изменения scripts_info.json без перезапуска Nuke
+if config.SCRIPT_WATCHER:
+    with startup_timing.span("start_script_watcher"):
+        ScriptsManager.start_script_watcher()
+
+# Этапы этого файла пишутся в журнал сразу, не дожидаясь menu.py пользователя:
+# время его выполнения он дописывает сам (begin/end/finish "user_menu")
+startup_timing.finish("menu")
@@ -1,23 +1,49 @@
 """
 Модуль для создания меню Nuke.
 """
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 # nukescripts нужен чтобы некоторые скрипты при exec() явно не импортируют nukescripts,
 # поэтому импортирую самостоятельно на всякий случай(а случай был)
 import nuke, nukescripts
 import config
+from custom_commands import compile_custom_command
+from menu_trie import MenuTrie, escape_segment, script_menu_paths, split_menu_path
 from script_info_manager import ScriptInfoManager
 
 
+# Пути меню, созданные Scripts Manager в текущей сессии
+_live_menu_trie: Optional[MenuTrie] = None
+
+
+def get_live_menu_trie() -> Optional[MenuTrie]:
+    """Возвращает дерево путей меню текущей сессии или None, если оно еще не построено."""
+    return _live_menu_trie
+
+
+def set_live_menu_trie(trie: Optional[MenuTrie]) -> None:
+    """Задает дерево путей меню текущей сессии."""
+    global _live_menu_trie
+    _live_menu_trie = trie
+
+
 class MenuBuilder:
     """Класс для построения меню Nuke."""
     
-    def __init__(self, script_info_manager: ScriptInfoManager):
+    def __init__(self, script_info_manager: ScriptInfoManager, trie: Optional[MenuTrie] = None):
         """
         Args:
             script_info_manager: Менеджер информации о скриптах
+            trie: Дерево путей меню, которые сейчас есть в Nuke (по умолчанию
+                дерево текущей сессии). По нему удаляются опустевшие подменю
         """
         self.info_manager = script_info_manager
+        self._trie = trie
+        # Кэш подменю {путь_папки: меню Nuke} на время одного apply_changes
+        self._menus: Optional[Dict[str, Any]] = None
+    
+    @property
+    def trie(self) -> Optional[MenuTrie]:
+        return self._trie if self._trie is not None else _live_menu_trie
     
     def write_menu_command(self, file, info: Dict[str, Any], create_menus: bool = False) -> None:
         """
@@ -33,7 +59,7 @@ class MenuBuilder:
             file.write(custom_command + "\n")
             if create_menus:
                 try:
-                    exec(custom_command)
+                    exec(compile_custom_command(custom_command))
                 except Exception as e:
                     nuke.message(f"Не получилось выполнить текущую команду:\n{custom_command}\n\nОшибка:\n{e}")
         else:
@@ -57,8 +83,9 @@ class MenuBuilder:
                 f"shortcutContext={context_value})\n"
             )
             if create_menus:
-                nuke.menu("Nuke").addCommand(
-                    menu_path, command, shortcut, 
+                menu, item_name = self._menu_for_add(menu_path)
+                menu.addCommand(
+                    item_name, command, shortcut, 
                     icon=icon, index=index, 
                     shortcutContext=context_value
                 )
@@ -68,8 +95,9 @@ class MenuBuilder:
                 f"'{shortcut}', icon='{icon}', index={index})\n"
             )
             if create_menus:
-                nuke.menu("Nuke").addCommand(
-                    menu_path, command, shortcut, 
+                menu, item_name = self._menu_for_add(menu_path)
+                menu.addCommand(
+                    item_name, command, shortcut, 
                     icon=icon, index=index
                 )
     
@@ -84,42 +112,143 @@ class MenuBuilder:
         
         for menu_path in menu_paths:
             try:
-                path_parts = menu_path.split("/")
-                menu = "/".join(path_parts[:-1])
+                folders, item_name = _split_menu_path(menu_path)
                 
-                m = nuke.menu("Nuke").menu(menu)
-                if not m:
-                    m = nuke.menu("Nuke")
+                m = self._find_menu(folders) or self._root_menu()
                 
-                if isinstance(m, nuke.Menu) and m.findItem(path_parts[-1]):
-                    m.removeItem(path_parts[-1])
+                if isinstance(m, nuke.Menu) and m.findItem(item_name):
+                    m.removeItem(item_name)
                 
-                # Удаляем пустое меню, если оно стало MenuItem
-                base_menu = nuke.menu("Nuke").findItem(path_parts[0])
-                if not isinstance(base_menu, nuke.Menu):
-                    nuke.menu("Nuke").removeItem(path_parts[0])
+                # Дерево путей сразу говорит, какие подменю опустели
+                if self.trie is not None:
+                    for segments in self.trie.remove(menu_path):
+                        self._remove_empty_menu(segments)
             except Exception:
                 pass
     
+    def apply_changes(self, scripts_info: Dict[str, Dict[str, Any]],
+                      old_states: Dict[str, bool], new_states: Dict[str, bool]) -> Tuple[int, int]:
+        """
+        Применяет к меню Nuke только изменения состояния скриптов: добавляет
+        включенные и удаляет выключенные. Скрипты, состояние которых не поменялось,
+        не трогаются. Подменю на время применения кэшируются, чтобы не искать
+        их заново для каждого пункта.
+        
+        Args:
+            scripts_info: Информация о скриптах
+            old_states: Состояние скриптов до изменения {имя_скрипта: включен_ли}
+            new_states: Новое состояние скриптов {имя_скрипта: включен_ли}
+            
+        Returns:
+            Кортеж (добавлено, удалено)
+        """
+        added = removed = 0
+        self._menus = {}
+        try:
+            for script_name, enabled in new_states.items():
+                if enabled == old_states.get(script_name, False):
+                    continue
+                info = scripts_info.get(script_name)
+                if not info:
+                    continue
+                if enabled:
+                    self._add_menu(info)
+                    if self.trie is not None:
+                        self.trie.add_script(script_name, info)
+                    added += 1
+                else:
+                    self.remove_menu(info)
+                    removed += 1
+        finally:
+            self._menus = None
+        return added, removed
+    
+    def _add_menu(self, info: Dict[str, Any]) -> None:
+        """Создает пункт меню в Nuke без записи в файл."""
+        self.write_menu_command(_NullFile(), info, create_menus=True)
+    
+    def _root_menu(self):
+        """Главное меню Nuke, в пределах apply_changes берется из кэша."""
+        if self._menus is None:
+            return nuke.menu("Nuke")
+        root = self._menus.get("")
+        if root is None:
+            root = self._menus[""] = nuke.menu("Nuke")
+        return root
+    
+    def _menu_for_add(self, menu_path: str):
+        """
+        Возвращает подменю для пункта, создавая недостающие папки, и имя пункта.
+        Вне apply_changes путь целиком отдается главному меню, как раньше.
+        """
+        if self._menus is None:
+            return nuke.menu("Nuke"), menu_path
+        folders, item_name = _split_menu_path(menu_path)
+        menu = self._root_menu()
+        for depth in range(1, len(folders) + 1):
+            key = "/".join(folders[:depth])
+            cached = self._menus.get(key)
+            if cached is None:
+                cached = self._menus[key] = menu.addMenu(folders[depth - 1])
+            menu = cached
+        return menu, item_name
+    
+    def _find_menu(self, folders: List[str]):
+        """Находит существующее подменю по списку папок или возвращает None."""
+        menu = self._root_menu()
+        for depth in range(1, len(folders) + 1):
+            key = "/".join(folders[:depth])
+            cached = self._menus.get(key) if self._menus is not None else None
+            if cached is None:
+                cached = menu.findItem(folders[depth - 1])
+                if not isinstance(cached, nuke.Menu):
+                    return None
+                if self._menus is not None:
+                    self._menus[key] = cached
+            menu = cached
+        return menu
+    
+    def _remove_empty_menu(self, segments: List[str]) -> None:
+        """
+        Удаляет подменю, в котором не осталось пунктов Scripts Manager.
+        Меню удаляется, только если в нем нет и других пунктов (например, пунктов самого Nuke).
+        """
+        folders = [escape_segment(segment) for segment in segments]
+        parent = self._find_menu(folders[:-1])
+        if parent is None:
+            return
+        menu = parent.findItem(folders[-1])
+        if isinstance(menu, nuke.Menu) and not menu.items():
+            parent.removeItem(folders[-1])
+            self._forget_menus("/".join(folders))
+    
+    def _forget_menus(self, key: str) -> None:
+        """Убирает из кэша удаленное меню и все его подменю."""
+        if self._menus is None:
+            return
+        prefix = key + "/"
+        for cached in [cached for cached in self._menus if cached == key or cached.startswith(prefix)]:
+            del self._menus[cached]
+    
     def _extract_menu_paths(self, info: Dict[str, Any]) -> list:
         """Извлекает пути меню из информации о скрипте."""
-        menu_paths = []
-        
-        if info.get("custom_cmd_checkbox", False):
-            custom_command = info.get("custom_command", "")
-            for line in custom_command.split("\n"):
-                if line.count(".addCommand(") == 1:
-                    try:
-                        menu_path = line.split(".addCommand(")[1].split(",")[0].strip("'").strip('"')
-                        menu_paths.append(menu_path)
-                    except Exception:
-                        pass
-        else:
-            menu_path = info.get("menu_path", "")
-            if menu_path:
-                menu_paths.append(menu_path)
-        
-        return menu_paths
+        return script_menu_paths(info)
+
+
+class _NullFile:
+    """Файл, который ничего не записывает."""
+    
+    def write(self, text: str) -> None:
+        pass
+
+
+def _split_menu_path(menu_path: str) -> Tuple[List[str], str]:
+    """
+    Разбивает путь в меню на папки и имя пункта. Слеши в именах остаются
+    экранированными ("A\\/B"), их разбирает сам Nuke.
+    """
+    segments = [escape_segment(segment) for segment in split_menu_path(menu_path)] or [""]
+    return segments[:-1], segments[-1]
 
 
 def get_in_menu_name(menu_path: str, strip: bool = True) -> str:
@@ -128,13 +257,11 @@ def get_in_menu_name(menu_path: str, strip: bool = True) -> str:
     
     Args:
         menu_path: Полный путь в меню
-        strip: Удалять ли обратные слеши
+        strip: Убирать ли экранирование слешей ("A\\/B" -> "A/B")
         
     Returns:
         Имя пункта меню
     """
-    parts = menu_path.split("/")
-    if len(parts) > 1 and parts[-2].endswith("\\"):
-        part = parts[-2].rstrip("\\") if strip else parts[-2]
-        return f"{part}/{parts[-1]}"
-    return parts[-1]
+    segments = split_menu_path(menu_path)
+    name = segments[-1] if segments else ""
+    return name if strip else escape_segment(name)
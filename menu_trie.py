@@ -0,0 +1,297 @@
+"""
+Дерево (trie) путей меню.
+
+Путь меню состоит из сегментов, разделенных "/". Слеш внутри имени пункта
+экранируется как "\\/". В дереве сегменты хранятся уже без экранирования,
+у каждого узла есть количество пунктов в его поддереве, поэтому удаление
+пункта и поиск опустевших подменю занимают O(глубины пути).
+Модуль не зависит от nuke.
+"""
+import re
+from collections import namedtuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from custom_commands import MENU_PATHS_KEY, extract_menu_paths
+
+# Конфликт путей меню: kind - "duplicate" (один пункт у двух скриптов),
+# "item_is_menu" (путь одновременно пункт и подменю) или "index" (одинаковый
+# index у соседних пунктов), script_names - скрипты-участники
+MenuConflict = namedtuple("MenuConflict", ["kind", "menu_path", "script_names"])
+
+_UNESCAPED_SLASH = re.compile(r"(?<!\\)/")
+
+
+def split_menu_path(menu_path: str) -> List[str]:
+    """
+    Разбивает путь меню на сегменты без экранирования.
+    
+    Args:
+        menu_path: Путь меню, например "Tools/Read\\/Write"
+        
+    Returns:
+        Список сегментов, например ["Tools", "Read/Write"]. Пустые сегменты отбрасываются
+    """
+    segments = []
+    current = []
+    i = 0
+    while i < len(menu_path):
+        char = menu_path[i]
+        if char == "\\" and menu_path[i + 1:i + 2] == "/":
+            current.append("/")
+            i += 2
+            continue
+        if char == "/":
+            if current:
+                segments.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    if current:
+        segments.append("".join(current))
+    return segments
+
+
+def escape_segment(name: str) -> str:
+    """
+    Экранирует слеши в имени пункта меню. Уже экранированные слеши не меняются.
+    
+    Args:
+        name: Имя пункта, например "Read/Write"
+        
+    Returns:
+        Имя для пути меню, например "Read\\/Write"
+    """
+    return _UNESCAPED_SLASH.sub(r"\\/", name)
+
+
+def join_menu_path(segments: List[str]) -> str:
+    """Собирает путь меню из сегментов без экранирования."""
+    return "/".join(escape_segment(segment) for segment in segments)
+
+
+class MenuTrieNode:
+    """Узел дерева: подменю или пункт меню."""
+    
+    __slots__ = ("name", "parent", "children", "count", "script_name", "index")
+    
+    def __init__(self, name: str, parent: Optional["MenuTrieNode"] = None):
+        self.name = name
+        self.parent = parent
+        self.children: Dict[str, "MenuTrieNode"] = {}
+        # Количество пунктов в поддереве (у пункта - 1)
+        self.count = 0
+        # Имя скрипта, если узел - пункт меню
+        self.script_name: Optional[str] = None
+        self.index = -1
+    
+    @property
+    def is_item(self) -> bool:
+        return self.script_name is not None
+    
+    def segments(self) -> List[str]:
+        """Сегменты пути от корня до узла."""
+        names = []
+        node = self
+        while node.parent is not None:
+            names.append(node.name)
+            node = node.parent
+        return list(reversed(names))
+
+
+class MenuTrie:
+    """Дерево всех зарегистрированных путей меню."""
+    
+    def __init__(self):
+        self.root = MenuTrieNode("")
+        self.conflicts: List[MenuConflict] = []
+    
+    @classmethod
+    def from_scripts_info(cls, scripts_info: Dict[str, Dict[str, Any]],
+                          script_names: Optional[List[str]] = None) -> "MenuTrie":
+        """
+        Строит дерево по информации о скриптах. Конфликты собираются в trie.conflicts.
+        
+        Args:
+            scripts_info: Информация о скриптах
+            script_names: Какие скрипты добавить (по умолчанию все)
+            
+        Returns:
+            Новое дерево
+        """
+        trie = cls()
+        names = script_names if script_names is not None else list(scripts_info)
+        for script_name in names:
+            info = scripts_info.get(script_name)
+            if info:
+                trie.add_script(script_name, info)
+        return trie
+    
+    def add_script(self, script_name: str, info: Dict[str, Any]) -> List[MenuConflict]:
+        """
+        Добавляет все пути меню скрипта (для кастомной команды - все найденные addCommand).
+        
+        Returns:
+            Конфликты, найденные при добавлении
+        """
+        conflicts = []
+        index = info.get("index", -1)
+        for menu_path in script_menu_paths(info):
+            conflicts.extend(self.add(menu_path, script_name, index))
+        return conflicts
+    
+    def add(self, menu_path: str, script_name: str, index: int = -1) -> List[MenuConflict]:
+        """
+        Добавляет пункт меню.
+        
+        Args:
+            menu_path: Путь меню с экранированием
+            script_name: Имя скрипта
+            index: Позиция пункта в подменю (-1 - в конец)
+            
+        Returns:
+            Конфликты, найденные при добавлении. При конфликте путей пункт
+            не добавляется, при совпадении index - добавляется
+        """
+        segments = split_menu_path(menu_path)
+        if not segments:
+            return []
+        
+        # Сначала проходим по существующим узлам, новые создаются только если конфликтов нет
+        node = self.root
+        depth = 0
+        while depth < len(segments) - 1:
+            child = node.children.get(segments[depth])
+            if child is None:
+                break
+            if child.is_item:
+                return self._conflict("item_is_menu", join_menu_path(segments[:depth + 1]),
+                                      [child.script_name, script_name])
+            node = child
+            depth += 1
+        
+        name = segments[-1]
+        existing = node.children.get(name) if depth == len(segments) - 1 else None
+        if existing is not None:
+            if existing.is_item:
+                if existing.script_name == script_name:
+                    return []
+                return self._conflict("duplicate", menu_path, [existing.script_name, script_name])
+            return self._conflict("item_is_menu", menu_path, sorted(self._scripts_under(existing)) + [script_name])
+        
+        conflicts = []
+        if index >= 0 and depth == len(segments) - 1:
+            clash = [child.script_name for child in node.children.values() if child.is_item and child.index == index]
+            if clash:
+                conflicts = self._conflict("index", menu_path, clash + [script_name])
+        
+        for segment in segments[depth:-1]:
+            child = MenuTrieNode(segment, node)
+            node.children[segment] = child
+            node = child
+        item = MenuTrieNode(name, node)
+        item.script_name = script_name
+        item.index = index
+        node.children[name] = item
+        while item is not None:
+            item.count += 1
+            item = item.parent
+        return conflicts
+    
+    def remove(self, menu_path: str) -> List[List[str]]:
+        """
+        Удаляет пункт меню и опустевшие подменю над ним.
+        
+        Args:
+            menu_path: Путь меню с экранированием
+            
+        Returns:
+            Сегменты опустевших подменю, начиная с самого глубокого.
+            Пустой список, если пункта в дереве нет
+        """
+        node = self.find(menu_path)
+        if node is None or not node.is_item:
+            return []
+        
+        emptied = []
+        segments = node.segments()[:-1]
+        parent = node.parent
+        del parent.children[node.name]
+        node = parent
+        while node is not None:
+            node.count -= 1
+            if node.count == 0 and node.parent is not None:
+                emptied.append(list(segments))
+                del node.parent.children[node.name]
+            if segments:
+                segments.pop()
+            node = node.parent
+        return emptied
+    
+    def find(self, menu_path: str) -> Optional[MenuTrieNode]:
+        """Находит узел по пути меню или возвращает None."""
+        node = self.root
+        for segment in split_menu_path(menu_path):
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+    
+    def __contains__(self, menu_path: str) -> bool:
+        node = self.find(menu_path)
+        return node is not None and node.is_item
+    
+    def __len__(self) -> int:
+        return self.root.count
+    
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """Пары (путь_меню, имя_скрипта) для всех пунктов в порядке добавления."""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.is_item:
+                yield join_menu_path(node.segments()), node.script_name
+            stack.extend(reversed(list(node.children.values())))
+    
+    def conflicts_for(self, script_name: str) -> List[MenuConflict]:
+        """Конфликты, в которых участвует скрипт."""
+        return [conflict for conflict in self.conflicts if script_name in conflict.script_names]
+    
+    def _conflict(self, kind: str, menu_path: str, script_names: List[str]) -> List[MenuConflict]:
+        conflict = MenuConflict(kind, menu_path, script_names)
+        self.conflicts.append(conflict)
+        return [conflict]
+    
+    def _scripts_under(self, node: MenuTrieNode) -> set:
+        stack, names = [node], set()
+        while stack:
+            current = stack.pop()
+            if current.is_item:
+                names.add(current.script_name)
+            stack.extend(current.children.values())
+        return names
+
+
+def describe_conflict(conflict: MenuConflict) -> str:
+    """Описание конфликта для сообщения пользователю."""
+    scripts = ", ".join(conflict.script_names)
+    if conflict.kind == "duplicate":
+        return f"Пункт меню {conflict.menu_path} есть у нескольких скриптов: {scripts}"
+    if conflict.kind == "item_is_menu":
+        return f"{conflict.menu_path} одновременно пункт и подменю: {scripts}"
+    return f"Одинаковый index в подменю для {conflict.menu_path}: {scripts}"
+
+
+def script_menu_paths(info: Dict[str, Any]) -> List[str]:
+    """
+    Пути меню скрипта: для кастомной команды - сохраненные custom_menu_paths
+    (или разобранные из команды), иначе menu_path.
+    """
+    if info.get("custom_cmd_checkbox", False):
+        menu_paths = info.get(MENU_PATHS_KEY)
+        if menu_paths is None:
+            # Запись сохранена до появления custom_menu_paths
+            menu_paths = extract_menu_paths(info.get("custom_command", ""))
+        return list(menu_paths)
+    
+    menu_path = info.get("menu_path", "")
+    return [menu_path] if menu_path else []
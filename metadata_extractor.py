@@ -0,0 +1,275 @@
+"""
+Массовое заполнение scripts_info.json по исходникам скриптов.
+
+Каждый скрипт разбирается модулем ast без выполнения: из него берутся
+docstring модуля (описание), функции верхнего уровня, которые можно вызвать
+без аргументов (точки входа), и по ним предлагается команда. Результаты
+разбора кэшируются по mtime и размеру файла в config.METADATA_CACHE_FILE,
+поэтому повторный запуск разбирает только измененные файлы.
+
+Из командной строки файлы разбираются пулом процессов:
+    python metadata_extractor.py [--workers N] [--overwrite] [--dry-run]
+Внутри Nuke используется пул потоков, так как процессы-потомки
+запускались бы исполняемым файлом Nuke.
+"""
+import os
+import re
+import ast
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import config
+from file_utils import read_json, write_json
+from menu_trie import escape_segment
+
+CACHE_VERSION = 1
+
+# Имена функций, которые считаются точкой входа, если нет функции с именем модуля
+ENTRY_POINT_NAMES = ("main", "run", "show", "start", "execute")
+
+
+def suggest_menu_name(script_name: str) -> str:
+    """Имя в меню по имени скрипта: "myTool" -> "My Tool"."""
+    return re.sub(r"([A-Z])", r" \1", script_name).strip().title()
+
+
+def extract_metadata(source: bytes, script_name: str) -> Dict[str, Any]:
+    """
+    Разбирает исходник скрипта без выполнения.
+    
+    Args:
+        source: Содержимое .py файла
+        script_name: Имя скрипта (модуля)
+        
+    Returns:
+        Словарь с ключами "docstring", "entry_points" (функции без обязательных
+        аргументов в порядке объявления), "entry_point" (выбранная точка входа
+        или None) и "error" (текст синтаксической ошибки или None)
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError) as e:
+        return {"docstring": "", "entry_points": [], "entry_point": None, "error": str(e)}
+    
+    entry_points = [
+        node.name for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        and not node.name.startswith("_")
+        and _can_call_without_arguments(node.args)
+    ]
+    return {
+        "docstring": _first_paragraph(ast.get_docstring(tree) or ""),
+        "entry_points": entry_points,
+        "entry_point": _choose_entry_point(script_name, entry_points),
+        "error": None,
+    }
+
+
+def draft_script_info(script_name: str, menu_folder: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Черновая запись scripts_info.json в том же виде, что сохраняет EditScriptPanel.
+    
+    Args:
+        script_name: Имя скрипта
+        menu_folder: Путь в меню (папка скрипта относительно scripts)
+        metadata: Результат extract_metadata
+        
+    Returns:
+        Информация о скрипте
+    """
+    entry_point = metadata.get("entry_point")
+    command = f"import {script_name}; {script_name}.{entry_point}()" if entry_point else f"import {script_name}"
+    menu_name = escape_segment(suggest_menu_name(script_name))
+    return {
+        "default": False,
+        "custom_cmd_checkbox": False,
+        "menu_path": f"{menu_folder}/{menu_name}" if menu_folder else menu_name,
+        "command": command,
+        "custom_command": "",
+        "tooltip": metadata.get("docstring", ""),
+        "icon": "",
+        "shortcut": "",
+        "shortcut_context": config.SHORTCUT_CONTEXT_LABELS[0],
+        "index": -1,
+    }
+
+
+class MetadataExtractor:
+    """Разбор многих скриптов с кэшем по mtime файла."""
+    
+    def __init__(self, cache_file: Optional[str] = None):
+        """
+        Args:
+            cache_file: Файл кэша (по умолчанию config.METADATA_CACHE_FILE)
+        """
+        self.cache_file = cache_file or config.METADATA_CACHE_FILE
+        self._cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self.stats = {"cached": 0, "parsed": 0}
+    
+    def extract(self, files: Dict[str, str], max_workers: Optional[int] = None,
+                use_processes: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Разбирает скрипты, пропуская файлы, которые не менялись с прошлого разбора.
+        
+        Args:
+            files: Словарь {имя_скрипта: путь_к_файлу}
+            max_workers: Размер пула (по умолчанию config.METADATA_WORKERS)
+            use_processes: Разбирать в пуле процессов (только вне Nuke)
+            
+        Returns:
+            Словарь {имя_скрипта: результат extract_metadata}. Файлы, которые
+            не удалось прочитать, пропускаются
+        """
+        cache = self._load_cache()
+        result = {}
+        pending: List[Tuple[str, str, Tuple[int, int]]] = []
+        for script_name, path in files.items():
+            signature = _file_signature(path)
+            if signature is None:
+                continue
+            cached = cache.get(path)
+            if cached is not None and (cached["mtime"], cached["size"]) == signature:
+                result[script_name] = cached["metadata"]
+                self.stats["cached"] += 1
+            else:
+                pending.append((script_name, path, signature))
+        
+        if pending:
+            workers = max(1, min(max_workers or config.METADATA_WORKERS, len(pending)))
+            executor_class = ProcessPoolExecutor if use_processes and workers > 1 else ThreadPoolExecutor
+            chunksize = max(1, len(pending) // (workers * 4)) if executor_class is ProcessPoolExecutor else 1
+            with executor_class(max_workers=workers) as executor:
+                parsed = executor.map(_extract_file, [(path, name) for name, path, _ in pending],
+                                      chunksize=chunksize)
+                for (script_name, path, signature), metadata in zip(pending, parsed):
+                    if metadata is None:
+                        continue
+                    result[script_name] = metadata
+                    cache[path] = {"mtime": signature[0], "size": signature[1], "metadata": metadata}
+                    self._dirty = True
+                    self.stats["parsed"] += 1
+        
+        self.save_cache()
+        return result
+    
+    def save_cache(self) -> None:
+        """Сохраняет кэш. Ошибки записи игнорируются - кэш только ускоряет повторный запуск."""
+        if not self._dirty or self._cache is None:
+            return
+        try:
+            write_json(self.cache_file, {"version": CACHE_VERSION, "files": self._cache})
+            self._dirty = False
+        except (IOError, OSError):
+            pass
+    
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        if self._cache is None:
+            data = read_json(self.cache_file, default={}) if os.path.isfile(self.cache_file) else {}
+            files = data.get("files") if isinstance(data, dict) and data.get("version") == CACHE_VERSION else None
+            self._cache = files if isinstance(files, dict) else {}
+        return self._cache
+
+
+def build_drafts(scripts: Dict[str, str], modules: Dict[str, Tuple[str, bool]],
+                 scripts_info: Dict[str, Dict[str, Any]], overwrite: bool = False,
+                 extractor: Optional[MetadataExtractor] = None, max_workers: Optional[int] = None,
+                 use_processes: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Готовит черновые записи для скриптов, у которых их еще нет.
+    
+    Args:
+        scripts: Словарь {имя_скрипта: путь_в_меню}, как у discover_scripts
+        modules: Словарь {имя_модуля: (путь_к_файлу, является_ли_пакетом)}
+        scripts_info: Текущая информация о скриптах
+        overwrite: Пересоздать записи и для скриптов, у которых они уже есть
+        extractor: Экземпляр MetadataExtractor (по умолчанию новый)
+        max_workers: Размер пула
+        use_processes: Разбирать в пуле процессов
+        
+    Returns:
+        Словарь {имя_скрипта: информация} только для новых записей
+    """
+    files = {
+        name: modules[name][0] for name in scripts
+        if name in modules and not modules[name][1] and (overwrite or name not in scripts_info)
+    }
+    extractor = extractor or MetadataExtractor()
+    metadata = extractor.extract(files, max_workers, use_processes)
+    return {name: draft_script_info(name, scripts[name], metadata[name]) for name in files if name in metadata}
+
+
+def _extract_file(task: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    """Разбирает один файл. Выполняется в потоке или процессе пула."""
+    path, script_name = task
+    try:
+        with open(path, "rb") as file:
+            source = file.read()
+    except OSError:
+        return None
+    return extract_metadata(source, script_name)
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _can_call_without_arguments(args: ast.arguments) -> bool:
+    positional = list(getattr(args, "posonlyargs", [])) + list(args.args)
+    required_positional = len(positional) - len(args.defaults)
+    required_keyword = sum(1 for default in args.kw_defaults if default is None)
+    return required_positional <= 0 and required_keyword == 0
+
+
+def _choose_entry_point(script_name: str, entry_points: List[str]) -> Optional[str]:
+    if script_name in entry_points:
+        return script_name
+    for name in ENTRY_POINT_NAMES:
+        if name in entry_points:
+            return name
+    return entry_points[0] if entry_points else None
+
+
+def _first_paragraph(docstring: str) -> str:
+    paragraph = docstring.strip().split("\n\n")[0]
+    return " ".join(paragraph.split())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Заполняет scripts_info.json черновыми записями для новых скриптов."""
+    from script_info_manager import ScriptInfoManager
+    from tree_scanner import scan_tree, scripts_from_tree, modules_from_tree
+    
+    parser = argparse.ArgumentParser(description="Черновые записи scripts_info.json по исходникам скриптов")
+    parser.add_argument("--workers", type=int, default=None, help="Количество процессов")
+    parser.add_argument("--overwrite", action="store_true", help="Пересоздать и существующие записи")
+    parser.add_argument("--dry-run", action="store_true", help="Только показать, что будет добавлено")
+    args = parser.parse_args(argv)
+    
+    root = config.SCRIPTS_DIR.replace("\\", "/")
+    if not os.path.isdir(root):
+        print(f"Нет папки со скриптами: {root}")
+        return 1
+    tree = scan_tree(root)
+    
+    info_manager = ScriptInfoManager()
+    extractor = MetadataExtractor()
+    drafts = build_drafts(scripts_from_tree(tree), modules_from_tree(root, tree), info_manager.get_scripts_info(),
+                          overwrite=args.overwrite, extractor=extractor, max_workers=args.workers,
+                          use_processes=True)
+    print(f"Разобрано файлов: {extractor.stats['parsed']}, из кэша: {extractor.stats['cached']}")
+    for script_name in sorted(drafts):
+        print(f"  {script_name}: {drafts[script_name]['command']}")
+    
+    if drafts and not args.dry_run:
+        info_manager.update_scripts_info(drafts)
+        print(f"Добавлено записей: {len(drafts)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
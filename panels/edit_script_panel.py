@@ -5,14 +5,14 @@ try:
     from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                                    QLineEdit, QTextEdit, QComboBox, QSpinBox,
                                    QCheckBox, QPushButton, QGroupBox,
-                                   QFormLayout, QScrollArea, QWidget)
+                                   QFormLayout, QScrollArea, QWidget, QMessageBox)
     PYSIDE_VERSION = 6
 except ImportError:
     try:
         from PySide2.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                                       QLineEdit, QTextEdit, QComboBox, QSpinBox,
                                       QCheckBox, QPushButton, QGroupBox,
-                                      QFormLayout, QScrollArea, QWidget)
+                                      QFormLayout, QScrollArea, QWidget, QMessageBox)
         PYSIDE_VERSION = 2
     except ImportError:
         raise ImportError("Требуется PySide2 или PySide6")
@@ -21,17 +21,23 @@ from typing import Dict, Any, Optional
 import re
 
 import config
+from custom_commands import validate_custom_command
 from menu_builder import get_in_menu_name
+from menu_trie import MenuTrie, describe_conflict, escape_segment
+from script_info_manager import ShortcutIndex
 
 
 class EditScriptPanel(QDialog):
     """Панель для редактирования информации о скриптах."""
     
-    def __init__(self, scripts: Dict[str, str], info: Dict[str, Dict[str, Any]], parent=None):
+    def __init__(self, scripts: Dict[str, str], info: Dict[str, Dict[str, Any]],
+                 shortcut_index: Optional[ShortcutIndex] = None, parent=None):
         """
         Args:
             scripts: Словарь {имя_скрипта: путь_в_меню}
             info: Словарь {имя_скрипта: {параметры}}
+            shortcut_index: Индекс горячих клавиш (ScriptInfoManager.get_shortcut_index).
+                Если не указан, строится по info
             parent: Родительский виджет
         """
         super(EditScriptPanel, self).__init__(parent)
@@ -40,6 +46,7 @@ class EditScriptPanel(QDialog):
         
         self.scripts = scripts
         self.info = info
+        self.shortcut_index = shortcut_index if shortcut_index is not None else ShortcutIndex(info)
         self.context_list = list(config.SHORTCUT_CONTEXTS.keys())
         
         # Дефолтные значения
@@ -131,6 +138,12 @@ class EditScriptPanel(QDialog):
         self.shortcut_context_combo.setToolTip("Контекст вызова горячей клавиши:\n0 - Window\n1 - Application\n2 - DAG")
         standard_form.addRow("Контекст:", self.shortcut_context_combo)
         
+        self.shortcut_warning_label = QLabel()
+        self.shortcut_warning_label.setStyleSheet("color: #e0a030;")
+        self.shortcut_warning_label.setWordWrap(True)
+        self.shortcut_warning_label.hide()
+        standard_form.addRow(self.shortcut_warning_label)
+        
         self.index_widget = QSpinBox()
         self.index_widget.setMinimum(-1)
         self.index_widget.setMaximum(1000)
@@ -183,6 +196,8 @@ class EditScriptPanel(QDialog):
         self.menu_name_widget.textChanged.connect(self._on_menu_name_changed)
         self.command_widget.textChanged.connect(self._on_command_changed)
         self.custom_cmd_checkbox.toggled.connect(self._on_custom_command_toggled)
+        self.shortcut_widget.textChanged.connect(self._update_shortcut_warning)
+        self.shortcut_context_combo.currentTextChanged.connect(self._update_shortcut_warning)
     
     def _on_script_changed(self, script_name: str):
         """Обработчик изменения выбранного скрипта."""
@@ -196,7 +211,7 @@ class EditScriptPanel(QDialog):
             
             menu_path = script_info.get("menu_path", "")
             if menu_path:
-                self.menu_name_widget.setText(get_in_menu_name(menu_path, False))
+                self.menu_name_widget.setText(get_in_menu_name(menu_path))
                 self.menu_path_label.setText(f"{self.scripts.get(script_name, '')}/{self.menu_name_widget.text()}")
             
             self.command_widget.setText(script_info.get("command", ""))
@@ -215,6 +230,7 @@ class EditScriptPanel(QDialog):
             self._set_defaults(script_name)
         
         self._on_custom_command_toggled(self.custom_cmd_checkbox.isChecked())
+        self._update_shortcut_warning()
     
     def _set_defaults(self, script_name: str):
         """Устанавливает дефолтные значения для скрипта."""
@@ -257,6 +273,44 @@ class EditScriptPanel(QDialog):
         self.custom_group.setVisible(enabled)
         self.standard_group.setVisible(not enabled)
     
+    def _update_shortcut_warning(self, *args):
+        """Предупреждает, если горячая клавиша уже занята в том же контексте."""
+        conflicts = self.shortcut_index.find(
+            self.shortcut_widget.text(),
+            self.shortcut_context_combo.currentText(),
+            exclude=self.script_combo.currentText(),
+        )
+        if conflicts:
+            self.shortcut_warning_label.setText(f"Горячая клавиша уже используется: {', '.join(conflicts)}")
+        self.shortcut_warning_label.setVisible(bool(conflicts))
+    
+    def accept(self):
+        """
+        Не закрывает панель, если кастомная команда не компилируется.
+        О конфликтах путей меню с другими скриптами предупреждает.
+        """
+        if self.custom_cmd_checkbox.isChecked():
+            error = validate_custom_command(self.custom_command_widget.toPlainText())
+            if error:
+                QMessageBox.warning(self, "Ошибка в команде", f"Кастомная команда содержит ошибку:\n{error}")
+                return
+        
+        conflicts = self._find_menu_conflicts()
+        if conflicts:
+            text = "\n".join(describe_conflict(conflict) for conflict in conflicts)
+            answer = QMessageBox.question(self, "Конфликт меню", f"{text}\n\nВсе равно сохранить?",
+                                          QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if answer != QMessageBox.Yes:
+                return
+        super(EditScriptPanel, self).accept()
+    
+    def _find_menu_conflicts(self):
+        """Конфликты путей меню текущего скрипта с остальными скриптами."""
+        script_name = self.script_combo.currentText()
+        others = [name for name in self.info if name != script_name]
+        trie = MenuTrie.from_scripts_info(self.info, others)
+        return trie.add_script(script_name, self.get_script_info())
+    
     def get_script_info(self) -> Dict[str, Any]:
         """
         Возвращает информацию о текущем скрипте.
@@ -265,7 +319,8 @@ class EditScriptPanel(QDialog):
             Словарь с информацией о скрипте
         """
         script_name = self.script_combo.currentText()
-        menu_path = f"{self.scripts.get(script_name, '')}/{self.menu_name_widget.text()}"
+        # Слеши в имени экранируются автоматически, чтобы Nuke не считал их подменю
+        menu_path = f"{self.scripts.get(script_name, '')}/{escape_segment(self.menu_name_widget.text())}"
         
         return {
             "default": self.default_checkbox.isChecked(),
@@ -282,18 +337,20 @@ class EditScriptPanel(QDialog):
         }
     
     @staticmethod
-    def show_dialog(scripts: Dict[str, str], info: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    def show_dialog(scripts: Dict[str, str], info: Dict[str, Dict[str, Any]],
+                    shortcut_index: Optional[ShortcutIndex] = None) -> Optional[Dict[str, Any]]:
         """
         Показывает диалог и возвращает информацию о скрипте, если пользователь нажал OK.
         
         Args:
             scripts: Словарь {имя_скрипта: путь_в_меню}
             info: Словарь {имя_скрипта: {параметры}}
+            shortcut_index: Индекс горячих клавиш
             
         Returns:
             Кортеж (имя_скрипта, информация) или None если нажата Отмена
         """
-        dialog = EditScriptPanel(scripts, info)
+        dialog = EditScriptPanel(scripts, info, shortcut_index)
         if dialog.exec() == QDialog.Accepted:
             script_name = dialog.script_combo.currentText()
             script_info = dialog.get_script_info()
@@ -0,0 +1,65 @@
+"""
+Фоновая загрузка данных для ScriptsManagerPanel.
+
+Чтение scripts_info.json, data.json и обход папки scripts (scripts_loading.ScriptsLoadJob)
+выполняются в отдельном потоке, а результаты передаются в панель сигналами,
+поэтому все обращения к Qt и nuke остаются в главном потоке.
+"""
+try:
+    from PySide6.QtCore import QObject, Signal
+    PYSIDE_VERSION = 6
+except ImportError:
+    try:
+        from PySide2.QtCore import QObject, Signal
+        PYSIDE_VERSION = 2
+    except ImportError:
+        raise ImportError("Требуется PySide2 или PySide6")
+
+from typing import Optional
+
+from script_info_manager import ScriptInfoManager
+from scripts_loading import LoadingCancelled, LoadingError, ScriptsLoadJob
+from user_data_manager import UserDataManager
+
+
+class ScriptsLoader(QObject):
+    """Загружает данные для панели. Метод run выполняется в QThread."""
+    
+    info_loaded = Signal(object)
+    states_loaded = Signal(object)
+    scripts_found = Signal(object)
+    # Результат поиска (script_discovery.DiscoveryResult)
+    loaded = Signal(object)
+    failed = Signal(str)
+    
+    def __init__(self, info_manager: Optional[ScriptInfoManager] = None,
+                 user_manager: Optional[UserDataManager] = None):
+        """
+        Args:
+            info_manager: Менеджер информации о скриптах
+            user_manager: Менеджер данных пользователя
+        """
+        super(ScriptsLoader, self).__init__()
+        self.job = ScriptsLoadJob(self.info_loaded.emit, self.states_loaded.emit, self.scripts_found.emit,
+                                  info_manager, user_manager)
+    
+    def cancel(self) -> None:
+        """Просит прервать загрузку. Можно вызывать из главного потока."""
+        self.job.cancel()
+    
+    def run(self) -> None:
+        """
+        Загружает информацию о скриптах, состояния пользователя и скрипты.
+        Скрипты отправляются сигналом scripts_found по мере обхода, в конце
+        результат поиска отправляется сигналом loaded.
+        """
+        try:
+            self.loaded.emit(self.job.run())
+        except LoadingCancelled:
+            self.failed.emit("Загрузка отменена")
+        except LoadingError as e:
+            self.failed.emit(str(e))
+        except (IOError, ValueError) as e:
+            self.failed.emit(f"Ошибка работы с файлами: {e}")
+        except Exception as e:
+            self.failed.emit(f"Неожиданная ошибка: {e}")
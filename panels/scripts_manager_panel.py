@@ -3,44 +3,58 @@
 """
 try:
     from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, 
-                                   QPushButton, QCheckBox, QScrollArea, QWidget, 
-                                   QLabel, QSizePolicy)
-    from PySide6.QtCore import Qt
+                                   QPushButton, QTreeView, QAbstractItemView,
+                                   QLabel, QSizePolicy, QCheckBox)
+    from PySide6.QtCore import Qt, QTimer, QThread
     PYSIDE_VERSION = 6
 except ImportError:
     try:
         from PySide2.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLineEdit,
-                                      QPushButton, QCheckBox, QScrollArea, QWidget,
-                                      QLabel, QSizePolicy)
-        from PySide2.QtCore import Qt
+                                      QPushButton, QTreeView, QAbstractItemView,
+                                      QLabel, QSizePolicy, QCheckBox)
+        from PySide2.QtCore import Qt, QTimer, QThread
         PYSIDE_VERSION = 2
     except ImportError:
         raise ImportError("Требуется PySide2 или PySide6")
 
-from typing import Dict, List, Optional
+from typing import Dict, Optional, Tuple
 
-from menu_builder import get_in_menu_name
+from panels.scripts_loader import ScriptsLoader
+from panels.scripts_tree_model import ScriptsTreeModel
+from script_discovery import DiscoveryResult, make_scripts_importable, remember_discovery
+from script_info_manager import ScriptInfoManager
+from script_search import ScriptSearchIndex
+from user_data_manager import UserDataManager
+
+# Через сколько миллисекунд после последнего нажатия клавиши применяется фильтр
+FILTER_DEBOUNCE_MS = 150
 
 
 class ScriptsManagerPanel(QDialog):
     """Панель для включения/выключения скриптов пользователем."""
     
-    def __init__(self, scripts: Dict[str, str], info: Dict[str, Dict], user_data: Optional[Dict[str, bool]] = None, parent=None):
+    def __init__(self, scripts: Optional[Dict[str, str]] = None, info: Optional[Dict[str, Dict]] = None,
+                 user_data: Optional[Dict[str, bool]] = None, parent=None):
         """
         Args:
-            scripts: Словарь {имя_скрипта: путь_в_меню}
+            scripts: Словарь {имя_скрипта: путь_в_меню}. Если не указан, панель
+                открывается сразу, а данные загружаются в фоне (см. start_loading)
             info: Словарь {имя_скрипта: {параметры}}
-            user_data: Словарь {имя_скрипта: включен_ли}
+            user_data: Словарь {имя_скрипта: включен_ли}. Удобно передавать результат
+                UserDataManager.get_scripts_state, где состояния уже разрешены
             parent: Родительский виджет
         """
         super(ScriptsManagerPanel, self).__init__(parent)
         self.setWindowTitle("Scripts Manager")
         self.setMinimumSize(500, 600)
         
-        self.scripts = scripts
-        self.info = info
+        self.scripts = scripts or {}
+        self.info = info or {}
         self.user_data = user_data or {}
-        self.script_checkboxes: List[QCheckBox] = []
+        self.model: Optional[ScriptsTreeModel] = None
+        self.search_index: Optional[ScriptSearchIndex] = None
+        self.loader: Optional[ScriptsLoader] = None
+        self.loader_thread: Optional[QThread] = None
         
         self._setup_ui()
         self._populate_scripts()
@@ -53,22 +67,33 @@ class ScriptsManagerPanel(QDialog):
         search_layout = QHBoxLayout()
         self.filter_input = QLineEdit()
         self.filter_input.setPlaceholderText("Фильтр...")
-        self.filter_input.textChanged.connect(self._on_filter_changed)
+        self.filter_input.textChanged.connect(self._on_filter_text_edited)
+        self.fuzzy_checkbox = QCheckBox("Нечеткий")
+        self.fuzzy_checkbox.setToolTip("Буквы запроса могут идти не подряд, результаты сортируются по похожести")
+        self.fuzzy_checkbox.toggled.connect(lambda _: self._apply_filter())
         search_layout.addWidget(QLabel("Поиск:"))
         search_layout.addWidget(self.filter_input)
+        search_layout.addWidget(self.fuzzy_checkbox)
         layout.addLayout(search_layout)
         
-        # Область со скриптами
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        # Фильтр применяется не на каждое нажатие, а после паузы в наборе
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self._apply_filter)
         
-        self.scripts_widget = QWidget()
-        self.scripts_layout = QVBoxLayout(self.scripts_widget)
-        self.scripts_layout.setAlignment(Qt.AlignTop)
+        # Дерево скриптов: рисуются только видимые строки
+        self.scripts_view = QTreeView()
+        self.scripts_view.setHeaderHidden(True)
+        self.scripts_view.setUniformRowHeights(True)
+        self.scripts_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.scripts_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        layout.addWidget(self.scripts_view)
         
-        scroll_area.setWidget(self.scripts_widget)
-        layout.addWidget(scroll_area)
+        # Состояние фоновой загрузки
+        self.status_label = QLabel()
+        self.status_label.hide()
+        layout.addWidget(self.status_label)
         
         # Кнопки
         buttons_layout = QHBoxLayout()
@@ -85,63 +110,140 @@ class ScriptsManagerPanel(QDialog):
         layout.addLayout(buttons_layout)
     
     def _populate_scripts(self):
-        """Заполняет список скриптов."""
-        # Очищаем старые чекбоксы
-        for i in reversed(range(self.scripts_layout.count())):
-            item = self.scripts_layout.itemAt(i)
-            if item:
-                widget = item.widget()
-                if widget:
-                    widget.setParent(None)
-        self.script_checkboxes.clear()
-        
-        # Сортируем скрипты по алфавиту
-        sorted_scripts = sorted(self.scripts.items(), key=lambda x: x[0].lower())
-        
-        for script_name, menu_path in sorted_scripts:
-            # Чекбоксы создаются для существующих скриптов, но только для тех для которых есть info
-            if not self.info.get(script_name):
-                continue
-            
-            script_info = self.info[script_name]
-            in_menu_name = get_in_menu_name(script_info["menu_path"], True)
-            # Формируем tooltip: описание + путь в меню
-            tooltip_parts = []
-            if script_info.get('tooltip'):
-                tooltip_parts.append(script_info['tooltip'])
-            tooltip_parts.append(f"Путь: {script_info['menu_path']}")
-            tooltip = "\n".join(tooltip_parts)
-            
-            checkbox = QCheckBox(in_menu_name)
-            checkbox.setToolTip(tooltip)
-            checkbox.setObjectName(script_name)  # Сохраняем имя скрипта в objectName
-            
-            # Устанавливаем значение из user_data или default из info
-            if script_name in self.user_data:
-                checkbox.setChecked(self.user_data[script_name])
-            else:
-                checkbox.setChecked(script_info.get("default", False))
-            
-            self.scripts_layout.addWidget(checkbox)
-            self.script_checkboxes.append(checkbox)
+        """Заполняет дерево скриптов и строит индекс для поиска."""
+        self.model = ScriptsTreeModel(self.scripts, self.info, self.user_data, self)
+        self.scripts_view.setModel(self.model)
+        self._build_search_index()
+    
+    def _build_search_index(self):
+        """Строит индекс поиска по имени скрипта, имени в меню и подсказке (с путем в меню)."""
+        self.search_index = ScriptSearchIndex({
+            script_name: (script_name, node.name, node.tooltip)
+            for script_name, node in self.model.script_nodes.items()
+        })
+    
+    def _refresh_scripts(self):
+        """
+        Перестраивает дерево после прихода новых данных. Сохраняет галочки,
+        которые пользователь уже успел поменять, раскрытые папки и фильтр.
+        """
+        self.user_data.update(self.model.get_states())
+        expanded = [
+            self.model.folder_path(index)
+            for index in self.model.iter_fetched_folders()
+            if self.scripts_view.isExpanded(index)
+        ]
+        
+        self.model.set_scripts(self.scripts, self.info, self.user_data)
+        self._build_search_index()
+        if self.filter_input.text():
+            self._apply_filter()
+        
+        for path in expanded:
+            index = self.model.find_folder(path)
+            if index.isValid():
+                self.scripts_view.expand(index)
     
-    def _on_filter_changed(self, text: str):
-        """Обработчик изменения фильтра."""
-        filter_text = text.lower()
+    def start_loading(self, info_manager: Optional[ScriptInfoManager] = None,
+                      user_manager: Optional[UserDataManager] = None):
+        """
+        Запускает фоновую загрузку данных. Пока она идет, кнопка OK и фильтр
+        недоступны, а найденные скрипты добавляются в дерево пачками.
         
-        for checkbox in self.script_checkboxes:
-            script_name = checkbox.objectName()
-            label_text = checkbox.text().lower()
-            tooltip_text = checkbox.toolTip().lower()
-            
-            # Проверяем совпадение по имени скрипта, метке или подсказке
-            matches = (
-                script_name.lower().count(filter_text) > 0 or
-                label_text.count(filter_text) > 0 or
-                tooltip_text.count(filter_text) > 0
-            )
-            
-            checkbox.setVisible(matches)
+        Args:
+            info_manager: Менеджер информации о скриптах
+            user_manager: Менеджер данных пользователя
+        """
+        self.ok_button.setEnabled(False)
+        # Индекс поиска строится один раз в конце загрузки
+        self.filter_input.setEnabled(False)
+        self.status_label.setText("Загрузка...")
+        self.status_label.show()
+        
+        self.loader = ScriptsLoader(info_manager, user_manager)
+        self.loader_thread = QThread(self)
+        self.loader.moveToThread(self.loader_thread)
+        self.loader_thread.started.connect(self.loader.run)
+        self.loader.info_loaded.connect(self._on_info_loaded)
+        self.loader.states_loaded.connect(self._on_states_loaded)
+        self.loader.scripts_found.connect(self._on_scripts_found)
+        self.loader.loaded.connect(self._on_loaded)
+        self.loader.failed.connect(self._on_load_failed)
+        self.loader.loaded.connect(self.loader_thread.quit)
+        self.loader.failed.connect(self.loader_thread.quit)
+        self.loader_thread.start()
+    
+    def _stop_loading(self):
+        """
+        Прерывает загрузку и дожидается завершения потока. Отмена проверяется
+        на каждой папке и при полном обходе, и при проверке индекса, поэтому
+        ожидание короткое.
+        """
+        if self.loader is not None:
+            self.loader.cancel()
+        if self.loader_thread is not None:
+            self.loader_thread.quit()
+            self.loader_thread.wait()
+            self.loader_thread = None
+    
+    def _on_info_loaded(self, info: Dict[str, Dict]):
+        self.info = info
+    
+    def _on_states_loaded(self, states: Dict[str, bool]):
+        self.user_data = states
+    
+    def _on_scripts_found(self, batch: Dict[str, str]):
+        """Добавляет в дерево очередную пачку найденных скриптов, не перестраивая его."""
+        self.scripts.update(batch)
+        self.model.add_scripts(batch, self.info, self.user_data)
+        self.status_label.setText(f"Загрузка... найдено {len(self.scripts)}")
+    
+    def _on_loaded(self, result: DiscoveryResult):
+        """Завершает загрузку: полный список скриптов, индекс поиска и доступ к скриптам из Nuke."""
+        remember_discovery(result)
+        # pluginAddPath можно вызывать только в главном потоке
+        make_scripts_importable(result)
+        if result.scripts != self.scripts:
+            # Пачки дают тот же набор, что и итоговый результат, если дерево не менялось во время обхода
+            self.scripts = dict(result.scripts)
+            self._refresh_scripts()
+        else:
+            self._build_search_index()
+        self.status_label.hide()
+        self.filter_input.setEnabled(True)
+        self.ok_button.setEnabled(True)
+        if self.filter_input.text():
+            self._apply_filter()
+    
+    def _on_load_failed(self, message: str):
+        """Показывает ошибку загрузки. Сохранить состояние в этом случае нельзя."""
+        self.status_label.setText(message)
+        self.status_label.show()
+        self.ok_button.setEnabled(False)
+    
+    def done(self, result: int):
+        """Останавливает фоновую загрузку при закрытии панели."""
+        self._stop_loading()
+        super(ScriptsManagerPanel, self).done(result)
+    
+    def _on_filter_text_edited(self, text: str):
+        """Перезапускает таймер фильтра при каждом нажатии клавиши."""
+        self.filter_timer.start()
+    
+    def _apply_filter(self):
+        """Применяет фильтр к дереву одним пакетом."""
+        self.filter_timer.stop()
+        text = self.filter_input.text()
+        if not text:
+            self.model.set_filter(None)
+            return
+        
+        if self.fuzzy_checkbox.isChecked():
+            ranked = self.search_index.search_fuzzy(text)
+            self.model.set_filter([name for name, _ in ranked], dict(ranked))
+        else:
+            self.model.set_filter(self.search_index.search(text))
+        self.scripts_view.expandAll()
     
     def get_scripts_state(self) -> Dict[str, bool]:
         """
@@ -150,11 +252,7 @@ class ScriptsManagerPanel(QDialog):
         Returns:
             Словарь {имя_скрипта: включен_ли}
         """
-        result = {}
-        for checkbox in self.script_checkboxes:
-            script_name = checkbox.objectName()
-            result[script_name] = checkbox.isChecked()
-        return result
+        return self.model.get_states()
     
     @staticmethod
     def show_dialog(scripts: Dict[str, str], info: Dict[str, Dict], user_data: Optional[Dict[str, bool]] = None) -> Optional[Dict[str, bool]]:
@@ -173,3 +271,22 @@ class ScriptsManagerPanel(QDialog):
         if dialog.exec() == QDialog.Accepted:
             return dialog.get_scripts_state()
         return None
+    
+    @staticmethod
+    def show_dialog_async(info_manager: Optional[ScriptInfoManager] = None,
+                          user_manager: Optional[UserDataManager] = None) -> Optional[Tuple[Dict[str, bool], Dict[str, Dict]]]:
+        """
+        Показывает диалог сразу, загружая данные в фоне.
+        
+        Args:
+            info_manager: Менеджер информации о скриптах
+            user_manager: Менеджер данных пользователя
+            
+        Returns:
+            Кортеж (состояние скриптов, информация о скриптах) или None если нажата Отмена
+        """
+        dialog = ScriptsManagerPanel()
+        dialog.start_loading(info_manager, user_manager)
+        if dialog.exec() == QDialog.Accepted:
+            return dialog.get_scripts_state(), dialog.info
+        return None
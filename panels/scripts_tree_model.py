@@ -0,0 +1,520 @@
+"""
+Модель дерева скриптов для ScriptsManagerPanel.
+
+Скрипты сгруппированы по папкам меню. Вместо отдельного виджета на каждый
+скрипт используется одна модель и QTreeView, поэтому рисуются только видимые
+строки. Ветки отдаются виду лениво (canFetchMore/fetchMore) при раскрытии,
+а включение/выключение целой папки меняет данные без сигнала на каждый скрипт.
+"""
+try:
+    from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt
+    PYSIDE_VERSION = 6
+except ImportError:
+    try:
+        from PySide2.QtCore import QAbstractItemModel, QModelIndex, Qt
+        PYSIDE_VERSION = 2
+    except ImportError:
+        raise ImportError("Требуется PySide2 или PySide6")
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from menu_trie import split_menu_path
+
+
+class ScriptTreeNode:
+    """Узел дерева: папка меню или скрипт."""
+    
+    __slots__ = ("name", "parent", "children", "shown", "row", "fetched",
+                 "script_name", "tooltip", "checked", "total", "enabled")
+    
+    def __init__(self, name: str, parent: Optional["ScriptTreeNode"] = None,
+                 script_name: Optional[str] = None):
+        self.name = name
+        self.parent = parent
+        self.children: List["ScriptTreeNode"] = []
+        # Дети, прошедшие фильтр, и позиция узла среди отфильтрованных детей родителя
+        self.shown: List["ScriptTreeNode"] = []
+        self.row = 0
+        # Отдана ли ветка виду через fetchMore
+        self.fetched = False
+        self.script_name = script_name
+        self.tooltip = ""
+        self.checked = False
+        # Для папок: количество скриптов внутри и сколько из них включено
+        self.total = 0
+        self.enabled = 0
+    
+    @property
+    def is_folder(self) -> bool:
+        return self.script_name is None
+    
+    def iter_scripts(self, shown_only: bool = False) -> Iterable["ScriptTreeNode"]:
+        """Обходит все скрипты поддерева."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if not node.is_folder:
+                yield node
+            else:
+                stack.extend(node.shown if shown_only else node.children)
+
+
+class ScriptsTreeModel(QAbstractItemModel):
+    """Модель скриптов, сгруппированных по папкам меню, с флажками."""
+    
+    def __init__(self, scripts: Dict[str, str], info: Dict[str, Dict],
+                 states: Dict[str, bool], parent=None):
+        """
+        Args:
+            scripts: Словарь {имя_скрипта: путь_в_меню}
+            info: Словарь {имя_скрипта: {параметры}}
+            states: Словарь {имя_скрипта: включен_ли}
+            parent: Родительский объект
+        """
+        super(ScriptsTreeModel, self).__init__(parent)
+        self.root = ScriptTreeNode("")
+        self.root.fetched = True
+        self.script_nodes: Dict[str, ScriptTreeNode] = {}
+        # Папки по пути от корня, чтобы add_scripts находил их без обхода дерева
+        self._folders: Dict[Tuple[str, ...], ScriptTreeNode] = {(): self.root}
+        # Текущий фильтр (имена, оценки), чтобы применить его после перестроения дерева
+        self._filter: Tuple[Optional[Set[str]], Optional[Dict[str, float]]] = (None, None)
+        self._build(scripts, info, states)
+    
+    # ------------------------------------------------------------------
+    # Построение дерева
+    # ------------------------------------------------------------------
+    
+    def _build(self, scripts: Dict[str, str], info: Dict[str, Dict], states: Dict[str, bool]) -> None:
+        """Строит дерево обычными объектами Python, без обращений к Qt."""
+        self.root.children = []
+        self.script_nodes = {}
+        self._folders = {(): self.root}
+        
+        for script_name in sorted(scripts, key=str.lower):
+            # Строки создаются для существующих скриптов, но только для тех, для которых есть info
+            script_info = info.get(script_name)
+            if not script_info:
+                continue
+            
+            parts = split_menu_path(script_info.get("menu_path", "")) or [script_name]
+            parent = self.root
+            for depth in range(len(parts) - 1):
+                key = tuple(parts[:depth + 1])
+                folder = self._folders.get(key)
+                if folder is None:
+                    folder = ScriptTreeNode(parts[depth], parent)
+                    parent.children.append(folder)
+                    self._folders[key] = folder
+                parent = folder
+            
+            node = self._make_script_node(parts[-1], parent, script_name, script_info, states)
+            parent.children.append(node)
+            self.script_nodes[script_name] = node
+        
+        self._sort_and_count(self.root)
+        self._apply_filter(self.root, *self._filter)
+    
+    @staticmethod
+    def _make_script_node(name: str, parent: ScriptTreeNode, script_name: str,
+                          script_info: Dict, states: Dict[str, bool]) -> ScriptTreeNode:
+        """Создает узел скрипта с флажком и подсказкой."""
+        node = ScriptTreeNode(name, parent, script_name)
+        node.checked = bool(states.get(script_name, script_info.get("default", False)))
+        tooltip_parts = []
+        if script_info.get("tooltip"):
+            tooltip_parts.append(script_info["tooltip"])
+        tooltip_parts.append(f"Путь: {script_info.get('menu_path', '')}")
+        node.tooltip = "\n".join(tooltip_parts)
+        return node
+    
+    @staticmethod
+    def _sort_key(node: ScriptTreeNode) -> Tuple[bool, str]:
+        """Порядок детей папки: папки по имени, затем скрипты по имени скрипта, как в _build."""
+        if node.is_folder:
+            return False, node.name.lower()
+        return True, node.script_name.lower()
+    
+    def _insert_position(self, nodes: List[ScriptTreeNode], node: ScriptTreeNode) -> int:
+        """Позиция, на которую нужно вставить узел, чтобы сохранить порядок _sort_key."""
+        key = self._sort_key(node)
+        low, high = 0, len(nodes)
+        while low < high:
+            middle = (low + high) // 2
+            if self._sort_key(nodes[middle]) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+    
+    def _sort_and_count(self, folder: ScriptTreeNode) -> None:
+        """Папки идут перед скриптами и сортируются по имени, считает флажки папок."""
+        folder.children.sort(key=lambda node: (not node.is_folder, node.name.lower() if node.is_folder else 0))
+        folder.total = 0
+        folder.enabled = 0
+        for child in folder.children:
+            if child.is_folder:
+                self._sort_and_count(child)
+                folder.total += child.total
+                folder.enabled += child.enabled
+            else:
+                folder.total += 1
+                folder.enabled += int(child.checked)
+    
+    def _apply_filter(self, folder: ScriptTreeNode, names: Optional[Set[str]],
+                      ranks: Optional[Dict[str, float]] = None) -> Optional[float]:
+        """
+        Пересчитывает отфильтрованных детей папки.
+        
+        Returns:
+            None, если в папке не осталось скриптов, иначе лучшая оценка
+            скрипта в папке (0, если оценки не переданы)
+        """
+        folder.shown = []
+        scores = {}
+        for child in folder.children:
+            if child.is_folder:
+                child.fetched = False
+                score = self._apply_filter(child, names, ranks)
+            elif names is None or child.script_name in names:
+                score = ranks.get(child.script_name, 0.0) if ranks else 0.0
+            else:
+                score = None
+            if score is not None:
+                scores[id(child)] = score
+                folder.shown.append(child)
+        
+        if ranks:
+            # Стабильная сортировка: при равных оценках сохраняется алфавитный порядок
+            folder.shown.sort(key=lambda child: -scores[id(child)])
+        for row, child in enumerate(folder.shown):
+            child.row = row
+        return max(scores.values()) if scores else None
+    
+    # ------------------------------------------------------------------
+    # Публичный интерфейс
+    # ------------------------------------------------------------------
+    
+    def set_filter(self, names: Optional[Iterable[str]], ranks: Optional[Dict[str, float]] = None) -> None:
+        """
+        Оставляет видимыми только указанные скрипты одним сбросом модели.
+        
+        Args:
+            names: Имена видимых скриптов или None, чтобы показать все
+            ranks: Оценки совпадения {имя_скрипта: оценка}. Если переданы,
+                скрипты и папки сортируются по убыванию лучшей оценки
+        """
+        self._filter = (set(names) if names is not None else None, ranks)
+        self.beginResetModel()
+        self._apply_filter(self.root, *self._filter)
+        self.endResetModel()
+    
+    def set_scripts(self, scripts: Dict[str, str], info: Dict[str, Dict], states: Dict[str, bool]) -> None:
+        """
+        Перестраивает дерево для нового набора скриптов одним сбросом модели.
+        Текущий фильтр сохраняется.
+        
+        Args:
+            scripts: Словарь {имя_скрипта: путь_в_меню}
+            info: Словарь {имя_скрипта: {параметры}}
+            states: Словарь {имя_скрипта: включен_ли}
+        """
+        self.beginResetModel()
+        self._build(scripts, info, states)
+        self.endResetModel()
+    
+    def add_scripts(self, scripts: Dict[str, str], info: Dict[str, Dict], states: Dict[str, bool]) -> None:
+        """
+        Добавляет новые скрипты, не перестраивая дерево. Уже известные скрипты
+        и скрипты без info пропускаются. Виду отправляется по одному
+        rowsInserted на каждый новый узел в уже существующей папке и по одному
+        dataChanged на каждую папку, у которой поменялись счетчики. Если
+        задан фильтр, он применяется заново одним сбросом модели.
+        
+        Args:
+            scripts: Словарь {имя_скрипта: путь_в_меню}
+            info: Словарь {имя_скрипта: {параметры}}
+            states: Словарь {имя_скрипта: включен_ли}
+        """
+        # Новые узлы, родители которых уже были в дереве до вызова
+        top_nodes: List[ScriptTreeNode] = []
+        new_folders: Set[int] = set()
+        touched: Dict[int, ScriptTreeNode] = {}
+        
+        for script_name in sorted(scripts, key=str.lower):
+            script_info = info.get(script_name)
+            if script_name in self.script_nodes or not script_info:
+                continue
+            
+            parts = split_menu_path(script_info.get("menu_path", "")) or [script_name]
+            parent = self.root
+            for depth in range(len(parts) - 1):
+                key = tuple(parts[:depth + 1])
+                folder = self._folders.get(key)
+                if folder is None:
+                    folder = ScriptTreeNode(parts[depth], parent)
+                    parent.children.insert(self._insert_position(parent.children, folder), folder)
+                    self._folders[key] = folder
+                    if id(parent) not in new_folders:
+                        top_nodes.append(folder)
+                    new_folders.add(id(folder))
+                parent = folder
+            
+            node = self._make_script_node(parts[-1], parent, script_name, script_info, states)
+            parent.children.insert(self._insert_position(parent.children, node), node)
+            self.script_nodes[script_name] = node
+            if id(parent) not in new_folders:
+                top_nodes.append(node)
+            
+            ancestor = parent
+            while ancestor is not None:
+                ancestor.total += 1
+                ancestor.enabled += int(node.checked)
+                if id(ancestor) not in new_folders and ancestor is not self.root:
+                    touched[id(ancestor)] = ancestor
+                ancestor = ancestor.parent
+        
+        if not top_nodes:
+            return
+        if self._filter != (None, None):
+            self.set_filter(*self._filter)
+            return
+        
+        for node in top_nodes:
+            if node.is_folder:
+                self._apply_filter(node, None)
+            self._insert_shown(node)
+        roles = [Qt.CheckStateRole, Qt.DisplayRole]
+        for folder in touched.values():
+            if folder.parent.fetched:
+                index = self.createIndex(folder.row, 0, folder)
+                self.dataChanged.emit(index, index, roles)
+    
+    def folder_path(self, index: QModelIndex) -> Tuple[str, ...]:
+        """Путь папки от корня в виде кортежа имен."""
+        names = []
+        node = self._node(index)
+        while node is not None and node is not self.root:
+            names.append(node.name)
+            node = node.parent
+        return tuple(reversed(names))
+    
+    def iter_fetched_folders(self) -> Iterable[QModelIndex]:
+        """Индексы всех папок, ветки которых уже отданы виду."""
+        stack = [QModelIndex()]
+        while stack:
+            parent_index = stack.pop()
+            node = self._node(parent_index)
+            if not node.fetched:
+                continue
+            for child in node.shown:
+                if child.is_folder:
+                    child_index = self.createIndex(child.row, 0, child)
+                    yield child_index
+                    stack.append(child_index)
+    
+    def find_folder(self, path: Tuple[str, ...]) -> QModelIndex:
+        """
+        Находит папку по пути, отдавая виду ветки по дороге.
+        
+        Returns:
+            Индекс папки или невалидный индекс, если ее нет среди видимых
+        """
+        index = QModelIndex()
+        for name in path:
+            node = self._node(index)
+            if not node.fetched:
+                self.fetchMore(index)
+            child = next((c for c in node.shown if c.is_folder and c.name == name), None)
+            if child is None:
+                return QModelIndex()
+            index = self.createIndex(child.row, 0, child)
+        return index
+    
+    def get_states(self) -> Dict[str, bool]:
+        """
+        Returns:
+            Словарь {имя_скрипта: включен_ли} для всех скриптов модели
+        """
+        return {name: node.checked for name, node in self.script_nodes.items()}
+    
+    def set_folder_checked(self, index: QModelIndex, checked: bool) -> None:
+        """
+        Включает или выключает все видимые скрипты папки.
+        
+        Данные меняются без сигналов, затем виду отправляется по одному
+        dataChanged на каждый уже раскрытый уровень и на цепочку родителей.
+        """
+        folder = self._node(index)
+        changed = False
+        for node in folder.iter_scripts(shown_only=True):
+            if node.checked != checked:
+                node.checked = checked
+                changed = True
+        if not changed:
+            return
+        
+        self._recount(folder)
+        self._recount_ancestors(folder)
+        self._emit_subtree_changed(folder)
+        self._emit_ancestors_changed(index)
+    
+    # ------------------------------------------------------------------
+    # QAbstractItemModel
+    # ------------------------------------------------------------------
+    
+    def index(self, row, column, parent=QModelIndex()):
+        node = self._node(parent)
+        if column != 0 or row < 0 or row >= len(node.shown):
+            return QModelIndex()
+        return self.createIndex(row, 0, node.shown[row])
+    
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self.root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() and parent.column() != 0:
+            return 0
+        node = self._node(parent)
+        return len(node.shown) if node.fetched else 0
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+    
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._node(parent)
+        return node.is_folder and bool(node.shown)
+    
+    def canFetchMore(self, parent):
+        node = self._node(parent)
+        return node.is_folder and not node.fetched and bool(node.shown)
+    
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        if node.fetched or not node.shown:
+            return
+        self.beginInsertRows(parent, 0, len(node.shown) - 1)
+        node.fetched = True
+        self.endInsertRows()
+    
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        
+        if role == Qt.DisplayRole:
+            if node.is_folder:
+                return f"{node.name} ({node.enabled}/{node.total})"
+            return node.name
+        if role == Qt.CheckStateRole:
+            return self._check_state(node)
+        if role == Qt.ToolTipRole:
+            return node.tooltip if not node.is_folder else None
+        if role == Qt.UserRole:
+            return node.script_name
+        return None
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        
+        checked = self._is_checked(value)
+        node = index.internalPointer()
+        if node.is_folder:
+            self.set_folder_checked(index, checked)
+            return True
+        
+        if node.checked != checked:
+            node.checked = checked
+            self._recount_ancestors(node)
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            self._emit_ancestors_changed(index)
+        return True
+    
+    # ------------------------------------------------------------------
+    # Внутренние методы
+    # ------------------------------------------------------------------
+    
+    def _node(self, index: QModelIndex) -> ScriptTreeNode:
+        return index.internalPointer() if index.isValid() else self.root
+    
+    @staticmethod
+    def _check_state(node: ScriptTreeNode):
+        if not node.is_folder:
+            return Qt.Checked if node.checked else Qt.Unchecked
+        if node.enabled == 0:
+            return Qt.Unchecked
+        if node.enabled == node.total:
+            return Qt.Checked
+        return Qt.PartiallyChecked
+    
+    @staticmethod
+    def _is_checked(value) -> bool:
+        """Вид может передать в setData как Qt.CheckState, так и int."""
+        return getattr(value, "value", value) == getattr(Qt.Checked, "value", Qt.Checked)
+    
+    def _insert_shown(self, node: ScriptTreeNode) -> None:
+        """Показывает новый узел в его папке, сообщая виду, если ветка уже отдана ему."""
+        parent = node.parent
+        position = self._insert_position(parent.shown, node)
+        if parent.fetched:
+            parent_index = QModelIndex() if parent is self.root else self.createIndex(parent.row, 0, parent)
+            self.beginInsertRows(parent_index, position, position)
+        parent.shown.insert(position, node)
+        for row in range(position, len(parent.shown)):
+            parent.shown[row].row = row
+        if parent.fetched:
+            self.endInsertRows()
+    
+    def _recount(self, folder: ScriptTreeNode) -> None:
+        """Пересчитывает флажки всех папок поддерева."""
+        folder.enabled = 0
+        for child in folder.children:
+            if child.is_folder:
+                self._recount(child)
+                folder.enabled += child.enabled
+            else:
+                folder.enabled += int(child.checked)
+    
+    @staticmethod
+    def _recount_ancestors(node: ScriptTreeNode) -> None:
+        """Пересчитывает флажки родительских папок узла."""
+        parent = node.parent
+        while parent is not None:
+            parent.enabled = sum(
+                child.enabled if child.is_folder else int(child.checked)
+                for child in parent.children
+            )
+            parent = parent.parent
+    
+    def _emit_subtree_changed(self, folder: ScriptTreeNode) -> None:
+        """Отправляет по одному dataChanged на каждую раскрытую папку поддерева."""
+        roles = [Qt.CheckStateRole, Qt.DisplayRole]
+        stack = [folder]
+        while stack:
+            node = stack.pop()
+            if not node.fetched or not node.shown:
+                continue
+            parent_index = QModelIndex() if node is self.root else self.createIndex(node.row, 0, node)
+            first = self.index(0, 0, parent_index)
+            last = self.index(len(node.shown) - 1, 0, parent_index)
+            self.dataChanged.emit(first, last, roles)
+            stack.extend(child for child in node.shown if child.is_folder)
+    
+    def _emit_ancestors_changed(self, index: QModelIndex) -> None:
+        """Обновляет флажки и счетчики папок над индексом (включая саму папку)."""
+        roles = [Qt.CheckStateRole, Qt.DisplayRole]
+        current = index if index.internalPointer().is_folder else index.parent()
+        while current.isValid():
+            self.dataChanged.emit(current, current, roles)
+            current = current.parent()
@@ -2,46 +2,161 @@
 Модуль для поиска и сканирования скриптов.
 """
 import os
-from typing import Dict
+import threading
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 import nuke
 import config
+from discovery_index import get_discovery_index
+from tree_scanner import scan_tree, iter_tree, scripts_from_tree, modules_from_tree, abs_path
+from script_finder import install_scripts_finder
 
 
-def discover_scripts(add_to_plugin_path: bool = False) -> Dict[str, str]:
+# Результат поиска: скрипты {имя_скрипта: путь_в_меню} и функции, которые по снимку
+# дерева строят список папок для pluginPath и таблицу модулей для ScriptsFinder
+DiscoveryResult = namedtuple("DiscoveryResult", ["scripts", "get_dirs", "get_modules"])
+
+# Результат последнего поиска. Нужен, чтобы сделать скрипты доступными для импорта
+# и найти их модули, не обходя дерево повторно
+_last_discovery: Optional[DiscoveryResult] = None
+# Поиск может идти одновременно в фоновом потоке панели и в главном потоке
+_last_discovery_lock = threading.Lock()
+# Папки, уже добавленные в pluginPath в этой сессии
+_plugin_path_dirs: Set[str] = set()
+
+
+def discover_scripts(add_to_plugin_path: bool = False, use_index: Optional[bool] = None,
+                     on_dir: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, str]:
     """
-    Находит все Python скрипты в директории scripts.
+    Находит все Python скрипты в директории scripts и запоминает результат
+    как последний поиск.
     
     Args:
-        add_to_plugin_path: Если True, добавляет директории в Nuke pluginPath
+        add_to_plugin_path: Если True, делает скрипты доступными для импорта:
+            добавляет директории в Nuke pluginPath или обновляет ScriptsFinder,
+            в зависимости от config.PLUGIN_PATH_MODE. Вызывает nuke, поэтому
+            допустимо только в главном потоке
+        use_index: Использовать ли персистентный индекс (по умолчанию config.USE_DISCOVERY_INDEX).
+            Если False, выполняется полный обход дерева
+        on_dir: Вызывается для каждой прочитанной или проверенной папки с путем
+            в меню и записью папки (см. find_scripts)
         
     Returns:
         Словарь {имя_скрипта: путь_в_меню}
     """
-    scripts = {}
-    
-    if not os.path.isdir(config.SCRIPTS_DIR):
-        return scripts
+    result = find_scripts(use_index, on_dir)
+    remember_discovery(result)
+    if add_to_plugin_path:
+        make_scripts_importable(result)
+    return result.scripts
+
+
+def find_scripts(use_index: Optional[bool] = None,
+                 on_dir: Optional[Callable[[str, Dict], None]] = None) -> DiscoveryResult:
+    """
+    Находит скрипты, не меняя состояние модуля, поэтому можно вызывать из любого потока.
     
-    for root, dirs, files in os.walk(config.SCRIPTS_DIR):
-        # Пропускаем исключенные директории
-        dirs[:] = [d for d in dirs if d not in config.EXCLUDED_DIRS]
-        
-        for file in files:
-            if file.endswith(".py"):
-                # Путь в меню - относительный путь от scripts_dir
-                menu_path = root[len(config.SCRIPTS_DIR) + 1:].replace("\\", "/")
-                script_name = os.path.splitext(file)[0]
-                scripts[script_name] = menu_path
+    Args:
+        use_index: Использовать ли персистентный индекс (по умолчанию config.USE_DISCOVERY_INDEX)
+        on_dir: Вызывается для каждой папки с путем в меню и результатом
+            tree_scanner.scan_dir: при полном обходе - для прочитанных папок,
+            с индексом - для каждой проверенной. Позволяет показывать найденные
+            скрипты до окончания поиска, а исключение из on_dir прерывает поиск
         
-        if add_to_plugin_path:
-            normalized_path = root.replace("\\", "/")
-            nuke.pluginAddPath(normalized_path)
+    Returns:
+        Результат поиска
+    """
+    if use_index is None:
+        use_index = config.USE_DISCOVERY_INDEX
+    
+    root = config.SCRIPTS_DIR.replace("\\", "/")
+    if use_index:
+        index = get_discovery_index()
+        index.refresh(on_dir)
+        tree = index.snapshot()
+    elif os.path.isdir(root):
+        tree = scan_tree(root, on_dir=on_dir)
+    else:
+        tree = {}
     
-    return scripts
+    return DiscoveryResult(
+        scripts_from_tree(tree),
+        lambda: [abs_path(root, rel) for rel in iter_tree(tree)],
+        lambda: modules_from_tree(root, tree),
+    )
+
+
+def remember_discovery(result: DiscoveryResult) -> None:
+    """Запоминает результат поиска как последний."""
+    global _last_discovery
+    with _last_discovery_lock:
+        _last_discovery = result
+
+
+def make_scripts_importable(result: DiscoveryResult) -> None:
+    """
+    Делает скрипты из результата поиска доступными для импорта: добавляет их
+    папки в pluginPath или обновляет ScriptsFinder (config.PLUGIN_PATH_MODE).
+    Папки, уже добавленные в этой сессии, повторно не добавляются.
+    Дерево повторно не обходится. Вызывать только в главном потоке.
+    """
+    if config.PLUGIN_PATH_MODE == "finder":
+        install_scripts_finder(result.get_modules())
+    else:
+        for folder in result.get_dirs():
+            if folder not in _plugin_path_dirs:
+                nuke.pluginAddPath(folder)
+                _plugin_path_dirs.add(folder)
+
+
+def make_discovered_scripts_importable() -> None:
+    """Делает доступными для импорта скрипты из последнего поиска (см. make_scripts_importable)."""
+    result = _get_last_discovery()
+    if result is not None:
+        make_scripts_importable(result)
+
+
+def get_discovered_scripts() -> Dict[str, str]:
+    """
+    Returns:
+        Копия результата последнего поиска {имя_скрипта: путь_в_меню}
+    """
+    result = _get_last_discovery()
+    return dict(result.scripts) if result is not None else {}
+
+
+def get_discovered_modules() -> Dict[str, Tuple[str, bool]]:
+    """
+    Returns:
+        Таблица модулей из последнего поиска {имя_модуля: (путь_к_файлу, является_ли_пакетом)}
+    """
+    result = _get_last_discovery()
+    return result.get_modules() if result is not None else {}
+
+
+def get_discovered_dirs() -> List[str]:
+    """
+    Returns:
+        Папки дерева скриптов из последнего поиска (пустой список, если поиска не было)
+    """
+    result = _get_last_discovery()
+    return result.get_dirs() if result is not None else []
+
+
+def _get_last_discovery() -> Optional[DiscoveryResult]:
+    with _last_discovery_lock:
+        return _last_discovery
 
 
 def add_scripts_folder_to_plugin_path() -> None:
     """
     Добавляет все папки внутри папки scripts в pluginPath.
+    В режиме config.PLUGIN_PATH_MODE == "finder" вместо этого устанавливает
+    ScriptsFinder в sys.meta_path.
     """
     discover_scripts(add_to_plugin_path=True)
+
+
+def get_discovery_stats() -> Dict[str, int]:
+    """Возвращает статистику попаданий/промахов индекса за текущую сессию."""
+    return get_discovery_index().get_stats()
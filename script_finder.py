@@ -0,0 +1,90 @@
+"""
+Поиск модулей скриптов через sys.meta_path.
+
+Вместо того чтобы добавлять каждую папку внутри scripts в pluginPath (и тем
+самым в sys.path), можно установить один finder, который по имени модуля сразу
+находит нужный файл по индексу. Тогда любой import из команды скрипта не
+перебирает сотни папок, а Nuke не ищет в каждой из них init.py и menu.py.
+"""
+import os
+import sys
+import importlib.abc
+import importlib.machinery
+import importlib.util
+from typing import Dict, Optional, Tuple
+
+
+class ScriptsFinder(importlib.abc.MetaPathFinder):
+    """Finder, который находит модули скриптов по заранее построенной таблице."""
+    
+    def __init__(self, modules: Optional[Dict[str, Tuple[str, bool]]] = None):
+        """
+        Args:
+            modules: Словарь {имя_модуля: (путь_к_файлу, является_ли_пакетом)}
+        """
+        self.modules = modules or {}
+    
+    def update(self, modules: Dict[str, Tuple[str, bool]]) -> None:
+        """Заменяет таблицу модулей (например, после повторного поиска скриптов)."""
+        self.modules = modules
+    
+    def find_spec(self, fullname, path=None, target=None):
+        """Ищет только модули верхнего уровня, вложенные модули пакетов ищет Python."""
+        if path is not None:
+            return None
+        
+        module = self.modules.get(fullname)
+        if module is None:
+            return None
+        
+        file_path, is_package = module
+        # Файл могли удалить после построения индекса - тогда пусть ищет PathFinder
+        if not os.path.isfile(file_path):
+            return None
+        
+        if is_package:
+            return importlib.util.spec_from_file_location(
+                fullname, file_path,
+                submodule_search_locations=[os.path.dirname(file_path)]
+            )
+        return importlib.util.spec_from_file_location(fullname, file_path)
+
+
+_finder: Optional[ScriptsFinder] = None
+
+
+def install_scripts_finder(modules: Dict[str, Tuple[str, bool]]) -> ScriptsFinder:
+    """
+    Устанавливает (или обновляет) finder скриптов в sys.meta_path.
+    
+    Finder ставится прямо перед PathFinder, чтобы встроенные модули по-прежнему
+    находились первыми, а скрипты имели приоритет над sys.path, как это было
+    при добавлении их папок в начало sys.path через pluginAddPath.
+    
+    Args:
+        modules: Словарь {имя_модуля: (путь_к_файлу, является_ли_пакетом)}
+    
+    Returns:
+        Установленный экземпляр ScriptsFinder
+    """
+    global _finder
+    if _finder is None:
+        _finder = ScriptsFinder()
+    _finder.update(modules)
+    
+    if _finder not in sys.meta_path:
+        position = len(sys.meta_path)
+        for i, finder in enumerate(sys.meta_path):
+            if finder is importlib.machinery.PathFinder:
+                position = i
+                break
+        sys.meta_path.insert(position, _finder)
+    
+    importlib.invalidate_caches()
+    return _finder
+
+
+def uninstall_scripts_finder() -> None:
+    """Убирает finder скриптов из sys.meta_path."""
+    if _finder is not None and _finder in sys.meta_path:
+        sys.meta_path.remove(_finder)
@@ -2,9 +2,184 @@
 Менеджер для работы с информацией о скриптах.
 """
 import os
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, List, Optional, Set, Tuple
 import config
+from custom_commands import with_menu_paths
 from file_utils import read_json, write_json
+from info_snapshot import read_snapshot, write_snapshot, snapshot_path_for
+
+# Общий для процесса кэш разобранных файлов информации:
+# {путь: (сигнатура_файла, данные)}. Сигнатура - (mtime_ns, size, inode),
+# поэтому повторные чтения в сессии стоят один stat без чтения файла.
+_info_cache: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Dict[str, Any]]]] = {}
+_info_cache_lock = threading.Lock()
+
+
+def _file_signature(file_path: str) -> Optional[Tuple[int, int, int]]:
+    """Возвращает сигнатуру файла для проверки кэша или None, если файла нет."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def invalidate_info_cache(file_path: Optional[str] = None) -> None:
+    """
+    Сбрасывает кэш информации о скриптах.
+    
+    Args:
+        file_path: Путь к файлу, для которого сбросить кэш (по умолчанию весь кэш)
+    """
+    with _info_cache_lock:
+        if file_path is None:
+            _info_cache.clear()
+        else:
+            _info_cache.pop(file_path, None)
+
+
+def diff_scripts_info(old_info: Dict[str, Dict[str, Any]],
+                      new_info: Dict[str, Dict[str, Any]]) -> Set[str]:
+    """
+    Находит скрипты, информация о которых отличается.
+    
+    Args:
+        old_info: Информация о скриптах до изменения
+        new_info: Информация о скриптах после изменения
+        
+    Returns:
+        Множество имен добавленных, удаленных и измененных скриптов
+    """
+    changed = set(old_info.keys() ^ new_info.keys())
+    for script_name in old_info.keys() & new_info.keys():
+        if old_info[script_name] != new_info[script_name]:
+            changed.add(script_name)
+    return changed
+
+
+# Модификаторы горячих клавиш: варианты написания -> имя, в порядке Qt
+_SHORTCUT_MODIFIERS = {
+    "ctrl": "Ctrl", "control": "Ctrl", "ctl": "Ctrl", "^": "Ctrl",
+    "alt": "Alt", "option": "Alt", "opt": "Alt", "#": "Alt",
+    "shift": "Shift", "+": "Shift",
+    "meta": "Meta", "cmd": "Meta", "command": "Meta", "win": "Meta",
+}
+_MODIFIER_ORDER = ["Ctrl", "Alt", "Shift", "Meta"]
+
+
+def normalize_shortcut(shortcut: str) -> str:
+    """
+    Приводит горячую клавишу к единому виду: "ctrl+alt+o", "Alt+Ctrl+O" и
+    "^#o" (запись Nuke) дают "Ctrl+Alt+O".
+    
+    Args:
+        shortcut: Горячая клавиша в свободной записи
+        
+    Returns:
+        Нормализованная запись или пустая строка, если клавиши нет
+    """
+    text = shortcut.strip().replace(" ", "")
+    if not text:
+        return ""
+    
+    modifiers = set()
+    if "+" in text[1:] and any(part.lower() in _SHORTCUT_MODIFIERS for part in text.split("+")[:-1]):
+        # Запись через "+": Ctrl+Alt+O (клавиша "+" записывается как Ctrl++)
+        parts = text.split("+")
+        key = parts[-1] or "+"
+        for part in parts[:-1]:
+            if part:
+                modifiers.add(_SHORTCUT_MODIFIERS.get(part.lower(), part.title()))
+    else:
+        # Запись Nuke: символы-модификаторы перед клавишей (^ - Ctrl, # - Alt, + - Shift)
+        position = 0
+        while position < len(text) - 1 and text[position] in "^#+":
+            modifiers.add(_SHORTCUT_MODIFIERS[text[position]])
+            position += 1
+        key = text[position:]
+    
+    key = key.upper() if len(key) == 1 else key.title()
+    ordered = [name for name in _MODIFIER_ORDER if name in modifiers]
+    ordered += sorted(modifiers - set(_MODIFIER_ORDER))
+    return "+".join(ordered + [key])
+
+
+class ShortcutIndex:
+    """
+    Индекс (горячая клавиша, контекст) -> скрипты для поиска конфликтов
+    горячих клавиш за O(1).
+    """
+    
+    def __init__(self, scripts_info: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Args:
+            scripts_info: Информация о скриптах, по которой построить индекс
+        """
+        self._scripts_by_key: Dict[Tuple[str, str], Set[str]] = {}
+        self._key_by_script: Dict[str, Tuple[str, str]] = {}
+        for script_name, script_info in (scripts_info or {}).items():
+            self.update(script_name, script_info)
+    
+    @staticmethod
+    def make_key(shortcut: str, context: Optional[str]) -> Optional[Tuple[str, str]]:
+        """
+        Ключ индекса для горячей клавиши и контекста.
+        
+        Returns:
+            (нормализованная_клавиша, контекст) или None, если клавиши нет
+        """
+        normalized = normalize_shortcut(shortcut or "")
+        if not normalized:
+            return None
+        return normalized, context or config.SHORTCUT_CONTEXT_LABELS[0]
+    
+    def update(self, script_name: str, script_info: Optional[Dict[str, Any]]) -> None:
+        """Добавляет или обновляет горячую клавишу скрипта."""
+        self.remove(script_name)
+        if not isinstance(script_info, dict) or script_info.get("custom_cmd_checkbox", False):
+            # Для кастомной команды поля shortcut не используются
+            return
+        key = self.make_key(script_info.get("shortcut", ""), script_info.get("shortcut_context"))
+        if key is None:
+            return
+        self._scripts_by_key.setdefault(key, set()).add(script_name)
+        self._key_by_script[script_name] = key
+    
+    def remove(self, script_name: str) -> None:
+        """Убирает скрипт из индекса."""
+        key = self._key_by_script.pop(script_name, None)
+        if key is None:
+            return
+        names = self._scripts_by_key[key]
+        names.discard(script_name)
+        if not names:
+            del self._scripts_by_key[key]
+    
+    def find(self, shortcut: str, context: Optional[str] = None,
+             exclude: Optional[str] = None) -> List[str]:
+        """
+        Находит скрипты с той же горячей клавишей в том же контексте.
+        
+        Args:
+            shortcut: Горячая клавиша
+            context: Контекст (имя из config.SHORTCUT_CONTEXTS)
+            exclude: Скрипт, который не считать конфликтом (обычно редактируемый)
+            
+        Returns:
+            Отсортированные имена скриптов
+        """
+        key = self.make_key(shortcut, context)
+        if key is None:
+            return []
+        return sorted(name for name in self._scripts_by_key.get(key, ()) if name != exclude)
+    
+    def conflicts(self) -> Dict[Tuple[str, str], List[str]]:
+        """
+        Returns:
+            Словарь {(клавиша, контекст): скрипты} для клавиш, занятых несколькими скриптами
+        """
+        return {key: sorted(names) for key, names in self._scripts_by_key.items() if len(names) > 1}
 
 
 class ScriptInfoManager:
@@ -12,15 +187,44 @@ class ScriptInfoManager:
     
     def __init__(self):
         self.info_file = config.INFO_FILE
+        self.snapshot_file = snapshot_path_for(self.info_file)
+        self._shortcut_index: Optional[ShortcutIndex] = None
+    
+    def _load_scripts_info(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Возвращает разобранный файл информации из кэша, если файл не изменился.
+        Результат общий для всех вызовов - его нельзя изменять.
+        """
+        signature = _file_signature(self.info_file)
+        if signature is not None:
+            with _info_cache_lock:
+                cached = _info_cache.get(self.info_file)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+        
+        info = None
+        if signature is not None and config.USE_INFO_SNAPSHOT:
+            info = read_snapshot(self.info_file, self.snapshot_file)
+        if info is None:
+            info = read_json(self.info_file, default={})
+        
+        if signature is not None:
+            # Если файл изменился между stat и чтением, сигнатура просто не совпадет
+            # при следующем вызове и файл будет перечитан
+            with _info_cache_lock:
+                _info_cache[self.info_file] = (signature, info)
+        return info
     
     def get_scripts_info(self) -> Dict[str, Dict[str, Any]]:
         """
         Получает информацию о всех скриптах.
         
         Returns:
-            Словарь {имя_скрипта: {параметры}}
+            Словарь {имя_скрипта: {параметры}}. Это копия, ее можно изменять.
         """
-        return read_json(self.info_file, default={})
+        info = self._load_scripts_info()
+        return {name: dict(params) if isinstance(params, dict) else params
+                for name, params in info.items()}
     
     def save_scripts_info(self, info: Dict[str, Dict[str, Any]]) -> None:
         """
@@ -29,7 +233,23 @@ class ScriptInfoManager:
         Args:
             info: Словарь с информацией о скриптах
         """
-        write_json(self.info_file, info)
+        try:
+            written = write_json(self.info_file, info)
+        finally:
+            invalidate_info_cache(self.info_file)
+        
+        if config.USE_INFO_SNAPSHOT and (written or not os.path.exists(self.snapshot_file)):
+            self._write_snapshot()
+    
+    def _write_snapshot(self) -> None:
+        """
+        Обновляет двоичный снимок по сохраненному JSON.
+        Ошибки игнорируются: без снимка информация просто читается из JSON.
+        """
+        try:
+            write_snapshot(self.info_file, self.snapshot_file)
+        except (IOError, OSError):
+            pass
     
     def get_script_info(self, script_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -41,8 +261,8 @@ class ScriptInfoManager:
         Returns:
             Словарь с информацией о скрипте или None
         """
-        info = self.get_scripts_info()
-        return info.get(script_name)
+        script_info = self._load_scripts_info().get(script_name)
+        return dict(script_info) if isinstance(script_info, dict) else script_info
     
     def update_script_info(self, script_name: str, script_info: Dict[str, Any]) -> None:
         """
@@ -50,11 +270,31 @@ class ScriptInfoManager:
         
         Args:
             script_name: Имя скрипта
-            script_info: Словарь с информацией о скрипте
+            script_info: Словарь с информацией о скрипте. Для кастомной команды
+                в сохраненную копию добавляются пути меню (custom_menu_paths)
+        """
+        info = self.get_scripts_info()
+        info[script_name] = with_menu_paths(script_info)
+        self.save_scripts_info(info)
+        if self._shortcut_index is not None:
+            self._shortcut_index.update(script_name, info[script_name])
+    
+    def update_scripts_info(self, scripts_info: Dict[str, Dict[str, Any]]) -> None:
         """
+        Обновляет информацию о нескольких скриптах одной записью файла.
+        
+        Args:
+            scripts_info: Словарь {имя_скрипта: информация о скрипте}
+        """
+        if not scripts_info:
+            return
         info = self.get_scripts_info()
-        info[script_name] = script_info
+        for script_name, script_info in scripts_info.items():
+            info[script_name] = with_menu_paths(script_info)
         self.save_scripts_info(info)
+        if self._shortcut_index is not None:
+            for script_name in scripts_info:
+                self._shortcut_index.update(script_name, info[script_name])
     
     def remove_script_info(self, script_name: str) -> None:
         """
@@ -67,6 +307,20 @@ class ScriptInfoManager:
         if script_name in info:
             del info[script_name]
             self.save_scripts_info(info)
+            if self._shortcut_index is not None:
+                self._shortcut_index.remove(script_name)
+    
+    def get_shortcut_index(self) -> ShortcutIndex:
+        """
+        Возвращает индекс горячих клавиш. Строится при первом вызове,
+        дальше обновляется в update_script_info и remove_script_info.
+        
+        Returns:
+            Индекс (горячая клавиша, контекст) -> скрипты
+        """
+        if self._shortcut_index is None:
+            self._shortcut_index = ShortcutIndex(self._load_scripts_info())
+        return self._shortcut_index
     
     def get_default_state(self, script_name: str) -> bool:
         """
@@ -78,7 +332,7 @@ class ScriptInfoManager:
         Returns:
             True если включен по умолчанию, False иначе
         """
-        script_info = self.get_script_info(script_name)
+        script_info = self._load_scripts_info().get(script_name)
         if script_info:
             return script_info.get("default", False)
         return False
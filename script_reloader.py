@@ -0,0 +1,230 @@
+"""
+Перезагрузка измененных скриптов без перезапуска Nuke.
+
+Граф импортов строится статическим разбором файлов скриптов модулем ast,
+результат разбора кэшируется по mtime и размеру файла. Измененный модуль
+перезагружается вместе со всеми скриптами, которые импортируют его прямо
+или через другие скрипты, в порядке зависимостей: сначала то, что
+импортируют, затем то, что импортирует.
+Модуль не зависит от nuke.
+"""
+import os
+import sys
+import ast
+import importlib
+import importlib.util
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Кэш разбора {путь_к_файлу: ((mtime_ns, размер), имена_импортируемых_модулей)}
+_imports_cache: Dict[str, Tuple[Tuple[int, int], Set[str]]] = {}
+_imports_cache_lock = threading.Lock()
+
+# mtime_ns файла загруженного модуля, с которым сравнивается текущий {имя_модуля: mtime_ns}.
+# Записывается при первой проверке модуля и после каждой его перезагрузки. Сравнивается
+# только на равенство: mtime ставят часы файлового сервера, а не этой машины
+_known_mtimes: Dict[str, int] = {}
+
+
+def parse_imports(file_path: str) -> Set[str]:
+    """
+    Находит модули верхнего уровня, которые импортирует файл.
+    Относительные импорты (внутри пакета) не учитываются.
+    
+    Args:
+        file_path: Путь к .py файлу
+        
+    Returns:
+        Множество имен модулей. Для файла, который не читается или
+        не разбирается, пустое множество
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return set()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    
+    with _imports_cache_lock:
+        cached = _imports_cache.get(file_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    imports = set()
+    try:
+        with open(file_path, "rb") as file:
+            tree = ast.parse(file.read(), file_path)
+    except (OSError, SyntaxError, ValueError):
+        tree = None
+    if tree is not None:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imports.update(alias.name.split(".")[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                imports.add(node.module.split(".")[0])
+    
+    with _imports_cache_lock:
+        _imports_cache[file_path] = (signature, imports)
+    return imports
+
+
+def build_import_graph(modules: Dict[str, Tuple[str, bool]]) -> Dict[str, Set[str]]:
+    """
+    Строит граф импортов между скриптами.
+    
+    Args:
+        modules: Словарь {имя_модуля: (путь_к_файлу, является_ли_пакетом)},
+            как у DiscoveryIndex.get_modules
+            
+    Returns:
+        Словарь {имя_модуля: имена_скриптов, которые он импортирует}
+    """
+    return {
+        name: {imported for imported in parse_imports(path) if imported in modules and imported != name}
+        for name, (path, _) in modules.items()
+    }
+
+
+def find_dependents(graph: Dict[str, Set[str]], names: Iterable[str]) -> Set[str]:
+    """
+    Находит модули names и все модули, которые импортируют их прямо или через другие.
+    
+    Args:
+        graph: Граф импортов (см. build_import_graph)
+        names: Имена измененных модулей
+        
+    Returns:
+        Множество имен, включая сами names
+    """
+    importers: Dict[str, Set[str]] = {}
+    for name, imports in graph.items():
+        for imported in imports:
+            importers.setdefault(imported, set()).add(name)
+    
+    result = set(names)
+    stack = list(result)
+    while stack:
+        for importer in importers.get(stack.pop(), ()):
+            if importer not in result:
+                result.add(importer)
+                stack.append(importer)
+    return result
+
+
+def topological_order(graph: Dict[str, Set[str]], names: Iterable[str]) -> List[str]:
+    """
+    Упорядочивает модули так, чтобы импортируемые шли раньше импортирующих.
+    Модули из циклических импортов идут в конце в порядке имен.
+    
+    Args:
+        graph: Граф импортов (см. build_import_graph)
+        names: Модули, которые нужно упорядочить
+        
+    Returns:
+        Список имен
+    """
+    names = set(names)
+    pending = {name: graph.get(name, set()) & names for name in names}
+    order = []
+    ready = sorted(name for name, imports in pending.items() if not imports)
+    while ready:
+        name = ready.pop(0)
+        order.append(name)
+        del pending[name]
+        newly_ready = []
+        for other, imports in pending.items():
+            if name in imports:
+                imports.discard(name)
+                if not imports:
+                    newly_ready.append(other)
+        ready = sorted(ready + newly_ready)
+    return order + sorted(pending)
+
+
+def _loaded_signature(module) -> Optional[Tuple[int, int]]:
+    """
+    Возвращает (mtime в секундах, размер) исходника, с которым модуль был загружен,
+    из заголовка его .pyc. None, если .pyc нет или он проверяется не по mtime.
+    """
+    cached = getattr(module, "__cached__", None)
+    if not cached:
+        return None
+    try:
+        with open(cached, "rb") as file:
+            header = file.read(16)
+    except OSError:
+        return None
+    if len(header) < 16 or header[:4] != importlib.util.MAGIC_NUMBER:
+        return None
+    if int.from_bytes(header[4:8], "little") != 0:
+        return None
+    return int.from_bytes(header[8:12], "little"), int.from_bytes(header[12:16], "little")
+
+
+def find_changed_modules(modules: Dict[str, Tuple[str, bool]]) -> List[str]:
+    """
+    Находит загруженные скрипты, mtime файлов которых отличается от записанного.
+    
+    При первой проверке модуля mtime на момент загрузки берется из заголовка его .pyc.
+    Если .pyc нет, запоминается текущий mtime, и изменения отслеживаются с этой проверки.
+    
+    Args:
+        modules: Словарь {имя_модуля: (путь_к_файлу, является_ли_пакетом)}
+        
+    Returns:
+        Имена измененных модулей
+    """
+    changed = []
+    for name, (path, _) in modules.items():
+        module = sys.modules.get(name)
+        if module is None:
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        
+        known = _known_mtimes.get(name)
+        if known is not None:
+            if stat.st_mtime_ns != known:
+                changed.append(name)
+            continue
+        
+        signature = _loaded_signature(module)
+        if signature is None or signature == (int(stat.st_mtime) & 0xFFFFFFFF, stat.st_size & 0xFFFFFFFF):
+            _known_mtimes[name] = stat.st_mtime_ns
+        else:
+            changed.append(name)
+    return sorted(changed)
+
+
+def reload_modules(modules: Dict[str, Tuple[str, bool]],
+                   changed: Optional[Iterable[str]] = None) -> Dict[str, object]:
+    """
+    Перезагружает измененные скрипты и скрипты, которые от них зависят.
+    Незагруженные модули пропускаются - при следующем импорте они и так прочитаются заново.
+    
+    Args:
+        modules: Словарь {имя_модуля: (путь_к_файлу, является_ли_пакетом)}
+        changed: Имена измененных модулей (по умолчанию find_changed_modules)
+        
+    Returns:
+        Словарь с ключами "changed" (измененные модули), "reloaded" (перезагруженные
+        в порядке перезагрузки) и "failed" (список (имя, текст_ошибки))
+    """
+    changed = sorted(changed) if changed is not None else find_changed_modules(modules)
+    graph = build_import_graph(modules)
+    affected = [name for name in find_dependents(graph, changed) if name in sys.modules]
+    
+    reloaded, failed = [], []
+    for name in topological_order(graph, affected):
+        try:
+            importlib.reload(sys.modules[name])
+            reloaded.append(name)
+        except Exception as e:
+            failed.append((name, f"{type(e).__name__}: {e}"))
+        try:
+            _known_mtimes[name] = os.stat(modules[name][0]).st_mtime_ns
+        except OSError:
+            pass
+    
+    return {"changed": changed, "reloaded": reloaded, "failed": failed}
@@ -0,0 +1,142 @@
+"""
+Поиск скриптов для фильтра в ScriptsManagerPanel.
+
+Текст для поиска (имя скрипта, имя в меню, подсказка) нормализуется один раз
+при построении индекса. Триграммный индекс сужает кандидатов до скриптов,
+содержащих все триграммы запроса, и только они проверяются поиском подстроки.
+Если новый запрос продолжает предыдущий, поиск идет только по его результатам.
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Минимальная длина запроса, с которой используется триграммный индекс
+NGRAM_SIZE = 3
+
+
+def normalize(text: str) -> str:
+    """Приводит текст к виду для сравнения: без регистра, "ё" как "е"."""
+    return text.casefold().replace("ё", "е")
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class ScriptSearchIndex:
+    """Индекс для быстрого поиска скриптов по подстроке и нечеткого поиска."""
+    
+    def __init__(self, entries: Dict[str, Iterable[str]]):
+        """
+        Args:
+            entries: Словарь {имя_скрипта: [поля для поиска]}. Первые поля
+                (имя скрипта, имя в меню) важнее при нечетком поиске
+        """
+        self.names: List[str] = list(entries)
+        self.fields: List[Tuple[str, ...]] = [
+            tuple(normalize(field or "") for field in fields) for fields in entries.values()
+        ]
+        # Поля склеиваются через перевод строки, чтобы подстрока не совпала на стыке полей
+        self.texts: List[str] = ["\n".join(fields) for fields in self.fields]
+        self._postings: Dict[str, Set[int]] = {}
+        for doc_id, text in enumerate(self.texts):
+            for ngram in _ngrams(text):
+                self._postings.setdefault(ngram, set()).add(doc_id)
+        self._last_query = ""
+        self._last_result: Optional[List[int]] = None
+    
+    def search(self, query: str) -> List[str]:
+        """
+        Находит скрипты, в имени, имени в меню или подсказке которых есть query.
+        
+        Returns:
+            Имена найденных скриптов в порядке индекса
+        """
+        query = normalize(query)
+        if not query:
+            self._last_query, self._last_result = "", None
+            return list(self.names)
+        
+        if self._last_result is not None and self._last_query and query.startswith(self._last_query):
+            # Запрос дописали - результат может только сузиться
+            candidates: Iterable[int] = self._last_result
+        elif len(query) >= NGRAM_SIZE:
+            candidates = self._candidates(query)
+        else:
+            candidates = range(len(self.texts))
+        
+        result = [doc_id for doc_id in candidates if query in self.texts[doc_id]]
+        self._last_query, self._last_result = query, result
+        return [self.names[doc_id] for doc_id in result]
+    
+    def search_fuzzy(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Нечеткий поиск: символы запроса должны встречаться в поле по порядку,
+        но не обязательно подряд. Совпадения ранжируются: подстрока лучше
+        подпоследовательности, начало поля лучше середины, главные поля лучше подсказки.
+        
+        Args:
+            query: Строка поиска
+            limit: Сколько лучших результатов вернуть (по умолчанию все)
+            
+        Returns:
+            Список (имя_скрипта, оценка) по убыванию оценки
+        """
+        query = normalize(query).strip()
+        if not query:
+            return [(name, 0.0) for name in self.names]
+        
+        scored = []
+        for doc_id, fields in enumerate(self.fields):
+            best = 0.0
+            for field_number, field in enumerate(fields):
+                score = _fuzzy_score(query, field)
+                if score:
+                    # Каждое следующее поле весит меньше предыдущего
+                    best = max(best, score / (1 + field_number))
+            if best:
+                scored.append((self.names[doc_id], best))
+        
+        scored.sort(key=lambda item: -item[1])
+        return scored[:limit] if limit is not None else scored
+    
+    def _candidates(self, query: str) -> List[int]:
+        """Пересечение списков документов по триграммам запроса, начиная с самого короткого."""
+        postings = []
+        for ngram in _ngrams(query):
+            docs = self._postings.get(ngram)
+            if not docs:
+                return []
+            postings.append(docs)
+        postings.sort(key=len)
+        result = set(postings[0])
+        for docs in postings[1:]:
+            result &= docs
+            if not result:
+                return []
+        return sorted(result)
+
+
+def _fuzzy_score(query: str, text: str) -> float:
+    """
+    Оценивает совпадение запроса с текстом. 0 - нет совпадения.
+    """
+    position = text.find(query)
+    if position == 0:
+        return 100.0
+    if position > 0:
+        # Совпадение с начала слова ценнее совпадения внутри слова
+        return 80.0 if not text[position - 1].isalnum() else 60.0
+    
+    # Поиск подпоследовательности: штраф за разрывы и позднее начало
+    first = -1
+    last = -1
+    gaps = 0
+    for char in query:
+        found = text.find(char, last + 1)
+        if found < 0:
+            return 0.0
+        if first < 0:
+            first = found
+        elif found != last + 1:
+            gaps += 1
+        last = found
+    return max(1.0, 40.0 - 5.0 * gaps - 0.5 * first)
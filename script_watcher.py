@@ -0,0 +1,308 @@
+"""
+Наблюдение за папкой scripts и scripts_info.json во время работы Nuke.
+
+Изменения отслеживаются через inotify (Linux, локальные файловые системы) или
+опросом mtime известных папок. Серия изменений, идущих подряд, сводится в один
+вызов on_change после паузы config.SCRIPT_WATCHER_DEBOUNCE секунд. on_change
+выполняется через dispatch, в Nuke это nuke.executeInMainThread.
+Модуль не зависит от nuke.
+"""
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import config
+
+# Файловые системы, изменения на которых с других машин inotify не видит
+NETWORK_FILESYSTEMS = {
+    "nfs", "nfs4", "cifs", "smbfs", "smb3", "afs", "9p", "ceph", "glusterfs",
+    "lustre", "gpfs", "fuse.sshfs", "fuse.glusterfs", "fuse.cephfs",
+}
+
+# Константы inotify из <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _PollBackend:
+    """Опрос mtime папок и файлов. Новые папки видны по mtime родителя."""
+    
+    name = "poll"
+    
+    def __init__(self, files: Iterable[str], interval: float):
+        self.files = list(files)
+        self.interval = interval
+        self.dirs: List[str] = []
+        self._signature: Optional[Dict[str, Tuple[int, int]]] = None
+    
+    def set_dirs(self, dirs: List[str]) -> None:
+        self.dirs = list(dirs)
+        # Новый список папок задает новую точку отсчета
+        self._signature = self._take_signature()
+    
+    def wait(self, stop: threading.Event, timeout: float) -> bool:
+        """Ждет до следующего опроса и возвращает True, если что-то изменилось."""
+        if stop.wait(min(timeout, self.interval)):
+            return False
+        signature = self._take_signature()
+        changed = self._signature is not None and signature != self._signature
+        self._signature = signature
+        return changed
+    
+    def close(self) -> None:
+        pass
+    
+    def _take_signature(self) -> Dict[str, Tuple[int, int]]:
+        signature = {}
+        for path in self.dirs + self.files:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature[path] = (stat.st_mtime_ns, stat.st_size)
+        return signature
+
+
+class _InotifyBackend:
+    """Наблюдение через inotify: по одному watch на каждую папку."""
+    
+    name = "inotify"
+    
+    def __init__(self, files: Iterable[str]):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        
+        # Файлы наблюдаются через их папки, так как атомарная запись заменяет файл
+        self.files: Dict[str, set] = {}
+        for file_path in files:
+            folder, name = os.path.split(os.path.abspath(file_path))
+            self.files.setdefault(folder, set()).add(name)
+        self._watches: Dict[str, int] = {}
+        self._paths: Dict[int, str] = {}
+        for folder in self.files:
+            self._add_watch(folder)
+    
+    def set_dirs(self, dirs: List[str]) -> None:
+        wanted = {os.path.abspath(path) for path in dirs} | set(self.files)
+        for path in list(self._watches):
+            if path not in wanted:
+                wd = self._watches.pop(path)
+                self._paths.pop(wd, None)
+                self._libc.inotify_rm_watch(self._fd, wd)
+        for path in wanted:
+            if path not in self._watches:
+                self._add_watch(path)
+    
+    def wait(self, stop: threading.Event, timeout: float) -> bool:
+        """Ждет событий не дольше timeout и возвращает True, если изменились скрипты."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable or stop.is_set():
+            return False
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return False
+            raise
+        
+        changed = False
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(sys.getfilesystemencoding(), "replace")
+            offset += length
+            if self._is_relevant(wd, mask, name):
+                changed = True
+        return changed
+    
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+    
+    def _add_watch(self, path: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOENT:
+                return
+            # ENOSPC - исчерпан лимит fs.inotify.max_user_watches
+            raise OSError(error, f"inotify_add_watch: {path}")
+        self._watches[path] = wd
+        self._paths[wd] = path
+    
+    def _is_relevant(self, wd: int, mask: int, name: str) -> bool:
+        """Отбрасывает события о временных файлах редакторов и служебных файлах."""
+        if mask & (IN_Q_OVERFLOW | IN_DELETE_SELF | IN_MOVE_SELF):
+            return True
+        folder = self._paths.get(wd)
+        if folder in self.files and name in self.files[folder]:
+            return True
+        if mask & IN_ISDIR:
+            return name not in config.EXCLUDED_DIRS
+        return name.endswith(".py")
+
+
+def is_network_path(path: str, mounts_file: str = "/proc/mounts") -> bool:
+    """
+    Проверяет, лежит ли путь на сетевой файловой системе.
+    
+    Args:
+        path: Путь к папке
+        mounts_file: Таблица монтирования
+        
+    Returns:
+        True для сетевых файловых систем. Если таблицу прочитать не удалось, False
+    """
+    path = os.path.realpath(path)
+    best_mount, best_type = "", ""
+    try:
+        with open(mounts_file, "r", encoding="utf-8") as file:
+            for line in file:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mount_point = parts[1].replace("\\040", " ")
+                inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) >= len(best_mount):
+                    best_mount, best_type = mount_point, parts[2]
+    except OSError:
+        return False
+    return best_type in NETWORK_FILESYSTEMS
+
+
+class ScriptsWatcher:
+    """Фоновый поток, который вызывает on_change после изменений в наблюдаемых папках."""
+    
+    def __init__(self, on_change: Callable[[], None], files: Iterable[str] = (),
+                 dispatch: Optional[Callable[[Callable[[], None]], None]] = None,
+                 backend: Optional[str] = None, debounce: Optional[float] = None,
+                 poll_interval: Optional[float] = None, root: Optional[str] = None):
+        """
+        Args:
+            on_change: Что вызвать после изменений
+            files: Отдельные файлы для наблюдения (например, scripts_info.json)
+            dispatch: Как вызвать on_change, например nuke.executeInMainThread.
+                По умолчанию вызывается прямо в потоке наблюдателя
+            backend: "auto", "inotify" или "poll" (по умолчанию config.SCRIPT_WATCHER_BACKEND)
+            debounce: Пауза после последнего изменения перед вызовом on_change
+            poll_interval: Интервал опроса mtime для backend "poll"
+            root: Папка, по которой выбирается backend в режиме "auto"
+                (по умолчанию config.SCRIPTS_DIR)
+        """
+        self.on_change = on_change
+        self.files = list(files)
+        self.dispatch = dispatch or (lambda function: function())
+        self.debounce = config.SCRIPT_WATCHER_DEBOUNCE if debounce is None else debounce
+        self.poll_interval = config.SCRIPT_WATCHER_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.requested_backend = backend or config.SCRIPT_WATCHER_BACKEND
+        self.root = root or config.SCRIPTS_DIR
+        self.backend = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._new_dirs: Optional[List[str]] = None
+    
+    @property
+    def backend_name(self) -> Optional[str]:
+        return self.backend.name if self.backend is not None else None
+    
+    def start(self, dirs: List[str]) -> None:
+        """
+        Запускает наблюдение.
+        
+        Args:
+            dirs: Папки дерева скриптов (см. script_discovery.get_discovered_dirs)
+        """
+        if self._thread is not None:
+            return
+        self.backend = self._create_backend()
+        self.set_dirs(dirs)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ScriptsWatcher", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Останавливает поток наблюдения."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.backend is not None:
+            self.backend.close()
+    
+    def set_dirs(self, dirs: List[str]) -> None:
+        """
+        Передает новый список папок после обновления индекса. Можно вызывать
+        из любого потока, применяется потоком наблюдателя.
+        """
+        with self._lock:
+            self._new_dirs = list(dirs)
+    
+    def _create_backend(self):
+        backend = self.requested_backend
+        if backend == "auto":
+            backend = "poll" if not sys.platform.startswith("linux") or is_network_path(self.root) else "inotify"
+        if backend == "inotify":
+            try:
+                return _InotifyBackend(self.files)
+            except (OSError, AttributeError):
+                pass
+        return _PollBackend(self.files, self.poll_interval)
+    
+    def _apply_new_dirs(self) -> None:
+        with self._lock:
+            dirs, self._new_dirs = self._new_dirs, None
+        if dirs is None:
+            return
+        try:
+            self.backend.set_dirs(dirs)
+        except OSError:
+            # Не хватило watch'ей inotify - переходим на опрос
+            self.backend.close()
+            self.backend = _PollBackend(self.files, self.poll_interval)
+            self.backend.set_dirs(dirs)
+    
+    def _run(self) -> None:
+        last_change: Optional[float] = None
+        while not self._stop.is_set():
+            self._apply_new_dirs()
+            timeout = self.debounce if last_change is not None else self.poll_interval
+            try:
+                changed = self.backend.wait(self._stop, timeout)
+            except OSError:
+                changed = False
+                self._stop.wait(self.poll_interval)
+            
+            now = time.monotonic()
+            if changed:
+                last_change = now
+            elif last_change is not None and now - last_change >= self.debounce:
+                last_change = None
+                try:
+                    self.dispatch(self.on_change)
+                except Exception:
+                    pass
@@ -0,0 +1,110 @@
+"""
+Загрузка данных для ScriptsManagerPanel без обращений к Qt.
+
+Читает scripts_info.json и состояния пользователя, затем ищет скрипты и
+отдает их пачками по мере обхода. Результат поиска не записывается в общее
+состояние script_discovery, а возвращается вызывающему, поэтому поиск в
+фоновом потоке не мешает поиску в главном. Qt-обертка - panels/scripts_loader.py.
+"""
+import os
+import time
+from typing import Callable, Dict, Optional
+from script_discovery import DiscoveryResult, find_scripts
+from script_info_manager import ScriptInfoManager
+from user_data_manager import UserDataManager
+
+# Найденные скрипты отправляются в панель пачками не чаще, чем раз в столько секунд
+BATCH_INTERVAL = 0.25
+
+
+class LoadingCancelled(Exception):
+    """Загрузка отменена закрытием панели."""
+
+
+class LoadingError(Exception):
+    """Загрузка не удалась, текст - сообщение для пользователя."""
+
+
+class ScriptsLoadJob:
+    """Одна загрузка данных панели. Метод run можно выполнять в любом потоке."""
+    
+    def __init__(self, on_info: Callable[[Dict[str, Dict]], None],
+                 on_states: Callable[[Dict[str, bool]], None],
+                 on_batch: Callable[[Dict[str, str]], None],
+                 info_manager: Optional[ScriptInfoManager] = None,
+                 user_manager: Optional[UserDataManager] = None,
+                 batch_interval: float = BATCH_INTERVAL):
+        """
+        Args:
+            on_info: Получает информацию о скриптах
+            on_states: Получает состояния скриптов пользователя
+            on_batch: Получает очередную пачку найденных скриптов {имя_скрипта: путь_в_меню}
+            info_manager: Менеджер информации о скриптах
+            user_manager: Менеджер данных пользователя
+            batch_interval: Минимальный интервал между пачками в секундах
+        """
+        self.on_info = on_info
+        self.on_states = on_states
+        self.on_batch = on_batch
+        self.info_manager = info_manager or ScriptInfoManager()
+        self.user_manager = user_manager or UserDataManager()
+        self.batch_interval = batch_interval
+        self._cancelled = False
+        self._pending: Dict[str, str] = {}
+        self._last_emit = 0.0
+    
+    def cancel(self) -> None:
+        """Просит прервать загрузку. Проверяется перед каждым этапом и на каждой папке."""
+        self._cancelled = True
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+    
+    def run(self) -> DiscoveryResult:
+        """
+        Загружает информацию о скриптах, состояния пользователя и скрипты.
+        
+        Returns:
+            Результат поиска скриптов
+            
+        Raises:
+            LoadingCancelled: Если загрузка отменена
+            LoadingError: Если загружать нечего (нет scripts_info.json или скриптов)
+        """
+        self._check_cancelled()
+        if not os.path.isfile(self.info_manager.info_file):
+            raise LoadingError("Нужен файл scripts_info.json")
+        
+        scripts_info = self.info_manager.get_scripts_info()
+        if not scripts_info:
+            raise LoadingError("Ошибка чтения файла scripts_info.json")
+        self.on_info(scripts_info)
+        self._check_cancelled()
+        self.on_states(self.user_manager.get_scripts_state(scripts_info=scripts_info))
+        self._check_cancelled()
+        
+        self._last_emit = time.monotonic()
+        result = find_scripts(on_dir=self._on_dir)
+        self._emit_pending()
+        if not result.scripts:
+            raise LoadingError("Не нашел ни одного скрипта в папке scripts")
+        return result
+    
+    def _check_cancelled(self) -> None:
+        if self._cancelled:
+            raise LoadingCancelled()
+    
+    def _on_dir(self, menu_path: str, entry: Dict) -> None:
+        """Копит скрипты из прочитанной папки и отправляет их пачкой."""
+        self._check_cancelled()
+        for script_name in entry["scripts"]:
+            self._pending[script_name] = menu_path
+        if time.monotonic() - self._last_emit >= self.batch_interval:
+            self._emit_pending()
+    
+    def _emit_pending(self) -> None:
+        if self._pending:
+            self.on_batch(self._pending)
+            self._pending = {}
+        self._last_emit = time.monotonic()
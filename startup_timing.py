@@ -0,0 +1,191 @@
+"""
+Замеры времени этапов запуска ScriptsManager.
+
+menu.py оборачивает каждый этап в span(), а сгенерированный menu.py
+пользователя вызывает begin("user_menu")/end("user_menu"). Замеры копятся
+в памяти и дописываются в журнал в папке пользователя (JSON по строке на
+этап), когда menu.py или menu.py пользователя вызывает finish(). Каждый
+дописывает только свои замеры с общим идентификатором сессии, поэтому
+menu.py пользователя, который упал или сгенерирован без finish(), не мешает
+записать этапы menu.py. Старые сессии удаляются из журнала только при
+просмотре (trim_log), а не при запуске Nuke.
+"""
+import os
+import json
+import time
+import socket
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import config
+from file_utils import write_text_file, ensure_dir
+
+# Идентификатор текущего запуска Nuke: все этапы одной сессии пишутся с ним
+SESSION_ID = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+_started: Dict[str, float] = {}
+_pending: List[Dict[str, Any]] = []
+
+
+def begin(phase: str) -> None:
+    """Отмечает начало этапа."""
+    if config.STARTUP_TIMING:
+        _started[phase] = time.perf_counter()
+
+
+def end(phase: str) -> Optional[float]:
+    """
+    Отмечает конец этапа.
+    
+    Returns:
+        Длительность этапа в секундах или None, если begin не вызывался
+    """
+    start = _started.pop(phase, None)
+    if start is None:
+        return None
+    elapsed = time.perf_counter() - start
+    _pending.append({"session": SESSION_ID, "phase": phase, "ms": round(elapsed * 1000, 3)})
+    return elapsed
+
+
+@contextmanager
+def span(phase: str):
+    """Замеряет время выполнения блока with как отдельного этапа."""
+    begin(phase)
+    try:
+        yield
+    finally:
+        end(phase)
+
+
+def finish(part: str, log_file: Optional[str] = None) -> None:
+    """
+    Отмечает конец части запуска (menu.py или menu.py пользователя) и
+    дописывает в журнал замеры, накопленные к этому моменту.
+    
+    Args:
+        part: Имя части запуска
+        log_file: Путь к журналу (по умолчанию config.STARTUP_TIMING_LOG)
+    """
+    flush(log_file)
+
+
+def flush(log_file: Optional[str] = None) -> None:
+    """
+    Дописывает накопленные замеры в конец журнала одной записью: журнал при
+    этом не читается, не переписывается и не сбрасывается на диск через fsync.
+    Ошибки записи игнорируются, чтобы замеры никогда не мешали запуску Nuke.
+    
+    Args:
+        log_file: Путь к журналу (по умолчанию config.STARTUP_TIMING_LOG)
+    """
+    if not _pending:
+        return
+    log_file = log_file or config.STARTUP_TIMING_LOG
+    host = socket.gethostname()
+    lines = [json.dumps(dict(record, host=host), ensure_ascii=False) for record in _pending]
+    _pending.clear()
+    
+    try:
+        ensure_dir(os.path.dirname(log_file))
+        with open(log_file, "a", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+    except (IOError, OSError):
+        pass
+
+
+def trim_log(log_file: Optional[str] = None) -> None:
+    """
+    Оставляет в журнале только последние config.STARTUP_TIMING_KEEP_SESSIONS сессий
+    и убирает поврежденные строки. Вызывается при просмотре замеров, а не при запуске.
+    
+    Args:
+        log_file: Путь к журналу (по умолчанию config.STARTUP_TIMING_LOG)
+        
+    Raises:
+        IOError: Если не удалось перезаписать журнал
+    """
+    log_file = log_file or config.STARTUP_TIMING_LOG
+    if not os.path.isfile(log_file):
+        return
+    records = _read_records(log_file)
+    keep = set(_session_order(records)[-config.STARTUP_TIMING_KEEP_SESSIONS:])
+    lines = [json.dumps(record, ensure_ascii=False) for record in records if record["session"] in keep]
+    write_text_file(log_file, "".join(line + "\n" for line in lines))
+
+
+def read_sessions(log_file: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Читает журнал замеров.
+    
+    Args:
+        log_file: Путь к журналу (по умолчанию config.STARTUP_TIMING_LOG)
+        
+    Returns:
+        Список сессий от старых к новым: [{"session": ..., "host": ..., "phases": {этап: мс}}]
+    """
+    records = _read_records(log_file or config.STARTUP_TIMING_LOG)
+    sessions: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        session = sessions.setdefault(record["session"], {
+            "session": record["session"],
+            "host": record.get("host", ""),
+            "phases": {},
+        })
+        phases = session["phases"]
+        phases[record["phase"]] = phases.get(record["phase"], 0.0) + record["ms"]
+    return [sessions[session_id] for session_id in _session_order(records)]
+
+
+def format_breakdown(sessions: List[Dict[str, Any]]) -> str:
+    """
+    Формирует текстовую сводку: этапы последней сессии и среднее по всем сессиям.
+    
+    Args:
+        sessions: Результат read_sessions
+    """
+    if not sessions:
+        return "Нет замеров запуска"
+    
+    last = sessions[-1]
+    phase_names = list(last["phases"])
+    for session in sessions:
+        for phase in session["phases"]:
+            if phase not in phase_names:
+                phase_names.append(phase)
+    
+    width = max(len(phase) for phase in phase_names + ["Итого"])
+    lines = [f"Сессия {last['session']} ({last['host']}), среднее по {len(sessions)} сессиям", ""]
+    last_total = 0.0
+    average_total = 0.0
+    for phase in phase_names:
+        values = [session["phases"][phase] for session in sessions if phase in session["phases"]]
+        average = sum(values) / len(values)
+        current = last["phases"].get(phase)
+        last_total += current or 0.0
+        average_total += average
+        current_text = f"{current:10.1f}" if current is not None else f"{'-':>10}"
+        lines.append(f"{phase:<{width}} {current_text} мс {average:10.1f} мс")
+    lines.append(f"{'Итого':<{width}} {last_total:10.1f} мс {average_total:10.1f} мс")
+    return "\n".join(lines)
+
+
+def _read_records(log_file: str) -> List[Dict[str, Any]]:
+    """Читает записи журнала, пропуская поврежденные строки."""
+    records = []
+    try:
+        with open(log_file, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and {"session", "phase", "ms"} <= record.keys():
+                    records.append(record)
+    except (IOError, OSError):
+        pass
+    return records
+
+
+def _session_order(records: List[Dict[str, Any]]) -> List[str]:
+    """Идентификаторы сессий в порядке первого появления."""
+    return list(dict.fromkeys(record["session"] for record in records))
@@ -0,0 +1,152 @@
+"""
+Тесты для общего кэша байткода скриптов.
+"""
+import pytest
+import sys
+import os
+import importlib
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bytecode_cache
+from bytecode_cache import BytecodeCache, CachedSourceLoader, install_bytecode_cache, uninstall_bytecode_cache
+
+
+@pytest.fixture
+def scripts_tree(tmp_path):
+    """Дерево скриптов: модуль в папке Tools, пакет bc_pkg и файл с ошибкой."""
+    root = tmp_path / "scripts"
+    (root / "Tools" / "bc_pkg").mkdir(parents=True)
+    (root / "Tools" / "bc_tool.py").write_text("VALUE = 'tool'\n")
+    (root / "Tools" / "bc_pkg" / "__init__.py").write_text("from bc_pkg.inner import VALUE\n")
+    (root / "Tools" / "bc_pkg" / "inner.py").write_text("VALUE = 'inner'\n")
+    (root / "Tools" / "bc_broken.py").write_text("def broken(:\n")
+    cache = BytecodeCache(str(root), str(tmp_path / "cache"))
+    yield root, cache
+    uninstall_bytecode_cache()
+    for name in ("bc_tool", "bc_pkg", "bc_pkg.inner"):
+        sys.modules.pop(name, None)
+
+
+class TestCompileTree:
+    """Тесты для компиляции дерева в кэш."""
+    
+    def test_compile_and_manifest(self, scripts_tree):
+        """Тест: скрипты компилируются, ошибки собираются, в манифест попадают только .pyc без ошибок."""
+        root, cache = scripts_tree
+        report = cache.compile_tree(max_workers=2)
+        
+        assert report["compiled"] == 3
+        assert [rel for rel, _ in report["failed"]] == ["Tools/bc_broken.py"]
+        assert sorted(cache.get_files()) == ["Tools/bc_pkg/__init__.py", "Tools/bc_pkg/inner.py", "Tools/bc_tool.py"]
+        assert os.path.isfile(cache.pyc_path("Tools/bc_tool.py"))
+        assert {"bc_tool", "bc_pkg", "inner"} <= cache.get_module_names()
+    
+    def test_unchanged_files_skipped(self, scripts_tree):
+        """Тест: повторная компиляция пропускает неизмененные файлы."""
+        root, cache = scripts_tree
+        cache.compile_tree()
+        
+        (root / "Tools" / "bc_tool.py").write_text("VALUE = 'changed tool'\n")
+        report = BytecodeCache(cache.root, cache.cache_dir).compile_tree()
+        assert report["compiled"] == 1
+        assert report["skipped"] == 2
+    
+    def test_removed_script_pyc_deleted(self, scripts_tree):
+        """Тест: .pyc удаленного скрипта удаляется из кэша."""
+        root, cache = scripts_tree
+        cache.compile_tree()
+        
+        os.remove(root / "Tools" / "bc_tool.py")
+        report = cache.compile_tree()
+        assert report["removed"] == 1
+        assert not os.path.exists(cache.pyc_path("Tools/bc_tool.py"))
+    
+    def test_other_python_version_ignored(self, scripts_tree):
+        """Тест: манифест другой версии Python не используется."""
+        root, cache = scripts_tree
+        cache.compile_tree()
+        
+        manifest = bytecode_cache.read_json(cache.manifest_file)
+        manifest["cache_tag"] = "cpython-00"
+        bytecode_cache.write_json(cache.manifest_file, manifest)
+        assert BytecodeCache(cache.root, cache.cache_dir).get_files() == {}
+
+
+class TestLoadCode:
+    """Тесты для загрузки байткода с проверкой целостности."""
+    
+    def test_load_valid(self, scripts_tree):
+        """Тест: байткод неизмененного скрипта загружается из кэша."""
+        root, cache = scripts_tree
+        cache.compile_tree()
+        
+        code = cache.load_code(str(root / "Tools" / "bc_tool.py"))
+        namespace = {}
+        exec(code, namespace)
+        assert namespace["VALUE"] == "tool"
+        assert cache.stats["loaded"] == 1
+    
+    def test_corrupted_pyc_rejected(self, scripts_tree):
+        """Тест: .pyc, не совпадающий с sha256 из манифеста, не загружается."""
+        root, cache = scripts_tree
+        cache.compile_tree()
+        
+        with open(cache.pyc_path("Tools/bc_tool.py"), "ab") as file:
+            file.write(b"garbage")
+        assert cache.load_code(str(root / "Tools" / "bc_tool.py")) is None
+        assert cache.stats["rejected"] == 1
+    
+    def test_stale_pyc_rejected(self, scripts_tree):
+        """Тест: после изменения исходника байткод из кэша не используется."""
+        root, cache = scripts_tree
+        cache.compile_tree()
+        
+        source = root / "Tools" / "bc_tool.py"
+        source.write_text("VALUE = 'edited after precompile'\n")
+        assert cache.load_code(str(source)) is None
+    
+    def test_outside_tree(self, scripts_tree, tmp_path):
+        """Тест: для файлов вне дерева скриптов кэш не используется."""
+        _, cache = scripts_tree
+        cache.compile_tree()
+        assert cache.load_code(str(tmp_path / "other.py")) is None
+
+
+class TestInstall:
+    """Тесты для загрузки скриптов через finder кэша."""
+    
+    def test_not_installed_without_cache(self, scripts_tree):
+        """Тест: если кэш не собран, finder не ставится."""
+        _, cache = scripts_tree
+        assert install_bytecode_cache(cache) is None
+    
+    def test_import_uses_cache(self, scripts_tree):
+        """Тест: модули и пакеты из дерева импортируются через CachedSourceLoader."""
+        root, cache = scripts_tree
+        cache.compile_tree()
+        finder = install_bytecode_cache(cache)
+        assert finder in sys.meta_path
+        
+        sys.path.insert(0, str(root / "Tools"))
+        try:
+            importlib.invalidate_caches()
+            import bc_tool
+            import bc_pkg
+        finally:
+            sys.path.remove(str(root / "Tools"))
+        
+        assert bc_tool.VALUE == "tool"
+        assert bc_pkg.VALUE == "inner"
+        assert isinstance(bc_tool.__spec__.loader, CachedSourceLoader)
+        assert isinstance(sys.modules["bc_pkg.inner"].__spec__.loader, CachedSourceLoader)
+        assert cache.stats["loaded"] == 3
+    
+    def test_uninstall(self, scripts_tree):
+        """Тест: finder убирается из sys.meta_path."""
+        _, cache = scripts_tree
+        cache.compile_tree()
+        finder = install_bytecode_cache(cache)
+        uninstall_bytecode_cache()
+        assert finder not in sys.meta_path
@@ -0,0 +1,98 @@
+"""
+Тесты для разбора кастомных команд.
+"""
+import sys
+import os
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_commands import (MENU_PATHS_KEY, extract_menu_paths, with_menu_paths,
+                             compile_custom_command, validate_custom_command, clear_code_cache)
+
+
+class TestExtractMenuPaths:
+    """Тесты для функции extract_menu_paths."""
+    
+    def test_single_line(self):
+        """Тест: вызов addCommand в одну строку."""
+        command = "nuke.menu('Nuke').addCommand('Tools/My Tool', 'my_tool.run()')"
+        assert extract_menu_paths(command) == ["Tools/My Tool"]
+    
+    def test_multiline_call(self):
+        """Тест: аргументы addCommand на нескольких строках."""
+        command = (
+            "m = nuke.menu('Nuke')\n"
+            "m.addCommand(\n"
+            "    'Tools/First',\n"
+            "    'first.run()')\n"
+            "m.addCommand(name=\"Tools/Second\", command='second.run()')\n"
+        )
+        assert extract_menu_paths(command) == ["Tools/First", "Tools/Second"]
+    
+    def test_two_calls_on_one_line(self):
+        """Тест: несколько вызовов в одной строке (построчный разбор их пропускал)."""
+        command = "nuke.menu('Nuke').addCommand('A/a', 'a()'); nuke.menu('Nodes').addCommand('B/b', 'b()')"
+        assert extract_menu_paths(command) == ["A/a", "B/b"]
+    
+    def test_non_literal_path_skipped(self):
+        """Тест: путь, вычисляемый при выполнении, не извлекается."""
+        command = "path = 'A/a'\nnuke.menu('Nuke').addCommand(path, 'a()')"
+        assert extract_menu_paths(command) == []
+    
+    def test_syntax_error_falls_back_to_lines(self):
+        """Тест: команда с синтаксической ошибкой разбирается построчно."""
+        command = "nuke.menu('Nuke').addCommand('Tools/Broken', 'x()')\nif:"
+        assert extract_menu_paths(command) == ["Tools/Broken"]
+
+
+class TestWithMenuPaths:
+    """Тесты для функции with_menu_paths."""
+    
+    def test_custom_command_adds_paths(self):
+        """Тест: для кастомной команды добавляются пути, исходный словарь не меняется."""
+        info = {"custom_cmd_checkbox": True, "custom_command": "nuke.menu('Nuke').addCommand('A/a', 'a()')"}
+        result = with_menu_paths(info)
+        assert result[MENU_PATHS_KEY] == ["A/a"]
+        assert MENU_PATHS_KEY not in info
+    
+    def test_standard_command_drops_paths(self):
+        """Тест: у скрипта без кастомной команды устаревшие пути убираются."""
+        info = {"custom_cmd_checkbox": False, MENU_PATHS_KEY: ["A/a"]}
+        assert MENU_PATHS_KEY not in with_menu_paths(info)
+    
+    def test_unchanged_returns_same_dict(self):
+        """Тест: если пути актуальны, возвращается тот же словарь."""
+        info = {"menu_path": "A/a"}
+        assert with_menu_paths(info) is info
+
+
+class TestCompileCustomCommand:
+    """Тесты для кэша скомпилированных команд."""
+    
+    def setup_method(self):
+        clear_code_cache()
+    
+    def test_same_text_compiled_once(self):
+        """Тест: одинаковый текст возвращает тот же объект кода."""
+        command = "result.append(1)"
+        code = compile_custom_command(command)
+        assert compile_custom_command(command) is code
+        
+        result = []
+        exec(code, {"result": result})
+        assert result == [1]
+    
+    def test_different_text_compiled_separately(self):
+        """Тест: разный текст - разный код."""
+        assert compile_custom_command("x = 1") is not compile_custom_command("x = 2")
+    
+    def test_validate_ok(self):
+        """Тест: корректная команда проходит проверку."""
+        assert validate_custom_command("nuke.menu('Nuke').addCommand('A/a', 'a()')") is None
+    
+    def test_validate_syntax_error(self):
+        """Тест: синтаксическая ошибка возвращается текстом с номером строки."""
+        error = validate_custom_command("x = 1\nif:")
+        assert error is not None
+        assert "Строка 2" in error
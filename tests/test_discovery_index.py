@@ -0,0 +1,122 @@
+"""
+Тесты для DiscoveryIndex.
+"""
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discovery_index import DiscoveryIndex
+
+
+def _walk_scripts(root):
+    """Эталонный результат - то, что возвращает обход через os.walk."""
+    scripts = {}
+    for current, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        for file in files:
+            if file.endswith(".py"):
+                scripts[os.path.splitext(file)[0]] = current[len(root) + 1:].replace("\\", "/")
+    return scripts
+
+
+@pytest.fixture
+def scripts_tree(tmp_path):
+    """Создает небольшое дерево скриптов."""
+    root = tmp_path / "scripts"
+    (root / "File").mkdir(parents=True)
+    (root / "Edit" / "Nodes").mkdir(parents=True)
+    (root / "Edit" / "__pycache__").mkdir()
+    (root / "File" / "openCopy.py").write_text("")
+    (root / "Edit" / "Nodes" / "smartMerge.py").write_text("")
+    (root / "Edit" / "readme.txt").write_text("")
+    (root / "Edit" / "__pycache__" / "cached.py").write_text("")
+    return str(root).replace("\\", "/")
+
+
+@pytest.fixture(autouse=True)
+def no_grace():
+    """Отключаем защиту от свежих mtime, чтобы индекс можно было проверять сразу."""
+    with patch('discovery_index.config.DISCOVERY_MTIME_GRACE', 0):
+        yield
+
+
+class TestDiscoveryIndex:
+    """Тесты для инкрементального индекса."""
+    
+    def test_first_refresh_does_full_rescan(self, scripts_tree, tmp_path):
+        """Тест: без файла индекса выполняется полный обход."""
+        index = DiscoveryIndex(scripts_tree, str(tmp_path / "index.json"))
+        index.refresh()
+        
+        assert index.get_scripts() == _walk_scripts(scripts_tree)
+        assert index.get_stats()["full_rescans"] == 1
+        assert os.path.isfile(tmp_path / "index.json")
+    
+    def test_index_is_reused_between_sessions(self, scripts_tree, tmp_path):
+        """Тест: сохраненный индекс подтверждается по mtime без перечитывания папок."""
+        index_file = str(tmp_path / "index.json")
+        DiscoveryIndex(scripts_tree, index_file).refresh()
+        
+        index = DiscoveryIndex(scripts_tree, index_file)
+        index.refresh()
+        stats = index.get_stats()
+        
+        assert index.get_scripts() == _walk_scripts(scripts_tree)
+        assert stats["full_rescans"] == 0
+        assert stats["misses"] == 0
+        assert stats["hits"] == 4
+    
+    def test_only_changed_subtree_is_rescanned(self, scripts_tree, tmp_path):
+        """Тест: перечитываются только папки с изменившимся mtime."""
+        index_file = str(tmp_path / "index.json")
+        DiscoveryIndex(scripts_tree, index_file).refresh()
+        
+        os.makedirs(f"{scripts_tree}/File/New")
+        with open(f"{scripts_tree}/File/New/newScript.py", "w"):
+            pass
+        os.remove(f"{scripts_tree}/Edit/Nodes/smartMerge.py")
+        
+        index = DiscoveryIndex(scripts_tree, index_file)
+        index.refresh()
+        stats = index.get_stats()
+        
+        assert index.get_scripts() == _walk_scripts(scripts_tree)
+        assert "newScript" in index.get_scripts()
+        assert "smartMerge" not in index.get_scripts()
+        assert stats["full_rescans"] == 0
+        assert stats["misses"] == 2
+    
+    def test_removed_folder_drops_subtree(self, scripts_tree, tmp_path):
+        """Тест: удаленная папка пропадает из индекса вместе с вложенными."""
+        index = DiscoveryIndex(scripts_tree, str(tmp_path / "index.json"))
+        index.refresh()
+        
+        os.remove(f"{scripts_tree}/Edit/Nodes/smartMerge.py")
+        os.rmdir(f"{scripts_tree}/Edit/Nodes")
+        index.refresh()
+        
+        assert index.get_scripts() == _walk_scripts(scripts_tree)
+        assert f"{scripts_tree}/Edit/Nodes" not in index.get_dirs()
+    
+    def test_corrupted_index_falls_back_to_full_rescan(self, scripts_tree, tmp_path):
+        """Тест: поврежденный файл индекса приводит к полному обходу."""
+        index_file = tmp_path / "index.json"
+        index_file.write_text("{not json")
+        
+        index = DiscoveryIndex(scripts_tree, str(index_file))
+        index.refresh()
+        
+        assert index.get_scripts() == _walk_scripts(scripts_tree)
+        assert index.get_stats()["full_rescans"] == 1
+    
+    def test_missing_root_returns_nothing(self, tmp_path):
+        """Тест: если папки scripts нет, скриптов тоже нет."""
+        index = DiscoveryIndex(str(tmp_path / "missing"), str(tmp_path / "index.json"))
+        index.refresh()
+        
+        assert index.get_scripts() == {}
+        assert index.get_dirs() == []
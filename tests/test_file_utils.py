@@ -0,0 +1,146 @@
+"""
+Тесты для file_utils.
+"""
+import pytest
+import sys
+import os
+import stat
+from unittest.mock import patch
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from file_utils import (read_json, write_json, write_text_file, get_write_stats,
+                        reset_write_stats, batch_writes)
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    """Обнуляет статистику записи перед каждым тестом."""
+    reset_write_stats()
+    yield
+    reset_write_stats()
+
+
+class TestSkipUnchangedWrites:
+    """Тесты пропуска записи одинакового содержимого."""
+    
+    def test_write_text_file_skips_identical_content(self, tmp_path):
+        """Тест: повторная запись того же текста не трогает файл."""
+        file_path = str(tmp_path / "menu.py")
+        
+        assert write_text_file(file_path, "line1\nline2\n") is True
+        mtime = os.stat(file_path).st_mtime_ns
+        
+        assert write_text_file(file_path, "line1\nline2\n") is False
+        assert os.stat(file_path).st_mtime_ns == mtime
+        assert get_write_stats() == {"written": 1, "skipped": 1}
+    
+    def test_write_text_file_writes_changed_content(self, tmp_path):
+        """Тест: измененное содержимое записывается, даже если размер тот же."""
+        file_path = str(tmp_path / "menu.py")
+        write_text_file(file_path, "aaaa")
+        
+        assert write_text_file(file_path, "bbbb") is True
+        with open(file_path, encoding="utf-8") as file:
+            assert file.read() == "bbbb"
+    
+    def test_write_json_skips_identical_data(self, tmp_path):
+        """Тест: одинаковые данные JSON не перезаписываются."""
+        file_path = str(tmp_path / "users" / "data.json")
+        data = {"script1": True, "скрипт": False}
+        
+        assert write_json(file_path, data) is True
+        assert write_json(file_path, dict(data)) is False
+        assert write_json(file_path, {"script1": False, "скрипт": False}) is True
+        assert read_json(file_path) == {"script1": False, "скрипт": False}
+        assert get_write_stats() == {"written": 2, "skipped": 1}
+
+
+class TestAtomicWrites:
+    """Тесты атомарной записи через временный файл."""
+    
+    def test_no_temp_files_left(self, tmp_path):
+        """Тест: после записи в папке остается только целевой файл."""
+        file_path = str(tmp_path / "data.json")
+        write_json(file_path, {"script1": True})
+        write_json(file_path, {"script1": False})
+        
+        assert os.listdir(tmp_path) == ["data.json"]
+        assert read_json(file_path) == {"script1": False}
+    
+    def test_failed_write_keeps_old_file(self, tmp_path):
+        """Тест: при ошибке записи старый файл остается целым, временный удаляется."""
+        file_path = str(tmp_path / "menu.py")
+        write_text_file(file_path, "old content\n")
+        
+        with patch('file_utils.os.replace', side_effect=OSError("disk full")):
+            with pytest.raises(IOError):
+                write_text_file(file_path, "new content\n")
+        
+        assert os.listdir(tmp_path) == ["menu.py"]
+        with open(file_path, encoding="utf-8") as file:
+            assert file.read() == "old content\n"
+    
+    @pytest.mark.skipif(os.name == "nt", reason="права POSIX")
+    def test_existing_permissions_preserved(self, tmp_path):
+        """Тест: перезапись не меняет права файла."""
+        file_path = str(tmp_path / "menu.py")
+        write_text_file(file_path, "a")
+        os.chmod(file_path, 0o644)
+        write_text_file(file_path, "b")
+        
+        assert stat.S_IMODE(os.stat(file_path).st_mode) == 0o644
+    
+    def test_batch_writes_defers_only_dir_fsync(self, tmp_path):
+        """Тест: внутри batch_writes каждый файл сбрасывается до переименования, а папка - один раз в конце."""
+        with patch('file_utils.config.FSYNC_WRITES', True), \
+             patch('file_utils.os.fsync') as mock_fsync, \
+             patch('file_utils._fsync_dir') as mock_fsync_dir:
+            with batch_writes():
+                for i in range(3):
+                    write_text_file(str(tmp_path / f"menu{i}.py"), "content")
+                assert mock_fsync.call_count == 3
+                mock_fsync_dir.assert_not_called()
+            
+            mock_fsync_dir.assert_called_once_with(str(tmp_path))
+            
+            write_text_file(str(tmp_path / "single.py"), "content")
+            assert mock_fsync.call_count == 4
+            assert mock_fsync_dir.call_count == 2
+    
+    def test_fsync_before_replace(self, tmp_path):
+        """Тест: временный файл сбрасывается на диск до переименования."""
+        calls = []
+        with patch('file_utils.config.FSYNC_WRITES', True), \
+             patch('file_utils.os.fsync', side_effect=lambda fd: calls.append("fsync")), \
+             patch('file_utils._replace', side_effect=lambda *args: calls.append("replace")), \
+             patch('file_utils._fsync_dir'):
+            with batch_writes():
+                write_text_file(str(tmp_path / "menu.py"), "content")
+        assert calls == ["fsync", "replace"]
+    
+    def test_batch_writes_without_fsync(self, tmp_path):
+        """Тест: batch_writes(fsync=False) не делает fsync ни файлов, ни папок, после блока fsync возвращается."""
+        with patch('file_utils.config.FSYNC_WRITES', True), \
+             patch('file_utils.os.fsync') as mock_fsync, \
+             patch('file_utils._fsync_dir') as mock_fsync_dir:
+            with batch_writes(fsync=False):
+                with batch_writes():
+                    for i in range(3):
+                        write_text_file(str(tmp_path / f"menu{i}.py"), "content")
+            mock_fsync.assert_not_called()
+            mock_fsync_dir.assert_not_called()
+            assert (tmp_path / "menu2.py").read_text() == "content"
+            
+            write_text_file(str(tmp_path / "single.py"), "content")
+            mock_fsync.assert_called_once()
+            mock_fsync_dir.assert_called_once_with(str(tmp_path))
+    
+    def test_no_global_sync(self, tmp_path):
+        """Тест: в конце пакета не вызывается глобальный os.sync."""
+        with patch('file_utils.config.FSYNC_WRITES', True), \
+             patch('file_utils.os.sync', create=True) as mock_sync:
+            with batch_writes():
+                write_text_file(str(tmp_path / "menu.py"), "content")
+        mock_sync.assert_not_called()
@@ -0,0 +1,98 @@
+"""
+Тесты для двоичного снимка scripts_info.
+"""
+import pytest
+import sys
+import os
+import json
+from unittest.mock import patch
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from info_snapshot import read_snapshot, write_snapshot, snapshot_path_for
+from script_info_manager import ScriptInfoManager, invalidate_info_cache
+
+
+@pytest.fixture
+def info_file(tmp_path):
+    """Файл информации о скриптах во временной папке."""
+    path = tmp_path / "scripts_info.json"
+    path.write_text(json.dumps({"script1": {"default": True}}, indent=4), encoding="utf-8")
+    return str(path)
+
+
+class TestInfoSnapshot:
+    """Тесты для записи и чтения снимка."""
+    
+    def test_snapshot_path(self):
+        """Тест: снимок лежит рядом с JSON."""
+        assert snapshot_path_for("/a/scripts_info.json") == "/a/scripts_info.snapshot"
+    
+    def test_write_and_read(self, info_file):
+        """Тест: снимок возвращает те же данные, что и JSON."""
+        assert write_snapshot(info_file) is True
+        assert read_snapshot(info_file) == {"script1": {"default": True}}
+    
+    def test_changed_json_invalidates_snapshot(self, info_file):
+        """Тест: после изменения JSON снимок не используется."""
+        write_snapshot(info_file)
+        with open(info_file, "w", encoding="utf-8") as file:
+            json.dump({"script1": {"default": False}}, file, indent=4)
+        
+        assert read_snapshot(info_file) is None
+    
+    def test_touched_json_is_checked_by_digest(self, info_file):
+        """Тест: если изменился только mtime, снимок подтверждается по sha256."""
+        write_snapshot(info_file)
+        st = os.stat(info_file)
+        os.utime(info_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        
+        assert read_snapshot(info_file) == {"script1": {"default": True}}
+    
+    def test_corrupted_snapshot_is_ignored(self, info_file):
+        """Тест: поврежденный снимок не приводит к ошибке."""
+        write_snapshot(info_file)
+        with open(snapshot_path_for(info_file), "r+b") as file:
+            file.truncate(20)
+        
+        assert read_snapshot(info_file) is None
+    
+    def test_missing_snapshot(self, info_file):
+        """Тест: без снимка возвращается None."""
+        assert read_snapshot(info_file) is None
+    
+    def test_invalid_json_is_not_snapshotted(self, tmp_path):
+        """Тест: для некорректного JSON снимок не создается."""
+        path = tmp_path / "scripts_info.json"
+        path.write_text("{broken", encoding="utf-8")
+        
+        assert write_snapshot(str(path)) is False
+        assert not os.path.exists(snapshot_path_for(str(path)))
+
+
+class TestScriptInfoManagerSnapshot:
+    """Тесты для использования снимка в ScriptInfoManager."""
+    
+    def test_save_writes_snapshot_and_read_uses_it(self, info_file):
+        """Тест: save_scripts_info пишет снимок, а чтение не разбирает JSON."""
+        with patch('script_info_manager.config.INFO_FILE', info_file):
+            manager = ScriptInfoManager()
+            manager.save_scripts_info({"script2": {"default": False}})
+            assert os.path.isfile(snapshot_path_for(info_file))
+            
+            invalidate_info_cache()
+            with patch('script_info_manager.read_json') as mock_read_json:
+                assert manager.get_scripts_info() == {"script2": {"default": False}}
+                mock_read_json.assert_not_called()
+    
+    def test_falls_back_to_json_when_snapshot_is_stale(self, info_file):
+        """Тест: при устаревшем снимке данные читаются из JSON."""
+        with patch('script_info_manager.config.INFO_FILE', info_file):
+            manager = ScriptInfoManager()
+            manager.save_scripts_info({"script2": {"default": False}})
+            with open(info_file, "w", encoding="utf-8") as file:
+                json.dump({"script3": {"default": True}}, file)
+            
+            invalidate_info_cache()
+            assert manager.get_scripts_info() == {"script3": {"default": True}}
@@ -0,0 +1,127 @@
+"""
+Тесты для применения изменений к меню Nuke.
+"""
+import pytest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import fake_nuke
+fake_nuke.install()
+
+import menu_builder
+from menu_builder import MenuBuilder
+from menu_trie import MenuTrie
+from custom_commands import with_menu_paths
+
+
+SCRIPTS_INFO = {
+    "openCopy": {"menu_path": "Tools/File/Open Copy", "command": "openCopy.run()"},
+    "smartMerge": {"menu_path": "Tools/File/Smart Merge", "command": "smartMerge.run()"},
+    "readWrite": {"menu_path": "Tools/Read\\/Write", "command": "readWrite.run()"},
+    "custom": with_menu_paths({
+        "custom_cmd_checkbox": True,
+        "custom_command": "nuke.menu('Nuke').addCommand('Custom/Tool', 'tool.run()')",
+    }),
+}
+
+
+@pytest.fixture
+def root_menu():
+    """Отдельное главное меню Nuke для каждого теста."""
+    root = menu_builder.nuke.Menu("Nuke")
+    with patch.object(menu_builder.nuke, "menu", lambda name: root):
+        yield root
+
+
+@pytest.fixture
+def builder(root_menu):
+    return MenuBuilder(MagicMock(), trie=MenuTrie())
+
+
+class TestApplyChanges:
+    """Тесты для добавления и удаления пунктов меню."""
+    
+    def test_enable_adds_items(self, builder, root_menu):
+        """Тест: включенные скрипты появляются в меню и в дереве путей."""
+        added, removed = builder.apply_changes(SCRIPTS_INFO, {}, {"openCopy": True, "readWrite": True})
+        
+        assert (added, removed) == (2, 0)
+        assert root_menu.findItem("Tools/File/Open Copy") == "openCopy.run()"
+        assert root_menu.findItem("Tools").findItem("Read\\/Write") == "readWrite.run()"
+        assert "Tools/File/Open Copy" in builder.trie
+    
+    def test_unchanged_states_not_touched(self, builder, root_menu):
+        """Тест: скрипты без изменения состояния не добавляются и не удаляются."""
+        assert builder.apply_changes(SCRIPTS_INFO, {"openCopy": True}, {"openCopy": True, "smartMerge": False}) == (0, 0)
+        assert root_menu.findItem("Tools") is None
+    
+    def test_disable_removes_item_and_empty_submenus(self, builder, root_menu):
+        """Тест: после удаления последнего пункта опустевшие подменю удаляются."""
+        builder.apply_changes(SCRIPTS_INFO, {}, {"openCopy": True, "smartMerge": True})
+        
+        builder.apply_changes(SCRIPTS_INFO, {"openCopy": True}, {"openCopy": False})
+        assert root_menu.findItem("Tools/File/Open Copy") is None
+        assert root_menu.findItem("Tools/File/Smart Merge") == "smartMerge.run()"
+        
+        assert builder.apply_changes(SCRIPTS_INFO, {"smartMerge": True}, {"smartMerge": False}) == (0, 1)
+        assert root_menu.findItem("Tools") is None
+        assert len(builder.trie) == 0
+    
+    def test_submenu_with_foreign_items_kept(self, builder, root_menu):
+        """Тест: подменю, в котором есть чужие пункты, не удаляется."""
+        builder.apply_changes(SCRIPTS_INFO, {}, {"openCopy": True})
+        root_menu.addCommand("Tools/File/Nuke Item", "nuke_item()")
+        
+        builder.apply_changes(SCRIPTS_INFO, {"openCopy": True}, {"openCopy": False})
+        assert root_menu.findItem("Tools/File/Nuke Item") == "nuke_item()"
+        assert root_menu.findItem("Tools/File/Open Copy") is None
+    
+    def test_custom_command(self, builder, root_menu):
+        """Тест: кастомная команда выполняется при включении и убирается по сохраненным путям при выключении."""
+        builder.apply_changes(SCRIPTS_INFO, {}, {"custom": True})
+        assert root_menu.findItem("Custom/Tool") == "tool.run()"
+        assert "Custom/Tool" in builder.trie
+        
+        builder.apply_changes(SCRIPTS_INFO, {"custom": True}, {"custom": False})
+        assert root_menu.findItem("Custom") is None
+    
+    def test_broken_custom_command_reported(self, builder, root_menu):
+        """Тест: ошибка кастомной команды показывается пользователю."""
+        info = {"broken": {"custom_cmd_checkbox": True, "custom_command": "undefined_name()"}}
+        with patch.object(menu_builder.nuke, "message") as mock_message:
+            builder.apply_changes(info, {}, {"broken": True})
+        assert "undefined_name" in mock_message.call_args[0][0]
+
+
+class TestMenuLookup:
+    """Тесты для поиска и создания подменю."""
+    
+    def test_menu_for_add_outside_apply_changes(self, builder, root_menu):
+        """Тест: вне apply_changes путь целиком отдается главному меню."""
+        assert builder._menu_for_add("Tools/File/Open Copy") == (root_menu, "Tools/File/Open Copy")
+    
+    def test_menu_for_add_caches_submenus(self, builder, root_menu):
+        """Тест: в пределах apply_changes подменю создаются один раз и берутся из кэша."""
+        builder._menus = {}
+        menu, item_name = builder._menu_for_add("Tools/File/Open Copy")
+        assert item_name == "Open Copy"
+        assert menu is root_menu.findItem("Tools/File")
+        
+        with patch.object(root_menu, "addMenu") as mock_add_menu:
+            assert builder._menu_for_add("Tools/File/Smart Merge") == (menu, "Smart Merge")
+        mock_add_menu.assert_not_called()
+        assert set(builder._menus) == {"", "Tools", "Tools/File"}
+    
+    def test_find_menu(self, builder, root_menu):
+        """Тест: поиск существующего подменю, отсутствующего и пункта вместо подменю."""
+        root_menu.addCommand("Tools/File/Open Copy", "openCopy.run()")
+        
+        assert builder._find_menu([]) is root_menu
+        assert builder._find_menu(["Tools", "File"]) is root_menu.findItem("Tools/File")
+        assert builder._find_menu(["Tools", "Missing"]) is None
+        assert builder._find_menu(["Tools", "File", "Open Copy"]) is None
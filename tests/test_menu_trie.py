@@ -0,0 +1,114 @@
+"""
+Тесты для дерева путей меню.
+"""
+import sys
+import os
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from menu_trie import MenuTrie, split_menu_path, escape_segment, join_menu_path
+
+
+class TestMenuPathEscaping:
+    """Тесты для разбора и экранирования путей меню."""
+    
+    def test_split_plain(self):
+        """Тест: обычный путь делится по слешам."""
+        assert split_menu_path("Tools/Keying/My Tool") == ["Tools", "Keying", "My Tool"]
+    
+    def test_split_escaped(self):
+        """Тест: экранированные слеши остаются внутри сегмента, в том числе несколько."""
+        assert split_menu_path("Tools/Read\\/Write\\/Copy") == ["Tools", "Read/Write/Copy"]
+    
+    def test_split_skips_empty_segments(self):
+        """Тест: лишние слеши не дают пустых сегментов."""
+        assert split_menu_path("/Tools//Tool/") == ["Tools", "Tool"]
+        assert split_menu_path("") == []
+    
+    def test_escape_is_idempotent(self):
+        """Тест: уже экранированный слеш повторно не экранируется."""
+        assert escape_segment("Read/Write") == "Read\\/Write"
+        assert escape_segment("Read\\/Write") == "Read\\/Write"
+    
+    def test_join_roundtrip(self):
+        """Тест: сборка пути обратна разбору."""
+        path = "Tools/Read\\/Write"
+        assert join_menu_path(split_menu_path(path)) == path
+
+
+class TestMenuTrie:
+    """Тесты для класса MenuTrie."""
+    
+    def test_add_counts_and_contains(self):
+        """Тест: количество пунктов считается по всему поддереву."""
+        trie = MenuTrie()
+        trie.add("Tools/Keying/a", "a")
+        trie.add("Tools/Keying/b", "b")
+        trie.add("Tools/c", "c")
+        assert len(trie) == 3
+        assert trie.find("Tools").count == 3
+        assert trie.find("Tools/Keying").count == 2
+        assert "Tools/c" in trie
+        assert "Tools/Keying" not in trie
+    
+    def test_remove_prunes_empty_submenus(self):
+        """Тест: удаление последнего пункта возвращает опустевшие подменю, самое глубокое первым."""
+        trie = MenuTrie()
+        trie.add("Tools/Keying/Deep/a", "a")
+        trie.add("Tools/b", "b")
+        
+        assert trie.remove("Tools/Keying/Deep/a") == [["Tools", "Keying", "Deep"], ["Tools", "Keying"]]
+        assert trie.find("Tools/Keying") is None
+        assert trie.find("Tools").count == 1
+        
+        assert trie.remove("Tools/b") == [["Tools"]]
+        assert len(trie) == 0
+    
+    def test_remove_unknown_path(self):
+        """Тест: удаление неизвестного пути ничего не меняет."""
+        trie = MenuTrie()
+        trie.add("Tools/a", "a")
+        assert trie.remove("Tools/missing") == []
+        assert trie.remove("Tools") == []
+        assert len(trie) == 1
+    
+    def test_duplicate_conflict(self):
+        """Тест: один путь у двух скриптов - конфликт, второй пункт не добавляется."""
+        trie = MenuTrie()
+        trie.add("Tools/a", "first")
+        conflicts = trie.add("Tools/a", "second")
+        assert [c.kind for c in conflicts] == ["duplicate"]
+        assert conflicts[0].script_names == ["first", "second"]
+        assert trie.find("Tools/a").script_name == "first"
+        assert trie.add("Tools/a", "first") == []
+    
+    def test_item_is_menu_conflict(self):
+        """Тест: путь не может быть одновременно пунктом и подменю."""
+        trie = MenuTrie()
+        trie.add("Tools/a", "a")
+        assert [c.kind for c in trie.add("Tools/a/b", "b")] == ["item_is_menu"]
+        assert [c.kind for c in trie.add("Tools", "c")] == ["item_is_menu"]
+        # Неудачное добавление не оставляет пустых подменю
+        assert trie.find("Tools/a/b") is None
+        assert len(trie) == 1
+    
+    def test_index_conflict(self):
+        """Тест: одинаковый index у соседних пунктов - предупреждение, пункт добавляется."""
+        trie = MenuTrie()
+        trie.add("Tools/a", "a", index=2)
+        conflicts = trie.add("Tools/b", "b", index=2)
+        assert [c.kind for c in conflicts] == ["index"]
+        assert "Tools/b" in trie
+        assert trie.add("Tools/c", "c", index=-1) == []
+    
+    def test_from_scripts_info(self):
+        """Тест: дерево строится по menu_path и путям кастомных команд."""
+        info = {
+            "a": {"menu_path": "Tools/a"},
+            "b": {"custom_cmd_checkbox": True, "custom_menu_paths": ["Tools/b1", "Other/b2"]},
+            "c": {"menu_path": "Tools/a"},
+        }
+        trie = MenuTrie.from_scripts_info(info)
+        assert dict(trie.items()) == {"Tools/a": "a", "Tools/b1": "b", "Other/b2": "b"}
+        assert [c.script_names for c in trie.conflicts_for("c")] == [["a", "c"]]
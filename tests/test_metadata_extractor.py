@@ -0,0 +1,173 @@
+"""
+Тесты для заполнения scripts_info.json по исходникам скриптов.
+"""
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metadata_extractor
+from metadata_extractor import (extract_metadata, suggest_menu_name, draft_script_info,
+                                MetadataExtractor, build_drafts)
+
+
+@pytest.fixture
+def scripts_tree(tmp_path):
+    """Два скрипта в папке Tools и пакет с __init__.py."""
+    (tmp_path / "Tools").mkdir()
+    (tmp_path / "Tools" / "renderTool.py").write_text(
+        '"""Рендер выбранных нод.\n\nПодробности."""\n\ndef renderTool():\n    pass\n'
+    )
+    (tmp_path / "Tools" / "helper.py").write_text("def compute(value):\n    return value\n")
+    scripts = {"renderTool": "Tools", "helper": "Tools", "pkg": "Tools/pkg"}
+    modules = {
+        "renderTool": (str(tmp_path / "Tools" / "renderTool.py"), False),
+        "helper": (str(tmp_path / "Tools" / "helper.py"), False),
+        "pkg": (str(tmp_path / "Tools" / "pkg" / "__init__.py"), True),
+    }
+    return scripts, modules
+
+
+class TestExtractMetadata:
+    """Тесты для разбора исходника."""
+    
+    def test_docstring_first_paragraph(self):
+        """Тест: описание - первый абзац docstring модуля в одну строку."""
+        source = b'"""\nCopy nodes\nbetween scripts.\n\nDetails here.\n"""\n'
+        assert extract_metadata(source, "copy")["docstring"] == "Copy nodes between scripts."
+    
+    def test_entry_points_without_required_arguments(self):
+        """Тест: точки входа - публичные функции, которые вызываются без аргументов."""
+        source = (b"def main():\n    pass\n"
+                  b"def with_default(a=1, *args, b=2, **kwargs):\n    pass\n"
+                  b"def required(a):\n    pass\n"
+                  b"def keyword_only(*, a):\n    pass\n"
+                  b"def _private():\n    pass\n"
+                  b"class Tool:\n    def run(self):\n        pass\n")
+        metadata = extract_metadata(source, "tool")
+        assert metadata["entry_points"] == ["main", "with_default"]
+        assert metadata["error"] is None
+    
+    def test_entry_point_preference(self):
+        """Тест: сначала функция с именем модуля, затем main/run/..., затем первая найденная."""
+        source = b"def first():\n    pass\ndef run():\n    pass\ndef tool():\n    pass\n"
+        assert extract_metadata(source, "tool")["entry_point"] == "tool"
+        assert extract_metadata(source, "other")["entry_point"] == "run"
+        assert extract_metadata(b"def first():\n    pass\n", "other")["entry_point"] == "first"
+    
+    def test_syntax_error(self):
+        """Тест: файл с ошибкой не выполняется и дает пустые метаданные с текстом ошибки."""
+        metadata = extract_metadata(b"def broken(:\n", "broken")
+        assert metadata["entry_point"] is None
+        assert metadata["error"]
+
+
+class TestDraftScriptInfo:
+    """Тесты для черновой записи."""
+    
+    def test_suggest_menu_name(self):
+        """Тест: имя в меню по имени скрипта."""
+        assert suggest_menu_name("renderTool") == "Render Tool"
+        assert suggest_menu_name("copy") == "Copy"
+    
+    def test_draft_with_entry_point(self):
+        """Тест: запись с командой вызова точки входа и всеми полями панели."""
+        info = draft_script_info("renderTool", "Tools", {"docstring": "Рендер", "entry_point": "renderTool"})
+        assert info["command"] == "import renderTool; renderTool.renderTool()"
+        assert info["menu_path"] == "Tools/Render Tool"
+        assert info["tooltip"] == "Рендер"
+        assert info["default"] is False
+        assert info["custom_cmd_checkbox"] is False
+        assert info["index"] == -1
+    
+    def test_draft_without_entry_point(self):
+        """Тест: без точки входа команда только импортирует модуль, слеш в имени экранируется."""
+        info = draft_script_info("read/write", "", {"docstring": "", "entry_point": None})
+        assert info["command"] == "import read/write"
+        assert info["menu_path"] == "Read\\/Write"
+
+
+class TestMetadataExtractor:
+    """Тесты для разбора многих файлов с кэшем."""
+    
+    def test_cache_skips_unchanged_files(self, tmp_path, scripts_tree):
+        """Тест: повторный разбор берет неизмененные файлы из кэша."""
+        _, modules = scripts_tree
+        files = {name: modules[name][0] for name in ("renderTool", "helper")}
+        cache_file = str(tmp_path / "cache.json")
+        
+        first = MetadataExtractor(cache_file)
+        result = first.extract(files, max_workers=2)
+        assert first.stats == {"cached": 0, "parsed": 2}
+        assert result["renderTool"]["entry_point"] == "renderTool"
+        
+        second = MetadataExtractor(cache_file)
+        assert second.extract(files) == result
+        assert second.stats == {"cached": 2, "parsed": 0}
+    
+    def test_changed_file_is_parsed_again(self, tmp_path, scripts_tree):
+        """Тест: измененный файл разбирается заново."""
+        _, modules = scripts_tree
+        path = modules["helper"][0]
+        cache_file = str(tmp_path / "cache.json")
+        MetadataExtractor(cache_file).extract({"helper": path})
+        
+        with open(path, "a") as file:
+            file.write("\ndef main():\n    pass\n")
+        extractor = MetadataExtractor(cache_file)
+        assert extractor.extract({"helper": path})["helper"]["entry_point"] == "main"
+        assert extractor.stats["parsed"] == 1
+    
+    def test_missing_file_skipped(self, tmp_path):
+        """Тест: несуществующий файл пропускается."""
+        extractor = MetadataExtractor(str(tmp_path / "cache.json"))
+        assert extractor.extract({"missing": str(tmp_path / "missing.py")}) == {}
+    
+    def test_process_pool(self, tmp_path, scripts_tree):
+        """Тест: разбор в пуле процессов дает тот же результат."""
+        _, modules = scripts_tree
+        files = {name: modules[name][0] for name in ("renderTool", "helper")}
+        threads = MetadataExtractor(str(tmp_path / "threads.json")).extract(files, max_workers=2)
+        processes = MetadataExtractor(str(tmp_path / "processes.json")).extract(
+            files, max_workers=2, use_processes=True)
+        assert processes == threads
+
+
+class TestBuildDrafts:
+    """Тесты для подготовки черновых записей."""
+    
+    def test_only_scripts_without_info(self, tmp_path, scripts_tree):
+        """Тест: записи создаются только для скриптов без информации, пакеты пропускаются."""
+        scripts, modules = scripts_tree
+        scripts_info = {"helper": {"default": True}}
+        drafts = build_drafts(scripts, modules, scripts_info,
+                              extractor=MetadataExtractor(str(tmp_path / "cache.json")))
+        assert list(drafts) == ["renderTool"]
+        assert drafts["renderTool"]["tooltip"] == "Рендер выбранных нод."
+    
+    def test_overwrite(self, tmp_path, scripts_tree):
+        """Тест: с overwrite записи пересоздаются и для скриптов с информацией."""
+        scripts, modules = scripts_tree
+        drafts = build_drafts(scripts, modules, {"helper": {"default": True}}, overwrite=True,
+                              extractor=MetadataExtractor(str(tmp_path / "cache.json")))
+        assert sorted(drafts) == ["helper", "renderTool"]
+        assert drafts["helper"]["command"] == "import helper"
+
+
+class TestMain:
+    """Тесты для запуска из командной строки."""
+    
+    def test_dry_run_does_not_write(self, tmp_path, scripts_tree, capsys):
+        """Тест: --dry-run показывает записи, но не меняет scripts_info.json."""
+        with patch.object(metadata_extractor.config, "SCRIPTS_DIR", str(tmp_path)), \
+             patch.object(metadata_extractor.config, "METADATA_CACHE_FILE", str(tmp_path / "cache.json")), \
+             patch("script_info_manager.ScriptInfoManager.update_scripts_info") as mock_update, \
+             patch("script_info_manager.ScriptInfoManager.get_scripts_info", return_value={}):
+            assert metadata_extractor.main(["--dry-run", "--workers", "1"]) == 0
+        
+        mock_update.assert_not_called()
+        output = capsys.readouterr().out
+        assert "renderTool: import renderTool; renderTool.renderTool()" in output
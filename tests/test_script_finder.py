@@ -0,0 +1,72 @@
+"""
+Тесты для ScriptsFinder.
+"""
+import pytest
+import sys
+import os
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script_finder import install_scripts_finder, uninstall_scripts_finder
+from tree_scanner import scan_tree, modules_from_tree
+
+
+@pytest.fixture
+def scripts_tree(tmp_path):
+    """Дерево со скриптом, вспомогательным модулем и пакетом в разных папках."""
+    root = tmp_path / "scripts"
+    (root / "File").mkdir(parents=True)
+    (root / "Lib" / "sm_test_pkg").mkdir(parents=True)
+    (root / "File" / "sm_test_open.py").write_text(
+        "import sm_test_helper\n"
+        "def sm_test_open():\n"
+        "    return sm_test_helper.VALUE\n"
+    )
+    (root / "Lib" / "sm_test_helper.py").write_text("VALUE = 42\n")
+    (root / "Lib" / "sm_test_pkg" / "__init__.py").write_text("")
+    (root / "Lib" / "sm_test_pkg" / "sub.py").write_text("NAME = 'sub'\n")
+    return str(root).replace("\\", "/")
+
+
+@pytest.fixture
+def installed_finder(scripts_tree):
+    """Устанавливает finder и убирает за собой импортированные модули."""
+    tree = scan_tree(scripts_tree, max_workers=1)
+    finder = install_scripts_finder(modules_from_tree(scripts_tree, tree))
+    yield finder
+    uninstall_scripts_finder()
+    for name in list(sys.modules):
+        if name.startswith("sm_test_"):
+            del sys.modules[name]
+
+
+class TestScriptsFinder:
+    """Тесты для импорта скриптов через sys.meta_path."""
+    
+    def test_imports_script_and_sibling_folder_helper(self, installed_finder, scripts_tree):
+        """Тест: скрипт импортируется без изменения sys.path, как и его зависимости."""
+        import sm_test_open
+        
+        assert sm_test_open.sm_test_open() == 42
+        assert sm_test_open.__file__.replace("\\", "/") == f"{scripts_tree}/File/sm_test_open.py"
+        assert not any(p.startswith(scripts_tree) for p in sys.path)
+    
+    def test_imports_package_submodule(self, installed_finder):
+        """Тест: пакеты внутри scripts тоже доступны."""
+        from sm_test_pkg import sub
+        
+        assert sub.NAME == "sub"
+    
+    def test_unknown_module_is_not_found(self, installed_finder):
+        """Тест: для чужих модулей finder ничего не возвращает."""
+        assert installed_finder.find_spec("sm_test_missing") is None
+        with pytest.raises(ImportError):
+            import sm_test_missing  # noqa: F401
+    
+    def test_finder_is_before_path_finder(self, installed_finder):
+        """Тест: finder стоит перед PathFinder в sys.meta_path."""
+        import importlib.machinery
+        
+        meta_path = list(sys.meta_path)
+        assert meta_path.index(installed_finder) < meta_path.index(importlib.machinery.PathFinder)
@@ -9,7 +9,9 @@ from unittest.mock import patch
 # Добавляем родительскую директорию в путь для импорта модулей
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from script_info_manager import ScriptInfoManager
+from script_info_manager import (ScriptInfoManager, invalidate_info_cache, diff_scripts_info,
+                                 ShortcutIndex, normalize_shortcut)
+from file_utils import read_json
 
 
 # Фикстура для получения пути к тестовому файлу
@@ -160,6 +162,39 @@ class TestUpdateScriptInfo:
             manager.info_file, 
             {script_name: new_info}
         )
+    
+    
+    @patch('script_info_manager.write_json')
+    @patch('script_info_manager.read_json')
+    @patch('script_info_manager.config.INFO_FILE', '/test/path/scripts_info.json')
+    def test_update_script_info_stores_custom_menu_paths(self, mock_read_json, mock_write_json):
+        """Тест: для кастомной команды сохраняются извлеченные пути меню."""
+        mock_read_json.return_value = {}
+        script_info = {
+            "custom_cmd_checkbox": True,
+            "custom_command": "nuke.menu('Nuke').addCommand(\n    'Tools/Custom', 'custom.run()')",
+        }
+        
+        manager = ScriptInfoManager()
+        manager.update_script_info("custom", script_info)
+        
+        saved = mock_write_json.call_args[0][1]["custom"]
+        assert saved["custom_menu_paths"] == ["Tools/Custom"]
+    
+    @patch('script_info_manager.write_json')
+    @patch('script_info_manager.read_json')
+    @patch('script_info_manager.config.INFO_FILE', '/test/path/scripts_info.json')
+    def test_update_scripts_info_single_write(self, mock_read_json, mock_write_json):
+        """Тест: несколько записей сохраняются одной записью файла."""
+        mock_read_json.return_value = {"old": {"default": True}}
+        
+        manager = ScriptInfoManager()
+        manager.update_scripts_info({"first": {"default": False}, "second": {"default": True}})
+        
+        mock_write_json.assert_called_once_with(
+            manager.info_file,
+            {"old": {"default": True}, "first": {"default": False}, "second": {"default": True}}
+        )
 
 
 class TestRemoveScriptInfo:
@@ -318,6 +353,12 @@ class TestEnsureInfoFile:
 class TestScriptInfoManagerWithRealFile:
     """Тесты для ScriptInfoManager с использованием реального файла."""
     
+    @pytest.fixture(autouse=True)
+    def no_snapshot(self):
+        """Не создаем двоичный снимок рядом с тестовым файлом в папке tests."""
+        with patch('script_info_manager.config.USE_INFO_SNAPSHOT', False):
+            yield
+    
     def test_get_scripts_info_from_real_file(self, test_info_file):
         """Тест: чтение информации о скриптах из реального файла."""
         # Патчим config.INFO_FILE чтобы использовать тестовый файл
@@ -453,3 +494,162 @@ class TestScriptInfoManagerWithRealFile:
             assert len(restored_data) == 2
             assert "test_script_1" in restored_data
             assert "test_script_2" in restored_data
+
+
+# ============================================================================
+# ТЕСТЫ КЭША
+# ============================================================================
+
+class TestScriptsInfoCache:
+    """Тесты для кэша разобранного scripts_info.json."""
+    
+    @pytest.fixture
+    def info_file(self, tmp_path):
+        """Создает временный файл информации о скриптах."""
+        path = tmp_path / "scripts_info.json"
+        path.write_text('{"script1": {"default": true}}', encoding="utf-8")
+        invalidate_info_cache()
+        yield str(path)
+        invalidate_info_cache()
+    
+    def test_repeated_reads_use_cache(self, info_file):
+        """Тест: повторные обращения не читают файл заново."""
+        with patch('script_info_manager.config.INFO_FILE', info_file), \
+             patch('script_info_manager.read_json', wraps=read_json) as mock_read_json:
+            manager = ScriptInfoManager()
+            manager.get_scripts_info()
+            manager.get_script_info("script1")
+            assert ScriptInfoManager().get_default_state("script1") is True
+            
+            mock_read_json.assert_called_once()
+    
+    def test_changed_file_is_reread(self, info_file):
+        """Тест: изменение файла на диске сбрасывает кэш."""
+        with patch('script_info_manager.config.INFO_FILE', info_file):
+            manager = ScriptInfoManager()
+            assert manager.get_default_state("script1") is True
+            
+            with open(info_file, "w", encoding="utf-8") as file:
+                file.write('{"script1": {"default": false}, "script2": {}}')
+            
+            assert manager.get_default_state("script1") is False
+            assert "script2" in manager.get_scripts_info()
+    
+    def test_save_invalidates_cache(self, info_file):
+        """Тест: сохранение сразу видно при следующем чтении."""
+        with patch('script_info_manager.config.INFO_FILE', info_file):
+            manager = ScriptInfoManager()
+            manager.get_scripts_info()
+            manager.update_script_info("script2", {"default": True})
+            
+            assert manager.get_default_state("script2") is True
+    
+    def test_returned_data_does_not_modify_cache(self, info_file):
+        """Тест: изменение возвращенных словарей не портит кэш."""
+        with patch('script_info_manager.config.INFO_FILE', info_file):
+            manager = ScriptInfoManager()
+            manager.get_scripts_info()["script1"]["default"] = False
+            manager.get_script_info("script1")["default"] = False
+            
+            assert manager.get_default_state("script1") is True
+
+
+class TestDiffScriptsInfo:
+    """Тесты для функции diff_scripts_info."""
+    
+    def test_diff_detects_added_removed_and_changed(self):
+        """Тест: находятся добавленные, удаленные и измененные скрипты."""
+        old_info = {
+            "same": {"default": True},
+            "changed": {"default": False},
+            "removed": {"default": True}
+        }
+        new_info = {
+            "same": {"default": True},
+            "changed": {"default": True},
+            "added": {"default": False}
+        }
+        
+        assert diff_scripts_info(old_info, new_info) == {"changed", "removed", "added"}
+    
+    def test_diff_of_equal_info_is_empty(self):
+        """Тест: для одинаковой информации изменений нет."""
+        info = {"script1": {"default": True, "menu_path": "A/B"}}
+        
+        assert diff_scripts_info(info, {"script1": dict(info["script1"])}) == set()
+
+
+class TestNormalizeShortcut:
+    """Тесты для функции normalize_shortcut."""
+    
+    def test_modifier_order_and_case(self):
+        """Тест: порядок и регистр модификаторов не важны."""
+        assert normalize_shortcut("alt+ctrl+o") == "Ctrl+Alt+O"
+        assert normalize_shortcut(" Ctrl + Alt + O ") == "Ctrl+Alt+O"
+        assert normalize_shortcut("control+option+o") == "Ctrl+Alt+O"
+    
+    def test_nuke_symbol_notation(self):
+        """Тест: запись Nuke через символы совпадает с записью через имена."""
+        assert normalize_shortcut("^#o") == "Ctrl+Alt+O"
+        assert normalize_shortcut("+F5") == "Shift+F5"
+    
+    def test_plain_and_empty(self):
+        """Тест: клавиша без модификаторов и пустая строка."""
+        assert normalize_shortcut("f5") == "F5"
+        assert normalize_shortcut("Ctrl++") == "Ctrl++"
+        assert normalize_shortcut("") == ""
+
+
+class TestShortcutIndex:
+    """Тесты для индекса горячих клавиш."""
+    
+    INFO = {
+        "first": {"shortcut": "Ctrl+Alt+O", "shortcut_context": "DAG"},
+        "second": {"shortcut": "^#o", "shortcut_context": "DAG"},
+        "window": {"shortcut": "ctrl+alt+o", "shortcut_context": "Window"},
+        "custom": {"shortcut": "Ctrl+Alt+O", "shortcut_context": "DAG", "custom_cmd_checkbox": True},
+        "none": {"shortcut": ""},
+    }
+    
+    def test_find_same_context_only(self):
+        """Тест: конфликт ищется только в том же контексте, кастомные команды не учитываются."""
+        index = ShortcutIndex(self.INFO)
+        assert index.find("alt+ctrl+O", "DAG") == ["first", "second"]
+        assert index.find("Ctrl+Alt+O", "DAG", exclude="first") == ["second"]
+        assert index.find("Ctrl+Alt+O", "Window") == ["window"]
+        assert index.find("Ctrl+Alt+O", "Application") == []
+        assert index.find("", "DAG") == []
+    
+    def test_conflicts(self):
+        """Тест: список клавиш, занятых несколькими скриптами."""
+        index = ShortcutIndex(self.INFO)
+        assert index.conflicts() == {("Ctrl+Alt+O", "DAG"): ["first", "second"]}
+    
+    def test_update_and_remove(self):
+        """Тест: обновление скрипта переносит его клавишу, удаление убирает ее."""
+        index = ShortcutIndex(self.INFO)
+        index.update("second", {"shortcut": "F5", "shortcut_context": "DAG"})
+        assert index.find("Ctrl+Alt+O", "DAG") == ["first"]
+        assert index.find("F5", "DAG") == ["second"]
+        index.remove("second")
+        assert index.find("F5", "DAG") == []
+        assert index.conflicts() == {}
+    
+    @patch('script_info_manager.write_json')
+    @patch('script_info_manager.read_json')
+    @patch('script_info_manager.config.INFO_FILE', '/test/path/scripts_info.json')
+    def test_manager_updates_index_incrementally(self, mock_read_json, mock_write_json):
+        """Тест: update_script_info и remove_script_info обновляют уже построенный индекс."""
+        mock_read_json.return_value = {"first": {"shortcut": "Ctrl+O", "shortcut_context": "DAG"}}
+        manager = ScriptInfoManager()
+        index = manager.get_shortcut_index()
+        assert index.find("ctrl+o", "DAG") == ["first"]
+        
+        manager.update_script_info("second", {"shortcut": "Ctrl+O", "shortcut_context": "DAG"})
+        assert manager.get_shortcut_index() is index
+        assert index.find("ctrl+o", "DAG") == ["first", "second"]
+        
+        mock_read_json.return_value = {"first": {"shortcut": "Ctrl+O", "shortcut_context": "DAG"},
+                                       "second": {"shortcut": "Ctrl+O", "shortcut_context": "DAG"}}
+        manager.remove_script_info("first")
+        assert index.find("ctrl+o", "DAG") == ["second"]
@@ -0,0 +1,166 @@
+"""
+Тесты для перезагрузки измененных скриптов.
+"""
+import pytest
+import sys
+import os
+import time
+import importlib
+from unittest.mock import patch
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import script_reloader
+from script_reloader import (parse_imports, build_import_graph, find_dependents,
+                             topological_order, reload_modules)
+
+
+@pytest.fixture
+def scripts_tree(tmp_path):
+    """
+    Дерево скриптов в двух папках:
+    helper <- tool <- panel, helper <- other, lonely ни от кого не зависит.
+    """
+    (tmp_path / "Lib").mkdir()
+    (tmp_path / "Tools").mkdir()
+    files = {
+        "Lib/rs_helper.py": "VALUE = 1\n",
+        "Tools/rs_tool.py": "import os\nimport rs_helper\n\ndef value():\n    return rs_helper.VALUE\n",
+        "Tools/rs_panel.py": "from rs_tool import value\n",
+        "Tools/rs_other.py": "from rs_helper import VALUE\n",
+        "Tools/rs_lonely.py": "import json\n",
+    }
+    modules = {}
+    for rel, source in files.items():
+        path = tmp_path / rel
+        path.write_text(source)
+        # Файлы "существовали" задолго до начала сессии
+        past = time.time_ns() - 10 ** 11
+        os.utime(path, ns=(past, past))
+        modules[path.stem] = (str(path), False)
+    
+    sys.path[:0] = [str(tmp_path / "Lib"), str(tmp_path / "Tools")]
+    yield tmp_path, modules
+    sys.path.remove(str(tmp_path / "Lib"))
+    sys.path.remove(str(tmp_path / "Tools"))
+    for name in modules:
+        sys.modules.pop(name, None)
+        script_reloader._known_mtimes.pop(name, None)
+
+
+class TestImportGraph:
+    """Тесты для построения графа импортов."""
+    
+    def test_parse_imports(self, tmp_path):
+        """Тест: учитываются import и from-import, относительные импорты пропускаются."""
+        path = tmp_path / "sample.py"
+        path.write_text("import a.b\nfrom c.d import e\nfrom . import f\nimport g as h\n")
+        assert parse_imports(str(path)) == {"a", "c", "g"}
+    
+    def test_parse_imports_syntax_error(self, tmp_path):
+        """Тест: файл с ошибкой дает пустое множество."""
+        path = tmp_path / "broken.py"
+        path.write_text("import a\nif:\n")
+        assert parse_imports(str(path)) == set()
+    
+    def test_parse_imports_cached_by_mtime(self, tmp_path):
+        """Тест: разбор повторяется только после изменения файла."""
+        path = tmp_path / "cached.py"
+        path.write_text("import a\n")
+        first = parse_imports(str(path))
+        assert parse_imports(str(path)) is first
+        
+        path.write_text("import a\nimport bb\n")
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10 ** 9))
+        assert parse_imports(str(path)) == {"a", "bb"}
+    
+    def test_graph_contains_only_scripts(self, scripts_tree):
+        """Тест: в графе только связи между скриптами, стандартные модули отброшены."""
+        _, modules = scripts_tree
+        graph = build_import_graph(modules)
+        assert graph["rs_tool"] == {"rs_helper"}
+        assert graph["rs_panel"] == {"rs_tool"}
+        assert graph["rs_lonely"] == set()
+    
+    def test_dependents_and_order(self, scripts_tree):
+        """Тест: зависимые модули находятся транзитивно и идут после зависимостей."""
+        _, modules = scripts_tree
+        graph = build_import_graph(modules)
+        affected = find_dependents(graph, ["rs_helper"])
+        assert affected == {"rs_helper", "rs_tool", "rs_panel", "rs_other"}
+        
+        order = topological_order(graph, affected)
+        assert order[0] == "rs_helper"
+        assert order.index("rs_tool") < order.index("rs_panel")
+    
+    def test_cycle_does_not_hang(self):
+        """Тест: циклические импорты попадают в конец списка."""
+        graph = {"a": {"b"}, "b": {"a"}, "c": set()}
+        assert topological_order(graph, ["a", "b", "c"]) == ["c", "a", "b"]
+
+
+class TestReloadModules:
+    """Тесты для функции reload_modules."""
+    
+    def test_reload_changed_helper(self, scripts_tree):
+        """Тест: изменение вспомогательного модуля подхватывается зависимым скриптом."""
+        tmp_path, modules = scripts_tree
+        import rs_panel
+        assert sys.modules["rs_tool"].value() == 1
+        assert reload_modules(modules)["changed"] == []
+        
+        helper = tmp_path / "Lib" / "rs_helper.py"
+        helper.write_text("VALUE = 2\n")
+        importlib.invalidate_caches()
+        
+        result = reload_modules(modules)
+        assert result["changed"] == ["rs_helper"]
+        # rs_other не загружен, поэтому не перезагружается
+        assert result["reloaded"] == ["rs_helper", "rs_tool", "rs_panel"]
+        assert result["failed"] == []
+        assert sys.modules["rs_tool"].value() == 2
+        
+        # Повторно ничего не перезагружается
+        assert reload_modules(modules)["changed"] == []
+    
+    def test_reload_error_reported(self, scripts_tree):
+        """Тест: ошибка перезагрузки возвращается, остальные модули перезагружаются."""
+        tmp_path, modules = scripts_tree
+        import rs_tool
+        
+        tool = tmp_path / "Tools" / "rs_tool.py"
+        tool.write_text("import rs_helper\nif:\n")
+        importlib.invalidate_caches()
+        
+        result = reload_modules(modules, changed=["rs_helper", "rs_tool"])
+        assert result["reloaded"] == ["rs_helper"]
+        assert [name for name, _ in result["failed"]] == ["rs_tool"]
+    
+    def test_server_clock_behind(self, scripts_tree):
+        """Тест: изменение находится, даже если mtime нового файла раньше старого (часы сервера отстают)."""
+        tmp_path, modules = scripts_tree
+        import rs_helper
+        rs_helper.__cached__ = None
+        # Без .pyc mtime запоминается при первой проверке
+        assert script_reloader.find_changed_modules(modules) == []
+        
+        helper = tmp_path / "Lib" / "rs_helper.py"
+        old_mtime = os.stat(helper).st_mtime_ns
+        helper.write_text("VALUE = 2\n")
+        os.utime(helper, ns=(old_mtime - 10 ** 10, old_mtime - 10 ** 10))
+        
+        assert script_reloader.find_changed_modules(modules) == ["rs_helper"]
+    
+    def test_changed_before_first_check_found_by_pyc(self, scripts_tree):
+        """Тест: изменение до первой проверки находится по mtime исходника в заголовке .pyc."""
+        tmp_path, modules = scripts_tree
+        with patch.object(sys, "dont_write_bytecode", False):
+            import rs_helper
+        assert os.path.isfile(rs_helper.__cached__)
+        assert script_reloader.find_changed_modules(modules) == []
+        script_reloader._known_mtimes.pop("rs_helper")
+        
+        helper = tmp_path / "Lib" / "rs_helper.py"
+        helper.write_text("VALUE = 2\n")
+        assert script_reloader.find_changed_modules(modules) == ["rs_helper"]
@@ -0,0 +1,93 @@
+"""
+Тесты для ScriptSearchIndex.
+"""
+import pytest
+import sys
+import os
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script_search import ScriptSearchIndex, normalize
+
+
+@pytest.fixture
+def index():
+    """Индекс из нескольких скриптов."""
+    return ScriptSearchIndex({
+        "smartMerge": ("smartMerge", "Smart Merge", "Объединяет ноды\nПуть: Edit/Nodes/Smart Merge"),
+        "openCopy": ("openCopy", "Open Copy", "Открывает копию скрипта\nПуть: File/Open Copy"),
+        "autoBackdrop": ("autoBackdrop", "Auto Backdrop", "Путь: Edit/Auto Backdrop"),
+    })
+
+
+def _linear_search(index, query):
+    """Эталонный поиск подстроки перебором."""
+    query = normalize(query)
+    return [name for name, text in zip(index.names, index.texts) if query in text]
+
+
+class TestSearch:
+    """Тесты для поиска по подстроке."""
+    
+    def test_matches_name_label_and_tooltip(self, index):
+        """Тест: поиск идет по имени, имени в меню и подсказке без учета регистра."""
+        assert index.search("SMART") == ["smartMerge"]
+        assert index.search("open copy") == ["openCopy"]
+        assert index.search("копию") == ["openCopy"]
+        assert index.search("edit/") == ["smartMerge", "autoBackdrop"]
+    
+    def test_empty_query_returns_all(self, index):
+        """Тест: пустой запрос возвращает все скрипты."""
+        assert index.search("") == ["smartMerge", "openCopy", "autoBackdrop"]
+    
+    def test_no_match_across_fields(self, index):
+        """Тест: совпадение не может начинаться в одном поле и заканчиваться в другом."""
+        assert index.search("mergesmart") == []
+        assert index.search("smartmergesmart") == []
+    
+    @pytest.mark.parametrize("queries", [
+        ["e", "ed", "edi", "edit", "edit/a"],
+        ["back", "ba", "b", "open"],
+        ["пу", "путь", "путь: f"],
+    ])
+    def test_incremental_typing_matches_linear_search(self, index, queries):
+        """Тест: последовательный ввод дает тот же результат, что и перебор."""
+        for query in queries:
+            assert index.search(query) == _linear_search(index, query)
+    
+    def test_yo_is_normalized(self):
+        """Тест: "ё" и "е" считаются одной буквой."""
+        index = ScriptSearchIndex({"s": ("s", "Ёлка", "")})
+        assert index.search("елка") == ["s"]
+
+
+class TestFuzzySearch:
+    """Тесты для нечеткого поиска."""
+    
+    def test_subsequence_matches(self, index):
+        """Тест: буквы запроса могут идти не подряд."""
+        names = [name for name, _ in index.search_fuzzy("smrg")]
+        assert names == ["smartMerge"]
+    
+    def test_ranking(self):
+        """Тест: начало имени ценнее середины, подстрока ценнее подпоследовательности."""
+        index = ScriptSearchIndex({
+            "rgb_merge": ("rgb_merge", "RGB Merge", ""),
+            "mergeAll": ("mergeAll", "Merge All", ""),
+            "m_e_r_g_e": ("m_e_r_g_e", "M E R G E", ""),
+        })
+        names = [name for name, _ in index.search_fuzzy("merge")]
+        assert names == ["mergeAll", "rgb_merge", "m_e_r_g_e"]
+    
+    def test_main_fields_outrank_tooltip(self):
+        """Тест: совпадение в имени ценнее совпадения в подсказке."""
+        index = ScriptSearchIndex({
+            "a": ("a", "A", "blur helper"),
+            "blurTool": ("blurTool", "Blur Tool", ""),
+        })
+        assert [name for name, _ in index.search_fuzzy("blur")] == ["blurTool", "a"]
+    
+    def test_limit(self, index):
+        """Тест: limit ограничивает количество результатов."""
+        assert len(index.search_fuzzy("e", limit=2)) == 2
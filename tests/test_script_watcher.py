@@ -0,0 +1,118 @@
+"""
+Тесты для наблюдателя за папкой scripts.
+"""
+import pytest
+import sys
+import os
+import time
+import threading
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script_watcher import ScriptsWatcher, is_network_path, _InotifyBackend
+
+
+def _inotify_available():
+    try:
+        _InotifyBackend([]).close()
+        return True
+    except (OSError, AttributeError):
+        return False
+
+
+def _wait_for(event, timeout=5.0):
+    return event.wait(timeout)
+
+
+class TestIsNetworkPath:
+    """Тесты для функции is_network_path."""
+    
+    def test_longest_mount_point_wins(self, tmp_path):
+        """Тест: тип файловой системы берется у самой глубокой точки монтирования."""
+        mounts = tmp_path / "mounts"
+        mounts.write_text(
+            "/dev/sda1 / ext4 rw 0 0\n"
+            "server:/share /mnt/share nfs4 rw 0 0\n"
+            "/dev/sdb1 /mnt/share/local ext4 rw 0 0\n"
+        )
+        assert is_network_path("/mnt/share/scripts", str(mounts))
+        assert not is_network_path("/mnt/share/local/scripts", str(mounts))
+        assert not is_network_path("/mnt/shared", str(mounts))
+    
+    def test_missing_mounts_file(self, tmp_path):
+        """Тест: без таблицы монтирования путь считается локальным."""
+        assert not is_network_path("/", str(tmp_path / "missing"))
+
+
+@pytest.mark.parametrize("backend", [
+    "poll",
+    pytest.param("inotify", marks=pytest.mark.skipif(not _inotify_available(), reason="inotify недоступен")),
+])
+class TestScriptsWatcher:
+    """Тесты для класса ScriptsWatcher."""
+    
+    def _make_watcher(self, backend, root, info_file, on_change):
+        return ScriptsWatcher(on_change, files=[str(info_file)], backend=backend,
+                              debounce=0.2, poll_interval=0.05, root=str(root))
+    
+    def test_new_script_triggers_change(self, tmp_path, backend):
+        """Тест: новый скрипт в папке приводит к вызову on_change."""
+        folder = tmp_path / "scripts" / "Tools"
+        folder.mkdir(parents=True)
+        info_file = tmp_path / "scripts_info.json"
+        info_file.write_text("{}")
+        changed = threading.Event()
+        
+        watcher = self._make_watcher(backend, tmp_path / "scripts", info_file, changed.set)
+        watcher.start([str(tmp_path / "scripts"), str(folder)])
+        try:
+            time.sleep(0.2)
+            (folder / "new_tool.py").write_text("pass\n")
+            assert _wait_for(changed)
+            assert watcher.backend_name == backend
+        finally:
+            watcher.stop()
+    
+    def test_burst_is_debounced(self, tmp_path, backend):
+        """Тест: серия изменений подряд дает один вызов on_change."""
+        folder = tmp_path / "scripts"
+        folder.mkdir()
+        info_file = tmp_path / "scripts_info.json"
+        info_file.write_text("{}")
+        calls = []
+        done = threading.Event()
+        
+        def on_change():
+            calls.append(time.monotonic())
+            done.set()
+        
+        watcher = self._make_watcher(backend, folder, info_file, on_change)
+        watcher.start([str(folder)])
+        try:
+            time.sleep(0.2)
+            for i in range(5):
+                (folder / f"tool_{i}.py").write_text("pass\n")
+                time.sleep(0.06)
+            assert _wait_for(done)
+            time.sleep(0.5)
+            assert len(calls) == 1
+        finally:
+            watcher.stop()
+    
+    def test_info_file_change_triggers_change(self, tmp_path, backend):
+        """Тест: изменение scripts_info.json тоже приводит к вызову on_change."""
+        folder = tmp_path / "scripts"
+        folder.mkdir()
+        info_file = tmp_path / "scripts_info.json"
+        info_file.write_text("{}")
+        changed = threading.Event()
+        
+        watcher = self._make_watcher(backend, folder, info_file, changed.set)
+        watcher.start([str(folder)])
+        try:
+            time.sleep(0.2)
+            info_file.write_text('{"tool": {}}')
+            assert _wait_for(changed)
+        finally:
+            watcher.stop()
@@ -0,0 +1,121 @@
+"""
+Тесты для фоновой загрузки данных панели.
+"""
+import pytest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import fake_nuke
+fake_nuke.install()
+
+import discovery_index
+import script_discovery
+from scripts_loading import ScriptsLoadJob, LoadingCancelled, LoadingError
+
+
+@pytest.fixture
+def scripts_tree(tmp_path):
+    """Дерево из трех папок со скриптами и отдельный файл индекса."""
+    root = tmp_path / "scripts"
+    for folder, names in (("File", ["openCopy", "saveAll"]), ("Edit", ["smartMerge"]), ("Edit/Nodes", ["align"])):
+        (root / folder).mkdir(parents=True, exist_ok=True)
+        for name in names:
+            (root / folder / f"{name}.py").write_text("")
+    with patch.object(script_discovery.config, "SCRIPTS_DIR", str(root)), \
+         patch.object(script_discovery.config, "DISCOVERY_INDEX_FILE", str(tmp_path / "index.json")), \
+         patch.object(script_discovery.config, "DISCOVERY_MTIME_GRACE", 0), \
+         patch.object(discovery_index, "_index", None):
+        yield root
+
+
+def _make_job(tmp_path, batches, batch_interval=0.0, info=None):
+    """Задание загрузки с менеджерами-заглушками, пачки складываются в batches."""
+    info_file = tmp_path / "scripts_info.json"
+    info_file.write_text("{}")
+    info_manager = MagicMock()
+    info_manager.info_file = str(info_file)
+    info_manager.get_scripts_info.return_value = info if info is not None else {"openCopy": {"default": True}}
+    user_manager = MagicMock()
+    user_manager.get_scripts_state.return_value = {"openCopy": True}
+    received = {}
+    job = ScriptsLoadJob(lambda value: received.setdefault("info", value),
+                         lambda value: received.setdefault("states", value),
+                         lambda batch: batches.append(dict(batch)),
+                         info_manager, user_manager, batch_interval)
+    return job, received
+
+
+class TestScriptsLoadJob:
+    """Тесты для загрузки информации, состояний и скриптов."""
+    
+    @pytest.mark.parametrize("use_index", [False, True])
+    def test_batches_cover_result(self, scripts_tree, tmp_path, use_index):
+        """Тест: пачки вместе дают итоговый набор скриптов, результат не пишется в общее состояние."""
+        batches = []
+        job, received = _make_job(tmp_path, batches)
+        with patch.object(script_discovery.config, "USE_DISCOVERY_INDEX", use_index), \
+             patch.object(script_discovery, "_last_discovery", None):
+            result = job.run()
+            assert script_discovery._last_discovery is None
+        
+        merged = {}
+        for batch in batches:
+            merged.update(batch)
+        assert merged == result.scripts == {"openCopy": "File", "saveAll": "File",
+                                            "smartMerge": "Edit", "align": "Edit/Nodes"}
+        assert received == {"info": {"openCopy": {"default": True}}, "states": {"openCopy": True}}
+        # Пачка отправляется на каждой папке, если интервал нулевой
+        assert len(batches) == 3
+    
+    def test_batches_grouped_by_interval(self, scripts_tree, tmp_path):
+        """Тест: при большом интервале все скрипты приходят одной пачкой в конце."""
+        batches = []
+        job, _ = _make_job(tmp_path, batches, batch_interval=3600)
+        job.run()
+        assert len(batches) == 1
+        assert len(batches[0]) == 4
+    
+    def test_cancel_before_start(self, scripts_tree, tmp_path):
+        """Тест: отмененная загрузка не читает файлы."""
+        job, received = _make_job(tmp_path, [])
+        job.cancel()
+        with pytest.raises(LoadingCancelled):
+            job.run()
+        assert received == {}
+    
+    @pytest.mark.parametrize("use_index", [False, True])
+    def test_cancel_during_discovery(self, scripts_tree, tmp_path, use_index):
+        """Тест: отмена во время поиска прерывает и полный обход, и проверку индекса."""
+        if use_index:
+            # Индекс уже сохранен, поэтому папки только проверяются по mtime
+            script_discovery.find_scripts(use_index=True)
+            discovery_index._index = None
+        
+        batches = []
+        job, _ = _make_job(tmp_path, batches)
+        job.on_batch = lambda batch: (batches.append(dict(batch)), job.cancel())
+        with patch.object(script_discovery.config, "USE_DISCOVERY_INDEX", use_index):
+            with pytest.raises(LoadingCancelled):
+                job.run()
+        assert len(batches) == 1
+        if use_index:
+            assert discovery_index.get_discovery_index().get_stats()["full_rescans"] == 0
+    
+    def test_missing_info_file(self, scripts_tree, tmp_path):
+        """Тест: без scripts_info.json загрузка завершается ошибкой."""
+        job, _ = _make_job(tmp_path, [])
+        os.remove(job.info_manager.info_file)
+        with pytest.raises(LoadingError, match="scripts_info.json"):
+            job.run()
+    
+    def test_no_scripts(self, scripts_tree, tmp_path):
+        """Тест: пустая папка scripts - ошибка загрузки."""
+        job, _ = _make_job(tmp_path, [])
+        with patch.object(script_discovery.config, "SCRIPTS_DIR", str(tmp_path / "empty")):
+            with pytest.raises(LoadingError, match="Не нашел"):
+                job.run()
@@ -0,0 +1,311 @@
+"""
+Тесты для обновления меню пользователей в ScriptsManager.
+"""
+import pytest
+import sys
+import os
+import time
+from unittest.mock import patch, MagicMock
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import fake_nuke
+fake_nuke.install()
+
+import ScriptsManager
+from ScriptsManager import UsersMenuUpdateReport, _run_users_update, _update_user_settings
+from file_utils import write_json
+from user_data_manager import UserDataManager
+
+
+SCRIPTS = {"openCopy": "File", "smartMerge": "Edit"}
+SCRIPTS_INFO = {
+    "openCopy": {"default": True, "command": "openCopy.run()"},
+    "smartMerge": {"default": False, "command": "smartMerge.run()"},
+}
+
+
+@pytest.fixture
+def menu_builder():
+    """Построитель меню, который пишет в menu.py команду скрипта."""
+    builder = MagicMock()
+    builder.write_menu_command.side_effect = \
+        lambda file, script_info, create_menus=True: file.write(script_info["command"] + "\n")
+    return builder
+
+
+@pytest.fixture
+def users_dir(tmp_path):
+    """Папка пользователей во временной директории, data.json вместо SQLite."""
+    with patch.object(ScriptsManager.config, "USERS_DIR", str(tmp_path / "users")), \
+         patch.object(ScriptsManager.config, "USER_STATE_BACKEND", "json"):
+        yield tmp_path / "users"
+
+
+class _CancelledTask:
+    """Прогресс, который пользователь отменил сразу."""
+    
+    def __init__(self, title=""):
+        pass
+    
+    def setProgress(self, value):
+        pass
+    
+    def setMessage(self, message):
+        pass
+    
+    def isCancelled(self):
+        return True
+
+
+class TestRunUsersUpdate:
+    """Тесты для параллельного обновления пользователей."""
+    
+    def test_failed_user_does_not_stop_others(self, menu_builder):
+        """Тест: ошибка у одного пользователя попадает в отчет, остальные обновляются."""
+        def update(user, *args):
+            if user == "broken":
+                raise IOError("нет доступа")
+            return True, 1, 0.01
+        
+        with patch("ScriptsManager._update_user_settings", side_effect=update):
+            report = _run_users_update(["alice", "broken", "bob"], SCRIPTS, SCRIPTS_INFO, menu_builder, max_workers=2)
+        
+        assert sorted(report.succeeded) == ["alice", "bob"]
+        assert report.failed == {"broken": "нет доступа"}
+        assert "Ошибок: 1" in report.summary()
+        assert "broken: нет доступа" in report.summary()
+        assert not report.cancelled
+    
+    def test_written_and_skipped_counts(self, menu_builder):
+        """Тест: незатронутые пользователи считаются отдельно, неизмененные файлы - как пропущенные записи."""
+        results = {"alice": (True, 2, 0.01), "bob": (True, 0, 0.02), "carol": (False, 0, 0.0)}
+        with patch("ScriptsManager._update_user_settings", side_effect=lambda user, *args: results[user]):
+            report = _run_users_update(list(results), SCRIPTS, SCRIPTS_INFO, menu_builder, max_workers=3)
+        
+        assert sorted(report.succeeded) == ["alice", "bob"]
+        assert report.skipped == ["carol"]
+        assert report.writes_done == 2
+        assert report.writes_skipped == 2
+        assert set(report.timings) == {"alice", "bob", "carol"}
+        assert "Дольше всего: bob" in report.summary()
+    
+    def test_cancel_stops_pending_users(self, menu_builder):
+        """Тест: после отмены остальные пользователи не обрабатываются, отчет помечен как прерванный."""
+        calls = []
+        
+        def update(user, *args):
+            calls.append(user)
+            if user != "user0":
+                time.sleep(0.05)
+            return True, 2, 0.0
+        
+        users = [f"user{i}" for i in range(10)]
+        with patch("ScriptsManager._update_user_settings", side_effect=update), \
+             patch.object(ScriptsManager.nuke, "ProgressTask", _CancelledTask):
+            report = _run_users_update(users, SCRIPTS, SCRIPTS_INFO, menu_builder, max_workers=1)
+        
+        assert report.cancelled
+        assert report.succeeded == ["user0"]
+        assert len(calls) <= 2
+        assert report.headline() == "Обновление прервано"
+
+
+class TestUsersMenuUpdateReport:
+    """Тесты для сводки отчета."""
+    
+    def test_empty_summary(self):
+        """Тест: пустой отчет без строк про ошибки и прерывание."""
+        summary = UsersMenuUpdateReport().summary()
+        assert "Обновлено: 0" in summary
+        assert "Дольше всего" not in summary
+        assert "прервано" not in summary
+
+
+class TestUpdateUsersMenu:
+    """Тесты для сообщения по итогу обновления меню пользователей."""
+    
+    @pytest.fixture
+    def users(self, users_dir, tmp_path):
+        """Три пользователя, scripts_info.json во временной папке, найденные скрипты."""
+        for user in ("alice", "bob", "carol"):
+            (users_dir / user).mkdir(parents=True)
+        write_json(str(tmp_path / "scripts_info.json"), SCRIPTS_INFO)
+        with patch.object(ScriptsManager.config, "INFO_FILE", str(tmp_path / "scripts_info.json")), \
+             patch("ScriptsManager.discover_scripts", return_value=SCRIPTS), \
+             patch.object(ScriptsManager.nuke, "message") as mock_message:
+            yield mock_message
+    
+    def test_success(self, users):
+        """Тест: без ошибок сообщение начинается с успешного заголовка."""
+        with patch("ScriptsManager._update_user_settings", return_value=(True, 1, 0.0)):
+            ScriptsManager.update_users_menu(max_workers=2)
+        assert users.call_args[0][0].startswith("Successfully updated!")
+    
+    def test_failed_users_not_reported_as_success(self, users):
+        """Тест: при ошибках у части пользователей сообщение не называет обновление успешным."""
+        def update(user, *args):
+            if user == "bob":
+                raise IOError("нет доступа")
+            return True, 1, 0.0
+        
+        with patch("ScriptsManager._update_user_settings", side_effect=update):
+            report = ScriptsManager.update_users_menu(max_workers=2)
+        
+        message = users.call_args[0][0]
+        assert report.failed == {"bob": "нет доступа"}
+        assert message.startswith("Обновлено с ошибками")
+        assert "Successfully" not in message
+        assert "bob: нет доступа" in message
+    
+    def test_cancelled_not_reported_as_success(self, users):
+        """Тест: прерванное обновление так и называется в сообщении."""
+        with patch("ScriptsManager._update_user_settings", return_value=(True, 1, 0.0)), \
+             patch.object(ScriptsManager.nuke, "ProgressTask", _CancelledTask):
+            report = ScriptsManager.update_users_menu(max_workers=1)
+        
+        message = users.call_args[0][0]
+        assert report.cancelled
+        assert message.startswith("Обновление прервано")
+        assert "Successfully" not in message
+
+
+class TestUpdateUserSettings:
+    """Тесты для обновления одного пользователя."""
+    
+    def test_new_user_gets_defaults(self, users_dir, menu_builder):
+        """Тест: пользователь без настроек получает скрипты по умолчанию."""
+        updated, written, _ = _update_user_settings("alice", SCRIPTS, SCRIPTS_INFO, menu_builder)
+        
+        assert updated
+        assert written == 2
+        menu = (users_dir / "alice" / "menu.py").read_text(encoding="utf-8")
+        assert "openCopy.run()" in menu
+        assert "smartMerge.run()" not in menu
+    
+    def test_unchanged_files_not_written(self, users_dir, menu_builder):
+        """Тест: повторное обновление без изменений не перезаписывает файлы."""
+        _update_user_settings("alice", SCRIPTS, SCRIPTS_INFO, menu_builder)
+        updated, written, _ = _update_user_settings("alice", SCRIPTS, SCRIPTS_INFO, menu_builder)
+        assert updated
+        assert written == 0
+    
+    def test_unaffected_user_skipped(self, users_dir, menu_builder):
+        """Тест: пользователь, у которого измененный скрипт выключен и до, и после, пропускается."""
+        _update_user_settings("alice", SCRIPTS, SCRIPTS_INFO, menu_builder)
+        new_info = dict(SCRIPTS_INFO, smartMerge=dict(SCRIPTS_INFO["smartMerge"], command="smartMerge.main()"))
+        
+        result = _update_user_settings("alice", SCRIPTS, new_info, menu_builder,
+                                       changed_scripts={"smartMerge"}, old_scripts_info=SCRIPTS_INFO)
+        assert result[:2] == (False, 0)
+        assert "smartMerge" not in (users_dir / "alice" / "menu.py").read_text(encoding="utf-8")
+        
+        assert _update_user_settings("alice", SCRIPTS, SCRIPTS_INFO, menu_builder,
+                                     changed_scripts=set(), old_scripts_info=SCRIPTS_INFO)[:2] == (False, 0)
+    
+    def test_affected_user_updated(self, users_dir, menu_builder):
+        """Тест: пользователь с включенным измененным скриптом получает новый menu.py."""
+        _update_user_settings("alice", SCRIPTS, SCRIPTS_INFO, menu_builder)
+        new_info = dict(SCRIPTS_INFO, openCopy=dict(SCRIPTS_INFO["openCopy"], command="openCopy.main()"))
+        
+        updated, written, _ = _update_user_settings("alice", SCRIPTS, new_info, menu_builder,
+                                                    changed_scripts={"openCopy"}, old_scripts_info=SCRIPTS_INFO)
+        assert updated
+        assert written == 1
+        assert "openCopy.main()" in (users_dir / "alice" / "menu.py").read_text(encoding="utf-8")
+
+
+class TestSessionMenuStates:
+    """Тесты для состояния меню текущей сессии в scripts_manager."""
+    
+    @pytest.fixture
+    def session(self, users_dir, tmp_path):
+        """Пустое меню Nuke, scripts_info.json во временной папке и дерево путей меню без записанной сессии."""
+        root = ScriptsManager.nuke.Menu("Nuke")
+        info = {name: dict(params, menu_path=f"Tools/{name}") for name, params in SCRIPTS_INFO.items()}
+        write_json(str(tmp_path / "scripts_info.json"), info)
+        with patch.object(ScriptsManager.config, "USERNAME", "alice"), \
+             patch.object(ScriptsManager.config, "INFO_FILE", str(tmp_path / "scripts_info.json")), \
+             patch.object(ScriptsManager.nuke, "menu", lambda name: root), \
+             patch("menu_builder._live_menu_trie", None):
+            yield root, info
+    
+    def test_states_from_session_not_from_disk(self, session):
+        """Тест: если data.json изменили в другой сессии, старое состояние берется из меню этой сессии."""
+        root, info = session
+        ScriptsManager._ensure_live_menu_trie(info, {"openCopy": True})
+        root.addCommand("Tools/openCopy", "openCopy.run()")
+        # Другая сессия уже выключила openCopy в data.json
+        UserDataManager("alice").save_user_data({"openCopy": False})
+        
+        states = ScriptsManager._session_menu_states(["openCopy", "smartMerge"], info, UserDataManager("alice"))
+        assert states == {"openCopy": True, "smartMerge": False}
+        
+        with patch.object(ScriptsManager.ScriptsManagerPanel, "show_dialog_async",
+                          return_value=({"openCopy": False, "smartMerge": False}, info)), \
+             patch.object(ScriptsManager.nuke, "message"):
+            ScriptsManager.scripts_manager()
+        assert root.findItem("Tools") is None
+    
+    def test_create_menu_records_session(self, session):
+        """Тест: create_menu запоминает пункты, которые добавит menu.py пользователя."""
+        root, info = session
+        UserDataManager("alice").save_user_data({"smartMerge": True})
+        ScriptsManager.create_menu()
+        
+        trie = ScriptsManager.get_live_menu_trie()
+        assert sorted(name for _, name in trie.items()) == ["openCopy", "smartMerge"]
+
+
+class TestShowStartupTimings:
+    """Тесты для показа замеров запуска."""
+    
+    def test_shows_breakdown_and_trims(self):
+        """Тест: журнал сокращается, сводка показывается через nuke.message."""
+        with patch("startup_timing.trim_log") as mock_trim, \
+             patch("startup_timing.read_sessions", return_value=[]), \
+             patch.object(ScriptsManager.nuke, "message") as mock_message:
+            ScriptsManager.show_startup_timings()
+        mock_trim.assert_called_once()
+        mock_message.assert_called_once_with("Нет замеров запуска")
+    
+    def test_error_reported(self):
+        """Тест: ошибка чтения журнала показывается пользователю, а не пробрасывается."""
+        with patch("startup_timing.trim_log", side_effect=IOError("нет доступа")), \
+             patch.object(ScriptsManager.nuke, "message") as mock_message:
+            ScriptsManager.show_startup_timings()
+        assert "нет доступа" in mock_message.call_args[0][0]
+
+
+class TestRefreshScripts:
+    """Тесты для обновления скриптов без перезапуска Nuke."""
+    
+    @pytest.fixture(autouse=True)
+    def no_last_error(self):
+        with patch("ScriptsManager._last_refresh_error", None):
+            yield
+    
+    def test_error_logged_without_dialog(self):
+        """Тест: ошибка фонового обновления пишется в консоль, а не показывается окном."""
+        with patch("ScriptsManager.discover_scripts", side_effect=OSError("папка недоступна")), \
+             patch.object(ScriptsManager.nuke, "message") as mock_message, \
+             patch.object(ScriptsManager.nuke, "tprint") as mock_tprint:
+            ScriptsManager.refresh_scripts()
+        mock_message.assert_not_called()
+        assert "папка недоступна" in mock_tprint.call_args[0][0]
+    
+    def test_same_error_logged_once(self):
+        """Тест: повторяющаяся ошибка пишется один раз, новая ошибка и ошибка после успеха - снова."""
+        refresh = MagicMock(side_effect=[OSError("папка недоступна")] * 3 + [OSError("нет доступа"), None,
+                                         OSError("нет доступа")])
+        with patch("ScriptsManager._refresh_scripts", refresh), \
+             patch.object(ScriptsManager.nuke, "tprint") as mock_tprint:
+            for _ in range(4):
+                ScriptsManager.refresh_scripts()
+            assert mock_tprint.call_count == 2
+            
+            ScriptsManager.refresh_scripts()
+            ScriptsManager.refresh_scripts()
+            assert mock_tprint.call_count == 3
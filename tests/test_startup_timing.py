@@ -0,0 +1,160 @@
+"""
+Тесты для замеров времени запуска.
+"""
+import pytest
+import sys
+import os
+import json
+from unittest.mock import patch
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import startup_timing
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Журнал замеров во временной папке, накопленные замеры очищаются."""
+    startup_timing._started.clear()
+    startup_timing._pending.clear()
+    return str(tmp_path / "user" / "startup_timing.jsonl")
+
+
+class TestStartupTiming:
+    """Тесты для записи и чтения замеров."""
+    
+    def test_span_is_written_to_log(self, log_file):
+        """Тест: этап попадает в журнал с идентификатором сессии."""
+        with startup_timing.span("create_menu"):
+            pass
+        startup_timing.flush(log_file)
+        
+        sessions = startup_timing.read_sessions(log_file)
+        assert len(sessions) == 1
+        assert sessions[0]["session"] == startup_timing.SESSION_ID
+        assert "create_menu" in sessions[0]["phases"]
+    
+    def test_begin_end_across_flushes(self, log_file):
+        """Тест: замеры из menu.py и menu.py пользователя собираются в одну сессию."""
+        with startup_timing.span("create_menu"):
+            pass
+        startup_timing.flush(log_file)
+        startup_timing.begin("user_menu")
+        startup_timing.end("user_menu")
+        startup_timing.flush(log_file)
+        
+        sessions = startup_timing.read_sessions(log_file)
+        assert len(sessions) == 1
+        assert list(sessions[0]["phases"]) == ["create_menu", "user_menu"]
+    
+    def test_end_without_begin(self, log_file):
+        """Тест: end без begin ничего не записывает."""
+        assert startup_timing.end("user_menu") is None
+        startup_timing.flush(log_file)
+        
+        assert not os.path.exists(log_file)
+    
+    def test_disabled_timing(self, log_file):
+        """Тест: при выключенных замерах журнал не пишется."""
+        with patch('startup_timing.config.STARTUP_TIMING', False):
+            with startup_timing.span("create_menu"):
+                pass
+            startup_timing.flush(log_file)
+        
+        assert not os.path.exists(log_file)
+    
+    def test_flush_only_appends(self, log_file):
+        """Тест: flush дописывает журнал, не читая и не сокращая его, и без fsync."""
+        os.makedirs(os.path.dirname(log_file))
+        with open(log_file, "w", encoding="utf-8") as file:
+            for i in range(3):
+                file.write(json.dumps({"session": f"old{i}", "phase": "create_menu", "ms": 1.0}) + "\n")
+        
+        with patch('startup_timing.config.STARTUP_TIMING_KEEP_SESSIONS', 2), \
+             patch('startup_timing._read_records') as mock_read, \
+             patch('os.fsync') as mock_fsync:
+            with startup_timing.span("create_menu"):
+                pass
+            startup_timing.flush(log_file)
+        
+        mock_read.assert_not_called()
+        mock_fsync.assert_not_called()
+        assert len(startup_timing.read_sessions(log_file)) == 4
+    
+    def test_old_sessions_are_trimmed(self, log_file):
+        """Тест: trim_log оставляет в журнале только последние сессии и убирает поврежденные строки."""
+        os.makedirs(os.path.dirname(log_file))
+        with open(log_file, "w", encoding="utf-8") as file:
+            for i in range(3):
+                file.write(json.dumps({"session": f"old{i}", "phase": "create_menu", "ms": 1.0}) + "\n")
+            file.write("{broken\n")
+        
+        with patch('startup_timing.config.STARTUP_TIMING_KEEP_SESSIONS', 2):
+            startup_timing.trim_log(log_file)
+        
+        sessions = startup_timing.read_sessions(log_file)
+        assert [session["session"] for session in sessions] == ["old1", "old2"]
+        with open(log_file, encoding="utf-8") as file:
+            assert "broken" not in file.read()
+    
+    def test_trim_missing_log(self, log_file):
+        """Тест: trim_log без журнала ничего не создает."""
+        startup_timing.trim_log(log_file)
+        assert not os.path.exists(log_file)
+    
+    def test_menu_logged_without_user_menu_finish(self, log_file):
+        """Тест: menu.py пользователя без finish (старый или упавший) не мешает записать этапы menu.py."""
+        with startup_timing.span("plugin_add_path_user_folder"):
+            # menu.py пользователя упал до end/finish
+            startup_timing.begin("user_menu")
+        with startup_timing.span("create_menu"):
+            pass
+        startup_timing.finish("menu", log_file)
+        
+        phases = startup_timing.read_sessions(log_file)[0]["phases"]
+        assert set(phases) == {"plugin_add_path_user_folder", "create_menu"}
+    
+    @pytest.mark.parametrize("user_menu_first", [True, False])
+    def test_parts_logged_into_one_session(self, log_file, user_menu_first):
+        """Тест: каждая часть дописывает свои замеры, в журнале они складываются в одну сессию."""
+        def user_menu():
+            startup_timing.begin("user_menu")
+            startup_timing.end("user_menu")
+            startup_timing.finish("user_menu", log_file)
+        
+        if user_menu_first:
+            user_menu()
+        with startup_timing.span("create_menu"):
+            pass
+        startup_timing.finish("menu", log_file)
+        if not user_menu_first:
+            user_menu()
+        
+        sessions = startup_timing.read_sessions(log_file)
+        assert len(sessions) == 1
+        assert set(sessions[0]["phases"]) == {"user_menu", "create_menu"}
+        with open(log_file, encoding="utf-8") as file:
+            assert len(file.readlines()) == 2
+
+
+class TestFormatBreakdown:
+    """Тесты для текстовой сводки."""
+    
+    def test_breakdown(self):
+        """Тест: сводка содержит этапы последней сессии, среднее и итог."""
+        sessions = [
+            {"session": "s1", "host": "ws1", "phases": {"create_menu": 10.0, "user_menu": 30.0}},
+            {"session": "s2", "host": "ws1", "phases": {"create_menu": 20.0}},
+        ]
+        text = startup_timing.format_breakdown(sessions)
+        
+        assert "Сессия s2" in text
+        assert "среднее по 2 сессиям" in text
+        create_menu_line = next(line for line in text.splitlines() if line.startswith("create_menu"))
+        assert "20.0" in create_menu_line and "15.0" in create_menu_line
+        assert text.splitlines()[-1].startswith("Итого")
+    
+    def test_empty(self):
+        """Тест: без замеров выводится сообщение."""
+        assert startup_timing.format_breakdown([]) == "Нет замеров запуска"
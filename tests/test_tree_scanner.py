@@ -0,0 +1,66 @@
+"""
+Тесты для параллельного сканера дерева скриптов.
+"""
+import pytest
+import sys
+import os
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tree_scanner import scan_scripts, scan_tree, iter_tree
+
+
+def _walk_scripts(root):
+    """Эталонный результат - то, что возвращает обход через os.walk."""
+    scripts = {}
+    for current, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        for file in files:
+            if file.endswith(".py"):
+                scripts[os.path.splitext(file)[0]] = current[len(root) + 1:].replace("\\", "/")
+    return scripts
+
+
+@pytest.fixture
+def scripts_tree(tmp_path):
+    """Создает дерево из нескольких уровней с дублирующимися именами скриптов."""
+    root = tmp_path / "scripts"
+    for a in range(3):
+        for b in range(3):
+            folder = root / f"Menu{a}" / f"Sub{b}"
+            folder.mkdir(parents=True)
+            (folder / f"script_{a}_{b}.py").write_text("")
+            (folder / "duplicate.py").write_text("")
+    (root / "Menu0" / "__pycache__").mkdir()
+    (root / "Menu0" / "__pycache__" / "ignored.py").write_text("")
+    (root / "rootScript.py").write_text("")
+    return str(root).replace("\\", "/")
+
+
+class TestScanScripts:
+    """Тесты для scan_scripts."""
+    
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_matches_os_walk(self, scripts_tree, workers):
+        """Тест: результат совпадает с обходом через os.walk, включая порядок."""
+        result = scan_scripts(scripts_tree, max_workers=workers)
+        expected = _walk_scripts(scripts_tree)
+        
+        assert result == expected
+        assert list(result.items()) == list(expected.items())
+        assert "ignored" not in result
+    
+    def test_missing_root(self, tmp_path):
+        """Тест: для несуществующей папки возвращается пустой словарь."""
+        assert scan_scripts(str(tmp_path / "missing"), max_workers=4) == {}
+    
+    def test_iter_tree_is_top_down(self, scripts_tree):
+        """Тест: папки перечисляются сверху вниз, как в os.walk."""
+        tree = scan_tree(scripts_tree, max_workers=4)
+        expected = []
+        for current, dirs, _ in os.walk(scripts_tree):
+            dirs[:] = [d for d in dirs if d != "__pycache__"]
+            expected.append(current[len(scripts_tree) + 1:].replace("\\", "/"))
+        
+        assert iter_tree(tree) == expected
@@ -251,6 +251,58 @@ class TestGetScriptState:
         mock_script_info_manager.get_default_state.assert_not_called()
 
 
+class TestGetScriptsState:
+    """Тесты для метода get_scripts_state."""
+    
+    @patch('user_data_manager.ScriptInfoManager')
+    @patch('user_data_manager.read_json')
+    @patch('user_data_manager.config.USERNAME', 'test_user')
+    @patch('user_data_manager.config.USERS_DIR', '/test/users')
+    def test_get_scripts_state_single_read(self, mock_read_json, mock_script_info_manager_class):
+        """Тест: состояние многих скриптов получается за одно чтение каждого файла."""
+        # Настройка моков
+        mock_read_json.return_value = {"script1": False, "script3": True}
+        mock_script_info_manager = MagicMock()
+        mock_script_info_manager.get_scripts_info.return_value = {
+            "script1": {"default": True},
+            "script2": {"default": True},
+            "script4": {}
+        }
+        mock_script_info_manager_class.return_value = mock_script_info_manager
+        
+        # Создание экземпляра и вызов метода
+        manager = UserDataManager()
+        result = manager.get_scripts_state(["script1", "script2", "script3", "script4", "unknown"])
+        
+        # Проверки
+        assert result == {
+            "script1": False,
+            "script2": True,
+            "script3": True,
+            "script4": False,
+            "unknown": False
+        }
+        mock_read_json.assert_called_once_with(manager.data_file, default={})
+        mock_script_info_manager.get_scripts_info.assert_called_once_with()
+    
+    @patch('user_data_manager.ScriptInfoManager')
+    @patch('user_data_manager.read_json')
+    @patch('user_data_manager.config.USERNAME', 'test_user')
+    @patch('user_data_manager.config.USERS_DIR', '/test/users')
+    def test_get_scripts_state_all_scripts(self, mock_read_json, mock_script_info_manager_class):
+        """Тест: без списка имен возвращаются все скрипты из info и данных пользователя."""
+        # Настройка моков
+        mock_read_json.return_value = {"user_only": True}
+        
+        # Создание экземпляра и вызов метода
+        manager = UserDataManager()
+        result = manager.get_scripts_state(scripts_info={"script1": {"default": True}})
+        
+        # Проверки - переданный scripts_info не перечитывается
+        assert result == {"script1": True, "user_only": True}
+        mock_script_info_manager_class.assert_not_called()
+
+
 class TestSetScriptState:
     """Тесты для метода set_script_state."""
     
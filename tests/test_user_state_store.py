@@ -0,0 +1,117 @@
+"""
+Тесты для SQLiteUserStateStore.
+"""
+import pytest
+import sys
+import os
+import json
+from unittest.mock import patch
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from user_state_store import SQLiteUserStateStore, migrate_json_to_sqlite
+from user_data_manager import UserDataManager
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Хранилище во временной папке."""
+    return SQLiteUserStateStore(str(tmp_path / "state.sqlite3"))
+
+
+class TestSQLiteUserStateStore:
+    """Тесты для хранилища состояний в SQLite."""
+    
+    def test_save_and_get_user_data(self, store):
+        """Тест: сохраненные данные читаются обратно."""
+        assert store.save_user_data("alice", {"script1": True, "script2": False}) is True
+        
+        assert store.get_user_data("alice") == {"script1": True, "script2": False}
+        assert store.user_exists("alice")
+        assert not store.user_exists("bob")
+    
+    def test_save_unchanged_data_returns_false(self, store):
+        """Тест: повторное сохранение тех же данных ничего не меняет."""
+        store.save_user_data("alice", {"script1": True})
+        
+        assert store.save_user_data("alice", {"script1": True}) is False
+        assert store.save_user_data("alice", {"script1": False}) is True
+    
+    def test_save_replaces_old_scripts(self, store):
+        """Тест: сохранение заменяет все данные пользователя."""
+        store.save_user_data("alice", {"script1": True, "script2": True})
+        store.save_user_data("alice", {"script1": False})
+        
+        assert store.get_user_data("alice") == {"script1": False}
+    
+    def test_set_script_state(self, store):
+        """Тест: установка состояния одного скрипта."""
+        store.save_user_data("alice", {"script1": True})
+        store.set_script_state("alice", "script1", False)
+        store.set_script_state("alice", "script2", True)
+        
+        assert store.get_user_data("alice") == {"script1": False, "script2": True}
+    
+    def test_set_script_state_for_all_users(self, store):
+        """Тест: состояние устанавливается всем пользователям одним запросом."""
+        store.save_user_data("alice", {"script1": False})
+        store.save_user_data("bob", {})
+        
+        assert store.set_script_state_for_all_users("script1", True) == 2
+        assert store.get_user_data("alice") == {"script1": True}
+        assert store.get_user_data("bob") == {"script1": True}
+        assert store.get_users_with_script("script1") == ["alice", "bob"]
+    
+    def test_list_users(self, store):
+        """Тест: список пользователей с настройками."""
+        store.save_user_data("bob", {})
+        store.save_user_data("alice", {"script1": True})
+        
+        assert store.list_users() == ["alice", "bob"]
+
+
+class TestMigrateJsonToSqlite:
+    """Тесты для переноса data.json в базу."""
+    
+    def test_migrate_users(self, tmp_path):
+        """Тест: данные всех пользователей переносятся, поврежденные файлы пропускаются."""
+        users_dir = tmp_path / "users"
+        for user, content in (("alice", json.dumps({"script1": True})),
+                              ("bob", "{broken"),
+                              ("carol", json.dumps({"script2": False}))):
+            (users_dir / user).mkdir(parents=True)
+            (users_dir / user / "data.json").write_text(content)
+        (users_dir / "empty").mkdir()
+        db_path = str(tmp_path / "state.sqlite3")
+        
+        result = migrate_json_to_sqlite(str(users_dir), db_path)
+        store = SQLiteUserStateStore(db_path)
+        
+        assert result == {"migrated": ["alice", "carol"], "failed": ["bob"]}
+        assert store.list_users() == ["alice", "carol"]
+        assert store.get_user_data("carol") == {"script2": False}
+    
+    def test_missing_users_dir(self, tmp_path):
+        """Тест: если папки пользователей нет, переносить нечего."""
+        result = migrate_json_to_sqlite(str(tmp_path / "missing"), str(tmp_path / "state.sqlite3"))
+        
+        assert result == {"migrated": [], "failed": []}
+
+
+class TestUserDataManagerSqliteBackend:
+    """Тесты для UserDataManager с бэкендом SQLite."""
+    
+    def test_manager_uses_store(self, tmp_path):
+        """Тест: при бэкенде sqlite data.json не создается."""
+        with patch('user_data_manager.config.USER_STATE_BACKEND', 'sqlite'), \
+             patch('user_data_manager.config.USERS_DIR', str(tmp_path / "users")), \
+             patch('user_state_store.config.USER_STATE_DB_FILE', str(tmp_path / "state.sqlite3")):
+            manager = UserDataManager("alice")
+            assert not manager.data_file_exists()
+            
+            manager.set_script_state("script1", False)
+            
+            assert manager.data_file_exists()
+            assert manager.get_user_data() == {"script1": False}
+            assert not os.path.exists(manager.data_file)
@@ -0,0 +1,188 @@
+"""
+Параллельный обход дерева скриптов через os.scandir.
+
+Соседние папки читаются одновременно на ограниченном пуле потоков, поэтому
+на сетевом диске с большой задержкой время обхода определяется не количеством
+папок, а пропускной способностью. os.scandir отдает тип записи вместе с именем,
+так что лишний stat на каждый файл не нужен.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional, Tuple
+import config
+
+
+def scan_dir(path: str) -> Dict:
+    """
+    Читает содержимое одной папки.
+    
+    Повторяет поведение os.walk: в символические ссылки на папки не заходим,
+    все что не является папкой считается файлом.
+    
+    Args:
+        path: Абсолютный путь к папке
+    
+    Returns:
+        Словарь {"mtime": mtime_ns, "scripts": [...], "subdirs": [...]}
+    
+    Raises:
+        OSError: Если папку не удалось прочитать
+    """
+    mtime = os.stat(path).st_mtime_ns
+    scripts = []
+    subdirs = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if entry.name not in config.EXCLUDED_DIRS and not entry.is_symlink():
+                    subdirs.append(entry.name)
+            elif entry.name.endswith(".py"):
+                scripts.append(os.path.splitext(entry.name)[0])
+    return {"mtime": mtime, "scripts": scripts, "subdirs": subdirs}
+
+
+def scan_tree(root: str, rel: str = "", max_workers: Optional[int] = None,
+              on_dir: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, Dict]:
+    """
+    Сканирует поддерево, читая соседние папки параллельно.
+    
+    Args:
+        root: Корневая папка дерева
+        rel: Относительный путь поддерева, с которого начинать ("" - весь корень)
+        max_workers: Размер пула потоков (по умолчанию config.DISCOVERY_SCAN_WORKERS)
+        on_dir: Вызывается в текущем потоке для каждой прочитанной папки
+            с ее относительным путем и результатом scan_dir. Исключение
+            из on_dir прерывает сканирование
+    
+    Returns:
+        Словарь {относительный_путь: результат scan_dir}. Папки, которые не
+        удалось прочитать, пропускаются, как это делает os.walk.
+    """
+    if max_workers is None:
+        max_workers = config.DISCOVERY_SCAN_WORKERS
+    tree = {}
+    
+    if max_workers <= 1:
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            try:
+                tree[current] = scan_dir(abs_path(root, current))
+            except OSError:
+                continue
+            if on_dir is not None:
+                on_dir(current, tree[current])
+            stack.extend(join_rel(current, name) for name in tree[current]["subdirs"])
+        return tree
+    
+    # Задачи ставятся только из текущего потока, поэтому воркеры никогда
+    # не ждут друг друга и ограниченный пул не может заблокироваться
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {pool.submit(scan_dir, abs_path(root, rel)): rel}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                current = pending.pop(future)
+                try:
+                    tree[current] = future.result()
+                except OSError:
+                    continue
+                if on_dir is not None:
+                    on_dir(current, tree[current])
+                for name in tree[current]["subdirs"]:
+                    child = join_rel(current, name)
+                    pending[pool.submit(scan_dir, abs_path(root, child))] = child
+    return tree
+
+
+def iter_tree(tree: Dict[str, Dict], rel: str = "") -> List[str]:
+    """
+    Возвращает относительные пути папок в порядке обхода os.walk (сверху вниз).
+    
+    Args:
+        tree: Результат scan_tree
+        rel: Папка, с которой начинать обход
+    """
+    result = []
+    stack = [rel] if rel in tree else []
+    while stack:
+        current = stack.pop()
+        result.append(current)
+        for name in reversed(tree[current]["subdirs"]):
+            child = join_rel(current, name)
+            if child in tree:
+                stack.append(child)
+    return result
+
+
+def scripts_from_tree(tree: Dict[str, Dict]) -> Dict[str, str]:
+    """
+    Собирает словарь скриптов из результата сканирования.
+    
+    При одинаковых именах побеждает скрипт, найденный позже при обходе,
+    так же как в discover_scripts.
+    
+    Returns:
+        Словарь {имя_скрипта: путь_в_меню}
+    """
+    scripts = {}
+    for rel in iter_tree(tree):
+        for script_name in tree[rel]["scripts"]:
+            scripts[script_name] = rel
+    return scripts
+
+
+def modules_from_tree(root: str, tree: Dict[str, Dict]) -> Dict[str, Tuple[str, bool]]:
+    """
+    Собирает таблицу импортируемых модулей дерева для ScriptsFinder.
+    
+    Кроме самих скриптов в таблицу попадают пакеты (папки с __init__.py),
+    так как раньше они импортировались через папку-родителя в sys.path.
+    При одинаковых именах побеждает модуль, найденный позже при обходе, - так
+    же вел себя pluginAddPath, который добавляет каждую папку в начало sys.path.
+    
+    Returns:
+        Словарь {имя_модуля: (путь_к_файлу, является_ли_пакетом)}
+    """
+    modules = {}
+    for rel in iter_tree(tree):
+        folder = abs_path(root, rel)
+        for script_name in tree[rel]["scripts"]:
+            if script_name == "__init__":
+                if rel:
+                    package_name = rel.rsplit("/", 1)[-1]
+                    modules[package_name] = (f"{folder}/__init__.py", True)
+            else:
+                modules[script_name] = (f"{folder}/{script_name}.py", False)
+    return modules
+
+
+def scan_scripts(root: Optional[str] = None, max_workers: Optional[int] = None) -> Dict[str, str]:
+    """
+    Параллельная замена полного обхода discover_scripts.
+    
+    Args:
+        root: Корневая папка (по умолчанию config.SCRIPTS_DIR)
+        max_workers: Размер пула потоков
+    
+    Returns:
+        Словарь {имя_скрипта: путь_в_меню}
+    """
+    root = (root or config.SCRIPTS_DIR).replace("\\", "/")
+    if not os.path.isdir(root):
+        return {}
+    return scripts_from_tree(scan_tree(root, max_workers=max_workers))
+
+
+def abs_path(root: str, rel: str) -> str:
+    """Абсолютный путь к папке по ее относительному пути."""
+    return f"{root}/{rel}" if rel else root
+
+
+def join_rel(rel: str, name: str) -> str:
+    """Относительный путь вложенной папки."""
+    return f"{rel}/{name}" if rel else name
@@ -2,10 +2,11 @@
 Менеджер для работы с пользовательскими данными.
 """
 import os
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 import config
 from file_utils import read_json, write_json, write_text_file, ensure_dir
 from script_info_manager import ScriptInfoManager
+from user_state_store import get_user_state_store
 
 
 class UserDataManager:
@@ -20,6 +21,8 @@ class UserDataManager:
         self.user_folder = f"{config.USERS_DIR}/{self.username}"
         self.data_file = f"{self.user_folder}/data.json"
         self.menu_file = f"{self.user_folder}/menu.py"
+        # Если включен бэкенд SQLite, состояния хранятся в общей базе вместо data.json
+        self.store = get_user_state_store() if config.USER_STATE_BACKEND == "sqlite" else None
     
     def get_user_data(self) -> Dict[str, bool]:
         """
@@ -28,17 +31,24 @@ class UserDataManager:
         Returns:
             Словарь {имя_скрипта: включен_ли}
         """
+        if self.store is not None:
+            return self.store.get_user_data(self.username)
         return read_json(self.data_file, default={})
     
-    def save_user_data(self, data: Dict[str, bool]) -> None:
+    def save_user_data(self, data: Dict[str, bool]) -> bool:
         """
         Сохраняет данные пользователя.
         
         Args:
             data: Словарь {имя_скрипта: включен_ли}
+            
+        Returns:
+            True если файл был записан, False если содержимое не изменилось
         """
         ensure_dir(self.user_folder)
-        write_json(self.data_file, data)
+        if self.store is not None:
+            return self.store.save_user_data(self.username, data)
+        return write_json(self.data_file, data)
     
     def get_script_state(self, script_name: str) -> bool:
         """
@@ -61,6 +71,41 @@ class UserDataManager:
         script_info_manager = ScriptInfoManager()
         return script_info_manager.get_default_state(script_name)
     
+    def get_scripts_state(self, script_names: Optional[Iterable[str]] = None,
+                          scripts_info: Optional[Dict[str, Dict[str, Any]]] = None,
+                          user_data: Optional[Dict[str, bool]] = None) -> Dict[str, bool]:
+        """
+        Получает состояние сразу многих скриптов за одно чтение data.json
+        и одно чтение scripts_info.json.
+        
+        Args:
+            script_names: Имена скриптов. Если не указаны, возвращается состояние
+                всех скриптов из scripts_info.json и данных пользователя
+            scripts_info: Уже прочитанная информация о скриптах, чтобы не читать ее повторно
+            user_data: Уже прочитанные данные пользователя, чтобы не читать их повторно
+            
+        Returns:
+            Словарь {имя_скрипта: включен_ли}. Правила те же, что в get_script_state:
+            сначала данные пользователя, затем default из scripts_info.json, иначе False.
+        """
+        if user_data is None:
+            user_data = self.get_user_data()
+        if scripts_info is None:
+            scripts_info = ScriptInfoManager().get_scripts_info()
+        
+        if script_names is None:
+            script_names = list(scripts_info)
+            script_names.extend(name for name in user_data if name not in scripts_info)
+        
+        states = {}
+        for script_name in script_names:
+            if script_name in user_data:
+                states[script_name] = user_data[script_name]
+            else:
+                script_info = scripts_info.get(script_name)
+                states[script_name] = script_info.get("default", False) if script_info else False
+        return states
+    
     def set_script_state(self, script_name: str, enabled: bool) -> None:
         """
         Устанавливает состояние скрипта для пользователя.
@@ -69,6 +114,10 @@ class UserDataManager:
             script_name: Имя скрипта
             enabled: Включен ли скрипт
         """
+        if self.store is not None:
+            self.store.set_script_state(self.username, script_name, enabled)
+            return
+        
         data = self.get_user_data()
         data[script_name] = enabled
         self.save_user_data(data)
@@ -82,14 +131,19 @@ class UserDataManager:
         return os.path.isfile(self.menu_file)
     
     def data_file_exists(self) -> bool:
-        """Проверяет существование файла данных пользователя."""
+        """Проверяет существование файла данных пользователя (или записи в базе SQLite)."""
+        if self.store is not None:
+            return self.store.user_exists(self.username)
         return os.path.isfile(self.data_file)
     
-    def write_menu_file(self, content: str) -> None:
+    def write_menu_file(self, content: str) -> bool:
         """
         Записывает содержимое в файл меню пользователя.
         
         Args:
             content: Содержимое для записи
+            
+        Returns:
+            True если файл был записан, False если содержимое не изменилось
         """
-        write_text_file(self.menu_file, content)
+        return write_text_file(self.menu_file, content)
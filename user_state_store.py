@@ -0,0 +1,233 @@
+"""
+Хранилище состояний скриптов пользователей в SQLite.
+
+Альтернатива файлам users/<имя>/data.json: все состояния лежат в одной базе
+с таблицей (user, script, enabled) и индексами, поэтому массовые операции
+(например, включить скрипт всем пользователям) выполняются одним запросом
+в одной транзакции, а не циклом чтения-записи сотен файлов.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import config
+from file_utils import read_json
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    name TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS user_scripts (
+    user TEXT NOT NULL REFERENCES users(name) ON DELETE CASCADE,
+    script TEXT NOT NULL,
+    enabled INTEGER NOT NULL,
+    PRIMARY KEY (user, script)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_user_scripts_script ON user_scripts(script, enabled);
+"""
+
+
+class SQLiteUserStateStore:
+    """Класс для хранения состояний скриптов всех пользователей в одной базе SQLite."""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: Путь к файлу базы (по умолчанию config.USER_STATE_DB_FILE)
+        """
+        self.db_path = db_path or config.USER_STATE_DB_FILE
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+    
+    @contextmanager
+    def _transaction(self):
+        """
+        Открывает соединение и транзакцию. Соединение создается на каждый вызов,
+        поэтому хранилище можно использовать из разных потоков.
+        """
+        self._ensure_schema()
+        connection = sqlite3.connect(self.db_path, timeout=config.SQLITE_TIMEOUT)
+        try:
+            connection.execute("PRAGMA foreign_keys = ON")
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+    
+    def _ensure_schema(self) -> None:
+        """Создает таблицы при первом обращении."""
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=config.SQLITE_TIMEOUT)
+            try:
+                connection.executescript(SCHEMA)
+            finally:
+                connection.close()
+            self._schema_ready = True
+    
+    def user_exists(self, username: str) -> bool:
+        """Есть ли у пользователя сохраненные настройки."""
+        with self._transaction() as connection:
+            row = connection.execute("SELECT 1 FROM users WHERE name = ?", (username,)).fetchone()
+        return row is not None
+    
+    def list_users(self) -> List[str]:
+        """Возвращает имена всех пользователей с настройками."""
+        with self._transaction() as connection:
+            rows = connection.execute("SELECT name FROM users ORDER BY name").fetchall()
+        return [row[0] for row in rows]
+    
+    def get_user_data(self, username: str) -> Dict[str, bool]:
+        """
+        Получает данные пользователя о включенных/выключенных скриптах.
+        
+        Returns:
+            Словарь {имя_скрипта: включен_ли}
+        """
+        with self._transaction() as connection:
+            return self._read_user_data(connection, username)
+    
+    def save_user_data(self, username: str, data: Dict[str, bool]) -> bool:
+        """
+        Заменяет все данные пользователя одной транзакцией.
+        
+        Args:
+            username: Имя пользователя
+            data: Словарь {имя_скрипта: включен_ли}
+            
+        Returns:
+            True если данные изменились, False если они уже были такими же
+        """
+        with self._transaction() as connection:
+            exists = connection.execute("SELECT 1 FROM users WHERE name = ?", (username,)).fetchone()
+            if exists and self._read_user_data(connection, username) == data:
+                return False
+            
+            connection.execute("INSERT OR IGNORE INTO users(name) VALUES (?)", (username,))
+            connection.execute("DELETE FROM user_scripts WHERE user = ?", (username,))
+            connection.executemany(
+                "INSERT INTO user_scripts(user, script, enabled) VALUES (?, ?, ?)",
+                [(username, script_name, int(bool(enabled))) for script_name, enabled in data.items()]
+            )
+        return True
+    
+    def set_script_state(self, username: str, script_name: str, enabled: bool) -> None:
+        """Устанавливает состояние одного скрипта для пользователя."""
+        with self._transaction() as connection:
+            connection.execute("INSERT OR IGNORE INTO users(name) VALUES (?)", (username,))
+            connection.execute(
+                "INSERT INTO user_scripts(user, script, enabled) VALUES (?, ?, ?) "
+                "ON CONFLICT(user, script) DO UPDATE SET enabled = excluded.enabled",
+                (username, script_name, int(bool(enabled)))
+            )
+    
+    def set_script_state_for_all_users(self, script_name: str, enabled: bool) -> int:
+        """
+        Устанавливает состояние скрипта всем пользователям с настройками одним запросом.
+        
+        Returns:
+            Количество затронутых пользователей
+        """
+        with self._transaction() as connection:
+            # WHERE true нужен, чтобы SQLite не принял ON CONFLICT за часть SELECT
+            cursor = connection.execute(
+                "INSERT INTO user_scripts(user, script, enabled) "
+                "SELECT name, ?, ? FROM users WHERE true "
+                "ON CONFLICT(user, script) DO UPDATE SET enabled = excluded.enabled",
+                (script_name, int(bool(enabled)))
+            )
+            return cursor.rowcount
+    
+    def get_users_with_script(self, script_name: str, enabled: bool = True) -> List[str]:
+        """Возвращает пользователей, у которых скрипт явно включен (или выключен)."""
+        with self._transaction() as connection:
+            rows = connection.execute(
+                "SELECT user FROM user_scripts WHERE script = ? AND enabled = ? ORDER BY user",
+                (script_name, int(bool(enabled)))
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    def import_users_data(self, users_data: Dict[str, Dict[str, bool]]) -> None:
+        """
+        Записывает данные многих пользователей одной транзакцией.
+        
+        Args:
+            users_data: Словарь {имя_пользователя: {имя_скрипта: включен_ли}}
+        """
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO users(name) VALUES (?)",
+                [(username,) for username in users_data]
+            )
+            connection.executemany(
+                "DELETE FROM user_scripts WHERE user = ?",
+                [(username,) for username in users_data]
+            )
+            connection.executemany(
+                "INSERT INTO user_scripts(user, script, enabled) VALUES (?, ?, ?)",
+                [(username, script_name, int(bool(enabled)))
+                 for username, data in users_data.items()
+                 for script_name, enabled in data.items()]
+            )
+    
+    @staticmethod
+    def _read_user_data(connection: sqlite3.Connection, username: str) -> Dict[str, bool]:
+        rows = connection.execute(
+            "SELECT script, enabled FROM user_scripts WHERE user = ?", (username,)
+        ).fetchall()
+        return {script_name: bool(enabled) for script_name, enabled in rows}
+
+
+_store: Optional[SQLiteUserStateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_user_state_store() -> SQLiteUserStateStore:
+    """Возвращает общий для процесса экземпляр хранилища."""
+    global _store
+    with _store_lock:
+        if _store is None or _store.db_path != config.USER_STATE_DB_FILE:
+            _store = SQLiteUserStateStore()
+        return _store
+
+
+def migrate_json_to_sqlite(users_dir: Optional[str] = None,
+                           db_path: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Переносит данные из users/<имя>/data.json в базу SQLite одной транзакцией.
+    Сами JSON файлы не удаляются, поэтому к ним можно вернуться.
+    
+    Args:
+        users_dir: Папка пользователей (по умолчанию config.USERS_DIR)
+        db_path: Путь к базе (по умолчанию config.USER_STATE_DB_FILE)
+        
+    Returns:
+        Словарь {"migrated": [пользователи], "failed": [пользователи с поврежденным data.json]}
+    """
+    users_dir = users_dir or config.USERS_DIR
+    result = {"migrated": [], "failed": []}
+    if not os.path.isdir(users_dir):
+        return result
+    
+    users_data = {}
+    for user in sorted(os.listdir(users_dir)):
+        data_file = os.path.join(users_dir, user, "data.json")
+        if not os.path.isfile(data_file):
+            continue
+        try:
+            users_data[user] = read_json(data_file, default={})
+            result["migrated"].append(user)
+        except (IOError, ValueError):
+            result["failed"].append(user)
+    
+    SQLiteUserStateStore(db_path).import_users_data(users_data)
+    return result